@@ -1,17 +1,18 @@
 """API dependencies"""
 from typing import Optional
 from datetime import datetime
-import calendar
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from beanie import PydanticObjectId
 from pydantic import ValidationError
 from core.config import settings
-from models.user import User, UserRole
+from core.cache import user_cache, organization_cache
+from core.security import is_token_version_revoked
+from models.user import User, UserRole, UserType
 from schemas.token import TokenPayload
 from models.organization import Organization, OrganizationStatus
-from models.organization_payment import OrganizationPayment
-from services.subscription_notifications import create_subscription_expiry_alert
+from services.entitlement import ensure_entitlement
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login/access-token",
@@ -19,11 +20,29 @@ reusable_oauth2 = OAuth2PasswordBearer(
 )
 
 
-async def get_current_user(
-    request: Request,
-    token: Optional[str] = Depends(reusable_oauth2)
-) -> User:
-    """Get current user from JWT token"""
+async def load_user(user_id: str) -> Optional[User]:
+    """User.get through the in-process cache. Returns a private copy callers may mutate."""
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await User.get(user_id)
+        if not user:
+            return None
+        user_cache.set(user_id, user)
+    return user.model_copy(deep=True)
+
+
+async def load_organization(organization_id: str) -> Optional[Organization]:
+    """Organization.get through the in-process cache. Returns a private copy callers may mutate."""
+    organization = organization_cache.get(organization_id)
+    if organization is None:
+        organization = await Organization.get(organization_id)
+        if not organization:
+            return None
+        organization_cache.set(organization_id, organization)
+    return organization.model_copy(deep=True)
+
+
+def _decode_access_token(request: Request, token: Optional[str]) -> TokenPayload:
     if not token:
         token = request.cookies.get("access_token")
     
@@ -44,13 +63,68 @@ async def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    
-    user = await User.get(token_data.sub)
+    return token_data
+
+
+def _revoked_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token has been revoked",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def get_current_user(
+    request: Request,
+    token: Optional[str] = Depends(reusable_oauth2)
+) -> User:
+    """Get current user from JWT token"""
+    token_data = _decode_access_token(request, token)
+
+    user = await load_user(token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    if token_data.ver is not None and token_data.ver < user.token_version:
+        raise _revoked_token()
     return user
 
 
+async def get_current_principal(
+    request: Request,
+    token: Optional[str] = Depends(reusable_oauth2)
+) -> User:
+    """
+    Get the caller for authorization checks only.
+    Claims-bearing tokens are trusted without a database read, so the returned
+    User only has id, user_type, role, organization_id and is_active set and
+    must never be saved. Plain tokens fall back to loading the user.
+    """
+    token_data = _decode_access_token(request, token)
+    if not token_data.has_claims:
+        user = await load_user(token_data.sub)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        return user
+
+    if is_token_version_revoked(token_data.sub, token_data.ver):
+        raise _revoked_token()
+
+    try:
+        return User.model_construct(
+            id=PydanticObjectId(token_data.sub),
+            user_type=UserType(token_data.user_type),
+            role=UserRole(token_data.role),
+            organization_id=token_data.org,
+            is_active=bool(token_data.active),
+            token_version=token_data.ver,
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -60,6 +134,15 @@ async def get_current_active_user(
     return current_user
 
 
+async def get_current_active_principal(
+    current_user: User = Depends(get_current_principal),
+) -> User:
+    """Get current active caller from token claims (see get_current_principal)"""
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+
 async def get_current_active_superuser(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -74,7 +157,7 @@ async def get_current_active_superuser(
 async def get_organization_id(
     request: Request,
     organization_id: Optional[str] = None,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_principal),
 ) -> Optional[str]:
     """
     Get organization ID - either from query param or from user's organization.
@@ -107,7 +190,7 @@ async def get_organization_id(
         return org_id
 
     # Enforce paywall/approval for business-staff requests.
-    org = await Organization.get(org_id)
+    org = await load_organization(org_id)
     now = datetime.utcnow()
 
     # Approval gate (must be approved by platform-staff before services start)
@@ -124,74 +207,20 @@ async def get_organization_id(
             detail="Organization subscription is not active",
         )
 
-    # Trial gate
-    trial_expiry = org.trial_ends_at
+    # Entitlement gate: a field comparison against the materialized window.
+    # Organizations created before entitlements were materialized get it stored on first use
+    entitlement = await ensure_entitlement(org)
+
+    # Expiry alerts and suspension of lapsed organizations are handled by the
+    # scheduled scan in services/subscription_notifications, so this dependency
+    # never writes.
+    trial_expiry = entitlement.trial_ends_at
     if trial_expiry and now <= trial_expiry:
-        days_left = (trial_expiry.date() - now.date()).days
-        if days_left <= 7:
-            await create_subscription_expiry_alert(
-                organization=org,
-                expiry_date=trial_expiry,
-                days_left=days_left,
-                action_url=f"OrganizationMembers?id={org.id}",
-            )
         return org_id
 
-    # Subscription gate based on latest completed organization payment.
-    # Note: frontend sets billing cycle, but payments can still be used to compute next billing.
-    last_completed = await OrganizationPayment.find(
-        {"organization_id": org_id, "status": "completed"}
-    ).sort("-created_at").limit(1).to_list()
-
-    subscription_expiry: Optional[datetime] = None
-    if last_completed:
-        last_payment = last_completed[0]
-        base_date = last_payment.payment_date or last_payment.created_at
-        next_billing_date: Optional[datetime] = None
-
-        if org.billing_cycle == "yearly":
-            # Keep same month/day when possible.
-            year = base_date.year + 1
-            day = min(base_date.day, calendar.monthrange(year, base_date.month)[1])
-            next_billing_date = base_date.replace(year=year, day=day)
-        else:
-            # monthly - keep same day when possible
-            months = 1
-            month_index = base_date.month - 1 + months
-            year = base_date.year + month_index // 12
-            month = (month_index % 12) + 1
-            day = min(base_date.day, calendar.monthrange(year, month)[1])
-            next_billing_date = base_date.replace(year=year, month=month, day=day)
-
-        if next_billing_date and now <= next_billing_date:
-            subscription_expiry = next_billing_date
-            days_left = (next_billing_date.date() - now.date()).days
-            if days_left <= 7:
-                await create_subscription_expiry_alert(
-                    organization=org,
-                    expiry_date=next_billing_date,
-                    days_left=days_left,
-                    action_url=f"OrganizationMembers?id={org.id}",
-                )
-            return org_id
-        subscription_expiry = next_billing_date
-
-    # Expired (trial + subscription). Mark suspended to keep everything in sync.
-    if org.status != OrganizationStatus.SUSPENDED:
-        org.status = OrganizationStatus.SUSPENDED
-        org.updated_at = datetime.utcnow()
-        await org.save()
-
-    # If we can determine an expiry date, create an alert for the organization.
-    expiry_for_alert = subscription_expiry or trial_expiry
-    if expiry_for_alert:
-        days_left = (expiry_for_alert.date() - now.date()).days
-        await create_subscription_expiry_alert(
-            organization=org,
-            expiry_date=expiry_for_alert,
-            days_left=max(days_left, 0),
-            action_url=f"OrganizationMembers?id={org.id}",
-        )
+    subscription_expiry = entitlement.subscription_expires_at
+    if subscription_expiry and now <= subscription_expiry:
+        return org_id
 
     raise HTTPException(
         status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,77 @@
+"""
+Validation-free list responses for trusted database documents (FAST_JSON_RESPONSES).
+Raw Motor documents are shaped to the response schema and serialized with orjson,
+skipping both the Beanie parse and FastAPI's response_model validation.
+"""
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+_MISSING = object()
+
+
+@lru_cache(maxsize=None)
+def _response_layout(response_model: Type[BaseModel]) -> Tuple[Tuple[str, Callable[[], Any]], ...]:
+    """(field name, default factory) pairs for a response schema."""
+    layout = []
+    for name, info in response_model.model_fields.items():
+        if info.is_required():
+            layout.append((name, lambda: _MISSING))
+        elif info.default_factory is not None:
+            layout.append((name, info.default_factory))
+        else:
+            default = info.default
+            if isinstance(default, BaseModel):
+                default = default.model_dump(mode="json")
+            layout.append((name, lambda default=default: default))
+    return tuple(layout)
+
+
+def raw_projection(response_model: Type[BaseModel], extra: Optional[str] = None) -> Dict[str, int]:
+    """Mongo projection for the fields of `response_model` (plus e.g. a sort key)."""
+    projection = {
+        "_id" if name == "id" else name: 1
+        for name, _ in _response_layout(response_model)
+    }
+    if extra:
+        projection[extra] = 1
+    return projection
+
+
+def shape_document(doc: Dict[str, Any], response_model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Shape a raw document like response_model would: `_id` becomes a string `id`,
+    missing top-level fields get their schema defaults and unknown keys are dropped.
+    Nested values are passed through as stored.
+    """
+    shaped = {}
+    for name, default in _response_layout(response_model):
+        if name == "id":
+            shaped["id"] = str(doc["_id"])
+            continue
+        value = doc.get(name, _MISSING)
+        if value is _MISSING:
+            value = default()
+            if value is _MISSING:
+                continue
+        shaped[name] = value
+    return shaped
+
+
+def fast_json_response(
+    docs: List[Dict[str, Any]],
+    response_model: Type[BaseModel],
+    response: Response,
+) -> ORJSONResponse:
+    """ORJSONResponse for raw documents, keeping headers set on `response` (e.g. X-Next-Cursor)."""
+    headers = {
+        key: value for key, value in response.headers.items()
+        if key.lower() != "content-length"
+    }
+    return ORJSONResponse(
+        content=[shape_document(doc, response_model) for doc in docs],
+        headers=headers,
+    )
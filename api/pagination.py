@@ -0,0 +1,177 @@
+"""Keyset (cursor) pagination for list endpoints"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from beanie import Document
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+from pymongo import ASCENDING, DESCENDING
+
+from api.fast_json import fast_json_response, raw_projection
+from api.projection import parse_fields, projected_response, projection_model
+from core.config import settings
+
+# List bodies stay plain arrays for existing clients; the next page cursor is sent as a header.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def parse_sort(model: Type[Document], sort: Optional[str], default: str) -> Tuple[str, int]:
+    """Turn "-created_at" style sort strings into (field, direction)."""
+    sort = sort or default
+    direction = DESCENDING if sort.startswith("-") else ASCENDING
+    field = sort.lstrip("+-")
+    if field == "id":
+        field = "_id"
+    if field != "_id" and field not in model.model_fields:
+        raise HTTPException(status_code=400, detail=f"Cannot sort by '{field}'")
+    return field, direction
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    if isinstance(value, ObjectId):
+        return {"$oid": str(value)}
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "$date" in value:
+            return datetime.fromisoformat(value["$date"])
+        if "$oid" in value:
+            return ObjectId(value["$oid"])
+    return value
+
+
+def encode_cursor(field: str, value: Any, doc_id: Any) -> str:
+    payload = {"f": field, "v": _encode_value(value), "id": str(doc_id)}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, field: str) -> Tuple[Any, ObjectId]:
+    """Return the (sort value, _id) of the last item of the previous page."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        value = _decode_value(payload["v"])
+        doc_id = ObjectId(payload["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if payload.get("f") != field:
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested sort")
+    return value, doc_id
+
+
+def keyset_filter(field: str, direction: int, value: Any, doc_id: ObjectId) -> Dict[str, Any]:
+    """Filter for documents strictly after (value, doc_id) in (field, _id) order. Nulls sort first."""
+    op = "$gt" if direction == ASCENDING else "$lt"
+    if field == "_id":
+        return {"_id": {op: doc_id}}
+
+    same_value = {field: value, "_id": {op: doc_id}}
+    if value is None:
+        if direction == ASCENDING:
+            return {"$or": [same_value, {field: {"$ne": None}}]}
+        return same_value
+
+    after = [{field: {op: value}}, same_value]
+    if direction == DESCENDING:
+        after.append({field: None})
+    return {"$or": after}
+
+
+async def paginate(
+    model: Type[Document],
+    query: Dict[str, Any],
+    response: Response,
+    *,
+    sort: Optional[str] = None,
+    default_sort: str = "created_at",
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[Tuple[str, ...]] = None,
+    raw_model: Optional[Type[BaseModel]] = None,
+) -> List[Any]:
+    """
+    Find one page of `model` documents ordered by (sort field, _id).
+    With a `cursor` the page starts after it and `skip` is ignored; either way the
+    cursor for the following page, if any, is set in the X-Next-Cursor header.
+    With `fields` (see api.projection.parse_fields) only those fields, plus the
+    sort key, are fetched and projection models are returned instead of documents.
+    With `raw_model` the page is read with Motor, projected to that schema's fields,
+    and returned as plain dicts without any pydantic validation.
+    """
+    field, direction = parse_sort(model, sort, default_sort)
+    order = [(field, direction)]
+    if field != "_id":
+        order.append(("_id", direction))
+
+    if cursor:
+        value, doc_id = decode_cursor(cursor, field)
+        after = keyset_filter(field, direction, value, doc_id)
+        query = {"$and": [query, after]} if query else after
+        skip = 0
+
+    if limit <= 0:
+        return []
+
+    if raw_model is not None:
+        raw_cursor = model.get_motor_collection().find(query, raw_projection(raw_model, field))
+        items = await raw_cursor.sort(order).skip(skip).limit(limit + 1).to_list(length=limit + 1)
+    else:
+        find = model.find(query).sort(order).skip(skip).limit(limit + 1)
+        if fields is not None:
+            projected = set(fields)
+            if field != "_id":
+                projected.add(field)
+            find = find.project(projection_model(model, tuple(sorted(projected))))
+        items = await find.to_list()
+
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        if raw_model is not None:
+            last_id, last_value = last["_id"], last.get(field)
+        else:
+            last_id = last.id
+            last_value = last_id if field == "_id" else getattr(last, field)
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(field, last_value, last_id)
+    return items
+
+
+async def list_page(
+    model: Type[Document],
+    response_model: Type[BaseModel],
+    query: Dict[str, Any],
+    response: Response,
+    *,
+    fields: Optional[str] = None,
+    **page: Any,
+) -> Any:
+    """
+    paginate() for a list endpoint, returning what the endpoint should return:
+    documents for response_model to validate, a projected JSON response for
+    `fields=`, or with FAST_JSON_RESPONSES an orjson response built from raw
+    documents that skips validation entirely.
+    """
+    projection = parse_fields(fields, model, response_model)
+    if projection is not None:
+        items = await paginate(model, query, response, fields=projection, **page)
+        return projected_response(items, projection, response)
+
+    if settings.FAST_JSON_RESPONSES:
+        docs = await paginate(model, query, response, raw_model=response_model, **page)
+        return fast_json_response(docs, response_model, response)
+
+    return await paginate(model, query, response, **page)
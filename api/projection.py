@@ -0,0 +1,66 @@
+"""Field projection (`?fields=`) support for list endpoints"""
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple, Type
+
+from beanie import Document, PydanticObjectId
+from fastapi import HTTPException, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, Field, create_model
+
+FIELDS_DESCRIPTION = "Comma-separated fields to return, e.g. `name,status`. `id` is always included."
+
+
+def parse_fields(
+    fields: Optional[str],
+    document: Type[Document],
+    response_model: Type[BaseModel],
+) -> Optional[Tuple[str, ...]]:
+    """Validate a `fields=` value against the endpoint's response model."""
+    if not fields:
+        return None
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    allowed = {
+        name for name in response_model.model_fields
+        if name == "id" or name in document.model_fields
+    }
+    unknown = names - allowed
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+        )
+    names.discard("id")
+    return tuple(sorted(names))
+
+
+@lru_cache(maxsize=256)
+def projection_model(document: Type[Document], field_names: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    Pydantic model holding only `field_names` of `document`; Beanie derives the
+    Mongo projection from its fields. Fields are optional so older documents
+    missing one still validate.
+    """
+    definitions: dict = {
+        "id": (Optional[PydanticObjectId], Field(default=None, alias="_id")),
+    }
+    for name in field_names:
+        definitions[name] = (Optional[document.model_fields[name].annotation], None)
+    return create_model(
+        f"{document.__name__}Projection",
+        __config__=ConfigDict(populate_by_name=True),
+        **definitions,
+    )
+
+
+def projected_response(items: List[Any], field_names: Tuple[str, ...], response: Response) -> JSONResponse:
+    """
+    Serialize projection models directly, keeping headers set on `response` (e.g. X-Next-Cursor).
+    Only `id` and `field_names` are returned, not the sort key fetched for the cursor.
+    """
+    include = {"id", *field_names}
+    content = [item.model_dump(mode="json", include=include) for item in items]
+    headers = {
+        key: value for key, value in response.headers.items()
+        if key.lower() != "content-length"
+    }
+    return JSONResponse(content=content, headers=headers)
@@ -1,8 +1,10 @@
 """Alert endpoints"""
 from typing import List, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from beanie import PydanticObjectId
 from api import deps
+from api.pagination import list_page
+from api.projection import FIELDS_DESCRIPTION
 from models.user import User
 from models.alert import Alert
 from schemas.alert import AlertCreate, AlertUpdate, AlertResponse
@@ -12,17 +14,21 @@ router = APIRouter()
 
 @router.get("/", response_model=List[AlertResponse])
 async def read_alerts(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     alert_type: Optional[str] = None,
     priority: Optional[str] = None,
     is_read: Optional[bool] = None,
     is_dismissed: Optional[bool] = None,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Retrieve alerts. Filtered by organization for non-superadmins.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
     """
     query = {}
     if organization_id:
@@ -37,8 +43,10 @@ async def read_alerts(
     if is_dismissed is not None:
         query["is_dismissed"] = is_dismissed
     
-    alerts = await Alert.find(query).sort("-created_at").skip(skip).limit(limit).to_list()
-    return alerts
+    return await list_page(
+        Alert, AlertResponse, query, response,
+        fields=fields, default_sort="-created_at", cursor=cursor, skip=skip, limit=limit,
+    )
 
 
 @router.post("/", response_model=AlertResponse)
@@ -69,7 +77,7 @@ async def create_alert(
 async def read_alert(
     alert_id: str,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get alert by ID within an organization.
@@ -152,7 +160,7 @@ async def mark_all_alerts_read(
 @router.get("/unread/count", response_model=dict)
 async def get_unread_count(
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get count of unread alerts for an organization.
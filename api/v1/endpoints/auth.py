@@ -1,5 +1,4 @@
 """Authentication endpoints"""
-from datetime import timedelta
 from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Cookie
 from fastapi.security import OAuth2PasswordRequestForm
@@ -7,6 +6,8 @@ from jose import jwt
 from pydantic import ValidationError
 from core import security
 from core.config import settings
+from core.cache import user_cache
+from services.notification_helpers import invalidate_notification_recipients
 from models.user import User
 from schemas.token import Token, TokenPayload, RefreshToken
 from schemas.user import UserCreate, UserResponse, UserUpdate
@@ -34,21 +35,18 @@ async def login_access_token(
     OAuth2 compatible token login, get an access token for future requests
     """
     user = await User.find_one(User.username == form_data.username)
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    if not user or not await security.verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect username or password")
     elif not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = security.create_access_token(
-        str(user.id), expires_delta=access_token_expires
-    )
+    access_token = security.create_user_access_token(user)
     # 2 days in seconds = 172800
-    refresh_token = security.create_refresh_token(str(user.id))
+    refresh_token = security.create_refresh_token(str(user.id), token_version=user.token_version)
     
     cookie_settings = {
         "httponly": True,
-        "max_age": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        "max_age": security.access_token_max_age(),
         "samesite": "none" if settings.ENVIRONMENT == "production" else "lax",
         "secure": True if settings.ENVIRONMENT == "production" else False,
     }
@@ -125,16 +123,20 @@ async def refresh_token(
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+    # Tokens issued before a password change or revocation (older ones have no version)
+    if (token_data.ver or 0) < user.token_version:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Token has been revoked",
+        )
         
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    new_access_token = security.create_access_token(
-        str(user.id), expires_delta=access_token_expires
-    )
-    new_refresh_token = security.create_refresh_token(str(user.id))
+    # Re-mint from the stored user so claims reflect current role/org/status
+    new_access_token = security.create_user_access_token(user)
+    new_refresh_token = security.create_refresh_token(str(user.id), token_version=user.token_version)
     
     cookie_settings = {
         "httponly": True,
-        "max_age": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        "max_age": security.access_token_max_age(),
         "samesite": "none" if settings.ENVIRONMENT == "production" else "lax",
         "secure": True if settings.ENVIRONMENT == "production" else False,
     }
@@ -183,7 +185,7 @@ async def register_user(
             detail="The user with this username already exists in the system",
         )
         
-    hashed_password = security.get_password_hash(user_in.password)
+    hashed_password = await security.get_password_hash_async(user_in.password)
     user_data = user_in.model_dump(exclude={"password"})
     user_data["hashed_password"] = hashed_password
     
@@ -196,6 +198,7 @@ async def register_user(
     
     user = User(**user_data)
     await user.create()
+    invalidate_notification_recipients(user.organization_id)
     return user
 
 
@@ -232,7 +235,8 @@ async def update_users_me(
     
     # Handle password update separately
     if user_in.password:
-        update_data["hashed_password"] = security.get_password_hash(user_in.password)
+        update_data["hashed_password"] = await security.get_password_hash_async(user_in.password)
+        update_data["token_version"] = current_user.token_version + 1
     
     # Check if push notifications were enabled and send a test email
     if user_in.preferences and user_in.preferences.notifications:
@@ -252,6 +256,10 @@ async def update_users_me(
     if update_data:
         await current_user.update({"$set": update_data})
         await current_user.save()
+        user_cache.invalidate(str(current_user.id))
+        invalidate_notification_recipients(current_user.organization_id)
+        if "token_version" in update_data:
+            security.revoke_user_tokens(str(current_user.id), update_data["token_version"])
     
     return current_user
 
@@ -325,9 +333,12 @@ async def reset_password(
         raise HTTPException(status_code=404, detail="User not found")
     
     # Update password
-    user.hashed_password = security.get_password_hash(request.new_password)
+    user.hashed_password = await security.get_password_hash_async(request.new_password)
+    user.token_version += 1
     user.updated_at = datetime.utcnow()
     await user.save()
+    user_cache.invalidate(str(user.id))
+    security.revoke_user_tokens(str(user.id), user.token_version)
     
     # Mark request as completed
     reset_request.status = "completed"
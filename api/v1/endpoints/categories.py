@@ -7,6 +7,7 @@ from api import deps
 from models.user import User
 from models.category import Category
 from schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
+from services.storefront_catalog import invalidate_storefront_categories
 
 router = APIRouter()
 
@@ -15,7 +16,7 @@ async def read_categories(
     skip: int = 0,
     limit: int = 100,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Retrieve categories. Filtered by organization for non-superadmins.
@@ -45,6 +46,7 @@ async def create_category(
         
     category = Category(**data)
     await category.create()
+    invalidate_storefront_categories(category.organization_id)
     return category
 
 
@@ -52,7 +54,7 @@ async def create_category(
 async def read_category(
     category_id: str,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get category by ID within an organization.
@@ -93,6 +95,7 @@ async def update_category(
     update_data["updated_at"] = datetime.utcnow()
     await category.update({"$set": update_data})
     await category.save()
+    invalidate_storefront_categories(category.organization_id)
     return category
 
 
@@ -113,4 +116,5 @@ async def delete_category(
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     await category.delete()
+    invalidate_storefront_categories(category.organization_id)
     return category
@@ -15,7 +15,7 @@ async def read_locations(
     skip: int = 0,
     limit: int = 100,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Retrieve locations. Filtered by organization for non-superadmins.
@@ -49,7 +49,7 @@ async def create_location(
 async def read_location(
     location_id: str,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get location by ID within an organization.
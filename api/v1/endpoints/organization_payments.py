@@ -9,12 +9,13 @@ from beanie import PydanticObjectId
 from api import deps
 from models.user import User
 from models.organization import Organization
-from models.organization_payment import OrganizationPayment
+from models.organization_payment import OrganizationPayment, OPStatus
 from schemas.organization_payment import (
     OrganizationPaymentCreate,
     OrganizationPaymentUpdate,
     OrganizationPaymentResponse,
 )
+from services.entitlement import refresh_entitlement, refresh_entitlement_by_id
 
 router = APIRouter()
 
@@ -29,7 +30,7 @@ async def read_organization_payments(
     payment_type: Optional[str] = None,
     billing_period: Optional[str] = None,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Retrieve organization payments. Filtered by organization for non-superadmins.
@@ -75,6 +76,8 @@ async def create_organization_payment(
 
     payment = OrganizationPayment(**data)
     await payment.create()
+    if payment.status == OPStatus.COMPLETED:
+        await refresh_entitlement(org)
     return payment
 
 
@@ -82,7 +85,7 @@ async def create_organization_payment(
 async def read_organization_payment(
     payment_id: str,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get organization payment by ID within an organization.
@@ -121,9 +124,12 @@ async def update_organization_payment(
     if "organization_id" in update_data:
         del update_data["organization_id"]
 
+    was_completed = payment.status == OPStatus.COMPLETED
     update_data["updated_at"] = datetime.utcnow()
     await payment.update({"$set": update_data})
     await payment.save()
+    if was_completed or payment.status == OPStatus.COMPLETED:
+        await refresh_entitlement_by_id(payment.organization_id)
     return payment
 
 
@@ -145,5 +151,7 @@ async def delete_organization_payment(
         raise HTTPException(status_code=404, detail="Organization payment not found")
 
     await payment.delete()
+    if payment.status == OPStatus.COMPLETED:
+        await refresh_entitlement_by_id(payment.organization_id)
     return payment
 
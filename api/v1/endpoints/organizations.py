@@ -6,6 +6,7 @@ from beanie import PydanticObjectId
 from bson import ObjectId as BsonObjectId
 import json
 from api import deps
+from core.cache import organization_cache
 from models.user import User
 from models.organization import Organization, OrganizationStatus
 from models.product import Product
@@ -24,6 +25,7 @@ from services.subscription_notifications import (
     create_trial_extended_notification,
     create_storage_capacity_changed_notification,
 )
+from services.entitlement import build_entitlement, refresh_entitlement
 
 router = APIRouter()
 
@@ -117,6 +119,8 @@ async def create_organization(
     if data.get("billing_cycle") and not data.get("subscription_interval"):
         data["subscription_interval"] = data["billing_cycle"]
     organization = Organization(**data)
+    # A brand-new organization has no payments yet, so the trial is its only window.
+    organization.entitlement = build_entitlement(organization, None)
     await organization.create()
     return organization
 
@@ -211,7 +215,7 @@ async def get_database_stats(
 @router.get("/{organization_id}", response_model=OrganizationResponse)
 async def read_organization(
     organization_id: str,
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get organization by ID.
@@ -257,7 +261,10 @@ async def update_organization(
         update_data["subscription_interval"] = update_data["billing_cycle"]
 
     await organization.update({"$set": update_data})
+    if {"trial_ends_at", "billing_cycle", "subscription_interval"} & update_data.keys():
+        await refresh_entitlement(organization, save=False)
     await organization.save()
+    organization_cache.invalidate(organization_id)
     return organization
 
 
@@ -275,7 +282,9 @@ async def approve_organization(
 
     organization.status = OrganizationStatus.ACTIVE
     organization.updated_at = datetime.utcnow()
+    await refresh_entitlement(organization, save=False)
     await organization.save()
+    organization_cache.invalidate(organization_id)
 
     await create_org_approved_notification(
         organization=organization,
@@ -306,7 +315,9 @@ async def extend_trial(
         base = datetime.utcnow()
     organization.trial_ends_at = base + timedelta(days=days)
     organization.updated_at = datetime.utcnow()
+    await refresh_entitlement(organization, save=False)
     await organization.save()
+    organization_cache.invalidate(organization_id)
 
     await create_trial_extended_notification(
         organization=organization,
@@ -336,6 +347,7 @@ async def set_storage_capacity(
     organization.storage_capacity_kb = storage_capacity_kb
     organization.updated_at = datetime.utcnow()
     await organization.save()
+    organization_cache.invalidate(organization_id)
 
     await create_storage_capacity_changed_notification(
         organization=organization,
@@ -349,7 +361,7 @@ async def set_storage_capacity(
 @router.get("/{organization_id}/storage-summary", response_model=dict)
 async def get_organization_storage_summary(
     organization_id: str,
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get storage usage summary for one organization (Platform Admin or Organization Admin).
@@ -398,4 +410,5 @@ async def delete_organization(
     if not organization:
         raise HTTPException(status_code=404, detail="Organization not found")
     await organization.delete()
+    organization_cache.invalidate(organization_id)
     return organization
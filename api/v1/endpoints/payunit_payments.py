@@ -4,11 +4,13 @@ from beanie import PydanticObjectId
 from datetime import datetime
 import logging
 
+from core.cache import organization_cache
 from models.organization import Organization, OrganizationStatus
 from models.organization_payment import OrganizationPayment, OPStatus, OPaymentType, OPaymentMethod
 from models.subscription_plan import SubscriptionPlan
 from schemas.payunit import PayUnitCollectRequest, PayUnitWebhookPayload
 from services.payunit import payunit_service, PayUnitService
+from services.entitlement import refresh_entitlement
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -167,7 +169,9 @@ async def payunit_webhook(request: Request):
     org.max_users = plan.max_users
     org.status = OrganizationStatus.ACTIVE
     org.updated_at = datetime.utcnow()
+    await refresh_entitlement(org, save=False)
     await org.save()
+    organization_cache.invalidate(str(org.id))
     logger.info(f"Organization {org.name} subscription activated via PayUnit webhook.")
 
     return {"status": "success", "message": "Subscription activated"}
@@ -3,6 +3,11 @@ from fastapi import APIRouter, Depends, HTTPException
 from models.platform_settings import PlatformSettings
 from models.user import User
 from api.deps import get_current_active_user
+from core.cache import cache_stats
+from core.security import password_hash_stats
+from services.email import smtp_pool_stats
+from services.jobs import job_stats
+from services import storefront_config
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -18,7 +23,7 @@ class PlatformSettingsUpdate(BaseModel):
 @router.get("/settings")
 async def get_platform_settings() -> Any:
     """Publicly get platform settings."""
-    settings = await PlatformSettings.find_one()
+    settings = await storefront_config.get_platform_settings()
     if not settings:
         # Return default if not initialized
         return {
@@ -62,8 +67,27 @@ async def update_platform_settings(
         settings.allowed_payment_methods = settings_in.allowed_payment_methods
         
     await settings.save()
+    storefront_config.invalidate_platform_settings()
     return settings
 
+@router.get("/metrics")
+async def get_runtime_metrics(
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    In-process cache, password-hashing and SMTP pool counters for this worker,
+    and background job outbox counts by status (Platform Staff only).
+    """
+    if current_user.user_type != "platform-staff":
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    return {
+        "caches": cache_stats(),
+        "password_hashing": password_hash_stats(),
+        "smtp": smtp_pool_stats(),
+        "jobs": await job_stats(),
+    }
+
 from fastapi import UploadFile, File
 import uuid
 import os
@@ -111,6 +135,7 @@ async def upload_default_hero(
             
     settings.default_hero_image = url
     await settings.save()
+    storefront_config.invalidate_platform_settings()
     
     return {"url": url}
 
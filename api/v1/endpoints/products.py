@@ -2,14 +2,18 @@ import os
 import uuid
 from typing import List, Any, Optional, Union
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile, File
 from beanie import PydanticObjectId
 from api import deps
+from api.pagination import list_page
+from api.projection import FIELDS_DESCRIPTION
 from core.uploads import build_upload_url, get_upload_dir
 from models.user import User
-from models.product import Product, ProductStatus
+from models.product import Product, ProductStatus, ProductVariant
 from models.alert import Alert, AlertType, AlertPriority
 from schemas.product import ProductCreate, ProductUpdate, ProductResponse
+from services.stock import refresh_stock_status
+from services.storefront_catalog import invalidate_storefront_categories
 
 router = APIRouter()
 
@@ -48,18 +52,22 @@ async def upload_product_image(
 
 @router.get("/", response_model=List[ProductResponse])
 async def read_products(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     category: Optional[str] = None,
     status: Optional[str] = None,
     search: Optional[str] = None,
     location_id: Optional[str] = None,
     warehouse_id: Optional[str] = None,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Retrieve products. Filtered by organization for non-superadmins.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
     """
     query = {}
     if organization_id:
@@ -79,8 +87,10 @@ async def read_products(
             {"variants.sku": {"$regex": search, "$options": "i"}},
         ]
     
-    products = await Product.find(query).skip(skip).limit(limit).to_list()
-    return products
+    return await list_page(
+        Product, ProductResponse, query, response,
+        fields=fields, cursor=cursor, skip=skip, limit=limit,
+    )
 
 
 @router.post("/", response_model=Union[ProductResponse, List[ProductResponse]])
@@ -134,6 +144,7 @@ async def create_product(
         product = Product(**data)
         await product.create()
         created_products.append(product)
+    invalidate_storefront_categories(organization_id)
     
     # Return single object if input was single, else return list
     return created_products[0] if not isinstance(product_in, list) else created_products
@@ -155,7 +166,7 @@ async def create_products_bulk(
 async def read_product(
     product_id: str,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get product by ID within an organization.
@@ -220,21 +231,23 @@ async def update_product(
     if "organization_id" in update_data:
         del update_data["organization_id"]
 
-    # Apply updates to the product object
-    for key, value in update_data.items():
-        if key == "variants" and value is not None:
-            from models.product import ProductVariant
-            value = [ProductVariant(**v) if isinstance(v, dict) else v for v in value]
-        setattr(product, key, value)
-    
-    # Recalculate status
-    total_stock = sum(v.stock for v in product.variants)
+    if "variants" in update_data and update_data["variants"] is not None:
+        update_data["variants"] = [ProductVariant(**v) for v in update_data["variants"]]
+
+    # Only the sent fields: stock movements and review moderation may have changed
+    # the product since it was loaded, and their server-side updates must survive
+    org_id = product.organization_id
+    await product.set({**update_data, "updated_at": datetime.utcnow()})
+    await refresh_stock_status(org_id, [obj_id], default_reorder_point=10)
+    product = await Product.get(obj_id)
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    total_stock = product.total_stock
     effective_reorder_point = product.reorder_point if product.reorder_point is not None else 10
     product_id_str = str(product.id)
-    org_id = product.organization_id
 
-    if total_stock == 0:
-        product.status = ProductStatus.OUT_OF_STOCK
+    if product.status == ProductStatus.OUT_OF_STOCK:
         existing = await Alert.find_one({
             "organization_id": org_id, "product_id": product_id_str,
             "type": AlertType.OUT_OF_STOCK, "is_dismissed": False,
@@ -247,8 +260,7 @@ async def update_product(
                 message=f"{product.name} has run out of stock.",
                 product_id=product_id_str, action_url="/Inventory",
             ).create()
-    elif total_stock <= effective_reorder_point:
-        product.status = ProductStatus.LOW_STOCK
+    elif product.status == ProductStatus.LOW_STOCK:
         existing = await Alert.find_one({
             "organization_id": org_id, "product_id": product_id_str,
             "type": AlertType.LOW_STOCK, "is_dismissed": False,
@@ -261,11 +273,8 @@ async def update_product(
                 message=f"{product.name} is at reorder point ({effective_reorder_point} units). Current stock: {total_stock}.",
                 product_id=product_id_str, action_url="/Inventory",
             ).create()
-    else:
-        product.status = ProductStatus.ACTIVE
-        
-    product.updated_at = datetime.utcnow()
-    await product.save()
+
+    invalidate_storefront_categories(product.organization_id)
     return product
 
 
@@ -300,6 +309,7 @@ async def delete_product(
             await delete_upload(v.image_url)
             
     await product.delete()
+    invalidate_storefront_categories(product.organization_id)
     return product
 
 
@@ -307,7 +317,7 @@ async def delete_product(
 async def get_aging_products(
     days_threshold: int = Query(default=30, description="Products not restocked in this many days"),
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get aging inventory: products not restocked in `days_threshold` days (or never restocked),
@@ -336,19 +346,12 @@ async def get_aging_products(
 @router.get("/low-stock/", response_model=List[ProductResponse])
 async def get_low_stock_products(
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get products that are at or below their reorder point.
     """
-    query: dict = {
-        "$expr": {
-            "$lte": [
-                {"$sum": "$variants.stock"},
-                "$reorder_point"
-            ]
-        }
-    }
+    query: dict = {"is_low_stock": True}
     if organization_id:
         query["organization_id"] = organization_id
         
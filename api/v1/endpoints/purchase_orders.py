@@ -1,32 +1,38 @@
 """PurchaseOrder endpoints"""
 from typing import List, Any, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel
 from beanie import PydanticObjectId
 from api import deps
+from api.pagination import list_page
+from api.projection import FIELDS_DESCRIPTION
 from models.user import User
 from models.purchase_order import PurchaseOrder, POItem, ShipmentEvent, POStatus
-from models.product import Product, StockRecord, ProductStatus
-from models.stock_movement import StockMovement, MovementType
+from models.product import ProductStatus
+from models.stock_movement import MovementType
 from schemas.purchase_order import PurchaseOrderCreate, PurchaseOrderUpdate, PurchaseOrderResponse
-from services.notification import send_order_update, send_low_stock_alert
-from services.notification_helpers import get_org_notification_recipients
+from services.notification import queue_low_stock_alert, queue_order_update
+from services.stock import StockChange, StockError, apply_stock_changes
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[PurchaseOrderResponse])
 async def read_purchase_orders(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     status: Optional[str] = None,
     supplier_id: Optional[str] = None,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Retrieve purchase orders. Filtered by organization for non-superadmins.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
     """
     query = {}
     if organization_id:
@@ -37,8 +43,10 @@ async def read_purchase_orders(
     if supplier_id:
         query["supplier_id"] = supplier_id
     
-    purchase_orders = await PurchaseOrder.find(query).skip(skip).limit(limit).to_list()
-    return purchase_orders
+    return await list_page(
+        PurchaseOrder, PurchaseOrderResponse, query, response,
+        fields=fields, cursor=cursor, skip=skip, limit=limit,
+    )
 
 
 @router.post("/", response_model=PurchaseOrderResponse)
@@ -76,7 +84,7 @@ async def create_purchase_order(
 async def read_purchase_order(
     po_id: str,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get purchase order by ID within an organization.
@@ -175,13 +183,7 @@ async def approve_purchase_order(
     await purchase_order.save()
     
     # Notify admins/managers about the approval
-    recipients = await get_org_notification_recipients(purchase_order.organization_id)
-    for recipient in recipients:
-        await send_order_update(
-            user=recipient,
-            order_number=purchase_order.po_number,
-            status="approved"
-        )
+    await queue_order_update(purchase_order.organization_id, purchase_order.po_number, "approved")
         
     return purchase_order
 
@@ -189,7 +191,7 @@ async def approve_purchase_order(
 @router.get("/stats/summary", response_model=dict)
 async def get_po_stats(
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get purchase order statistics for an organization.
@@ -240,105 +242,56 @@ async def receive_purchase_order(
     if purchase_order.status == "received":
         raise HTTPException(status_code=400, detail="Purchase order is already received")
     
-    # Update inventory for each item
+    # Update inventory for all items in one atomic batch; unknown products/variants are skipped
+    changes = []
     for item in purchase_order.items:
-        # Use organization_id from the PO itself for data consistency
-        product = await Product.find_one({
-            "_id": PydanticObjectId(item.product_id),
-            "organization_id": purchase_order.organization_id
-        })
-        
-        if product:
-            # Find the variant by SKU
-            variant_idx = -1
-            if item.sku:
-                item_sku_clean = item.sku.strip().upper()
-                for i, v in enumerate(product.variants):
-                    if v.sku.strip().upper() == item_sku_clean:
-                        variant_idx = i
-                        break
-            
-            # If SKU not found but only one variant, use that
-            if variant_idx == -1 and len(product.variants) == 1:
-                variant_idx = 0
-            
-            if variant_idx != -1:
-                # Update variant stock (total)
-                product.variants[variant_idx].stock += item.quantity_ordered
-                
-                # Update per-warehouse stock
-                dest_warehouse_id = item.location_id or purchase_order.warehouse_id
-                dest_warehouse_name = item.location_name or purchase_order.warehouse
-                
-                if dest_warehouse_id:
-                    # Find or create StockRecord
-                    found = False
-                    if not hasattr(product.variants[variant_idx], 'warehouse_stocks') or product.variants[variant_idx].warehouse_stocks is None:
-                        product.variants[variant_idx].warehouse_stocks = []
-                    
-                    for ws in product.variants[variant_idx].warehouse_stocks:
-                        if ws.warehouse_id == dest_warehouse_id:
-                            ws.stock += item.quantity_ordered
-                            found = True
-                            break
-                    
-                    if not found:
-                        product.variants[variant_idx].warehouse_stocks.append(
-                            StockRecord(
-                                warehouse_id=dest_warehouse_id,
-                                warehouse_name=dest_warehouse_name,
-                                stock=item.quantity_ordered
-                            )
-                        )
-                
-                # Update total status
-                total_stock = sum(v.stock for v in product.variants)
-                # Use a consistent default reorder point of 10 if not specified
-                effective_reorder_point = product.reorder_point if product.reorder_point is not None else 10
-                
-                if total_stock == 0:
-                    product.status = ProductStatus.OUT_OF_STOCK
-                elif total_stock <= effective_reorder_point:
-                    product.status = ProductStatus.LOW_STOCK
-                    # Trigger low stock alert
-                    recipients = await get_org_notification_recipients(purchase_order.organization_id)
-                    for recipient in recipients:
-                        await send_low_stock_alert(
-                            user=recipient,
-                            product_name=product.name,
-                            current_stock=total_stock,
-                            reorder_point=effective_reorder_point
-                        )
-                else:
-                    product.status = ProductStatus.ACTIVE
-                
-                # Update associations from PO
-                if item.expiry_date:
-                    product.expiry_date = item.expiry_date
-                
-                if purchase_order.warehouse_id:
-                    product.warehouse_id = purchase_order.warehouse_id
-                
-                if purchase_order.supplier_id:
-                    product.supplier_id = purchase_order.supplier_id
-                if purchase_order.supplier_name:
-                    product.supplier_name = purchase_order.supplier_name
+        # Update associations from PO
+        set_fields = {}
+        if item.expiry_date:
+            set_fields["expiry_date"] = item.expiry_date
+        if purchase_order.warehouse_id:
+            set_fields["warehouse_id"] = purchase_order.warehouse_id
+        if purchase_order.supplier_id:
+            set_fields["supplier_id"] = purchase_order.supplier_id
+        if purchase_order.supplier_name:
+            set_fields["supplier_name"] = purchase_order.supplier_name
 
-                product.updated_at = datetime.utcnow()
-                await product.save()
-                
-                # Create stock movement record
-                movement = StockMovement(
-                    organization_id=purchase_order.organization_id,
-                    product_id=item.product_id,
-                    product_name=product.name,
-                    sku=item.sku or product.variants[variant_idx].sku,
-                    type=MovementType.RECEIVED,
-                    quantity=item.quantity_ordered,
-                    reference=purchase_order.po_number,
-                    performed_by=str(current_user.id)
-                )
-                await movement.create()
+        changes.append(StockChange(
+            product_id=item.product_id,
+            sku=item.sku,
+            quantity=item.quantity_ordered,
+            movement_type=MovementType.RECEIVED,
+            # Per-warehouse stock
+            warehouse_id=item.location_id or purchase_order.warehouse_id,
+            warehouse_name=item.location_name or purchase_order.warehouse,
+            set_fields=set_fields,
+            movement_fields={"sku": item.sku} if item.sku else {},
+        ))
+
+    # Use organization_id from the PO itself for data consistency
+    try:
+        batch = await apply_stock_changes(
+            purchase_order.organization_id,
+            changes,
+            reference=purchase_order.po_number,
+            performed_by=str(current_user.id),
+            # Use a consistent default reorder point of 10 if not specified
+            default_reorder_point=10,
+            case_insensitive_sku=True,
+            skip_missing=True,
+        )
+    except StockError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    # Trigger low stock alerts
+    for product in batch.products.values():
+        if product.status == ProductStatus.LOW_STOCK:
+            await queue_low_stock_alert(
+                purchase_order.organization_id,
+                product_name=product.name,
+                current_stock=product.total_stock,
+                reorder_point=product.reorder_point if product.reorder_point is not None else 10
+            )
 
     # Update PO status
     purchase_order.status = POStatus.RECEIVED
@@ -351,14 +304,8 @@ async def receive_purchase_order(
     await purchase_order.save()
     
     # Notify about receiving the order
-    recipients = await get_org_notification_recipients(purchase_order.organization_id)
-    for recipient in recipients:
-        await send_order_update(
-            user=recipient,
-            order_number=purchase_order.po_number,
-            status="received"
-        )
-        
+    await queue_order_update(purchase_order.organization_id, purchase_order.po_number, "received")
+
     return purchase_order
 
 
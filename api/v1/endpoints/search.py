@@ -23,7 +23,7 @@ async def general_search(
     q: str = Query(..., min_length=1, description="Search query"),
     limit: int = 20,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     General search across Products, Vendors, and Suppliers.
@@ -1,15 +1,16 @@
 """StockMovement endpoints"""
 from typing import List, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from beanie import PydanticObjectId
 from api import deps
+from api.pagination import list_page
+from api.projection import FIELDS_DESCRIPTION
 from models.user import User
 from models.stock_movement import StockMovement
-from models.product import Product
+from models.product import ProductStatus
 from schemas.stock_movement import StockMovementCreate, StockMovementResponse
-from datetime import datetime
-from services.notification import send_low_stock_alert
-from services.notification_helpers import get_org_notification_recipients
+from services.notification import queue_low_stock_alert
+from services.stock import StockChange, StockError, apply_stock_changes
 from models.alert import Alert, AlertType, AlertPriority
 
 router = APIRouter()
@@ -17,16 +18,20 @@ router = APIRouter()
 
 @router.get("/", response_model=List[StockMovementResponse])
 async def read_stock_movements(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     sort: Optional[str] = None,
     product_id: Optional[str] = None,
     movement_type: Optional[str] = None,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Retrieve stock movements. Filtered by organization for non-superadmins.
+    Pass the X-Next-Cursor response header back as `cursor` (with the same `sort`) to fetch the next page.
     """
     query = {}
     if organization_id:
@@ -37,14 +42,10 @@ async def read_stock_movements(
     if movement_type:
         query["type"] = movement_type
     
-    q = StockMovement.find(query)
-    if sort:
-        q = q.sort(sort)
-    else:
-        q = q.sort("-created_at")
-    
-    movements = await q.skip(skip).limit(limit).to_list()
-    return movements
+    return await list_page(
+        StockMovement, StockMovementResponse, query, response,
+        fields=fields, sort=sort, default_sort="-created_at", cursor=cursor, skip=skip, limit=limit,
+    )
 
 
 @router.post("/", response_model=StockMovementResponse)
@@ -60,54 +61,38 @@ async def create_stock_movement(
     if organization_id:
         data["organization_id"] = organization_id
 
-    # Get the product
-    product = await Product.find_one({
-        "_id": PydanticObjectId(movement_in.product_id),
-        "organization_id": data["organization_id"]
-    })
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    
-    # Find the variant if SKU is provided
-    variant = None
-    variant_idx = -1
-    if movement_in.sku:
-        for i, v in enumerate(product.variants):
-            if v.sku == movement_in.sku:
-                variant = v
-                variant_idx = i
-                break
-    
-    if not variant and len(product.variants) == 1:
-        variant = product.variants[0]
-        variant_idx = 0
-    elif not variant and len(product.variants) > 1:
-        raise HTTPException(status_code=400, detail="SKU is required for products with multiple variants")
-    elif not variant and len(product.variants) == 0:
-         raise HTTPException(status_code=400, detail="Product has no variants")
-
-    # Calculate new stock based on movement type
+    # Calculate stock change based on movement type
     change = movement_in.quantity
     if movement_in.type in ["received", "returned"]:
         change = abs(movement_in.quantity)
     elif movement_in.type in ["dispatched"]:
         change = -abs(movement_in.quantity)
-    
-    new_stock = variant.stock + change
-    if new_stock < 0:
-        raise HTTPException(status_code=400, detail="Insufficient stock for this variant")
-    
-    # Update variant stock
-    product.variants[variant_idx].stock = new_stock
-    product.updated_at = datetime.utcnow()
-    
-    # Update status based on total quantity
+
     org_id = data["organization_id"]
-    total_stock = sum(v.stock for v in product.variants)
+    try:
+        batch = await apply_stock_changes(
+            org_id,
+            [StockChange(
+                product_id=movement_in.product_id,
+                sku=movement_in.sku,
+                quantity=change,
+                movement_type=movement_in.type,
+                movement_fields={
+                    field: data[field]
+                    for field in ("quantity", "from_location", "to_location", "reference", "notes")
+                },
+            )],
+            performed_by=str(current_user.id),
+        )
+    except StockError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    movement = batch.movements[0]
+    product = batch.products[movement.product_id]
+    total_stock = product.total_stock
     product_id_str = str(product.id)
 
-    if total_stock == 0:
-        product.status = "out_of_stock"
+    if product.status == ProductStatus.OUT_OF_STOCK:
         # Create in-app critical alert (deduped)
         existing = await Alert.find_one({
             "organization_id": org_id,
@@ -126,16 +111,13 @@ async def create_stock_movement(
                 action_url=f"/Inventory",
             ).create()
         # Email admins
-        recipients = await get_org_notification_recipients(org_id)
-        for recipient in recipients:
-            await send_low_stock_alert(
-                user=recipient,
-                product_name=product.name,
-                current_stock=total_stock,
-                reorder_point=product.reorder_point or 0
-            )
-    elif total_stock <= (product.reorder_point or 0):
-        product.status = "low_stock"
+        await queue_low_stock_alert(
+            org_id,
+            product_name=product.name,
+            current_stock=total_stock,
+            reorder_point=product.reorder_point or 0
+        )
+    elif product.status == ProductStatus.LOW_STOCK:
         # Create in-app high alert (deduped)
         existing = await Alert.find_one({
             "organization_id": org_id,
@@ -154,26 +136,13 @@ async def create_stock_movement(
                 action_url=f"/Inventory",
             ).create()
         # Email admins
-        recipients = await get_org_notification_recipients(org_id)
-        for recipient in recipients:
-            await send_low_stock_alert(
-                user=recipient,
-                product_name=product.name,
-                current_stock=total_stock,
-                reorder_point=product.reorder_point or 0
-            )
-    else:
-        product.status = "active"
+        await queue_low_stock_alert(
+            org_id,
+            product_name=product.name,
+            current_stock=total_stock,
+            reorder_point=product.reorder_point or 0
+        )
 
-    await product.save()
-    
-    # Create movement record
-    data["product_name"] = product.name
-    data["sku"] = variant.sku
-    data["performed_by"] = str(current_user.id)
-    
-    movement = StockMovement(**data)
-    await movement.create()
     return movement
 
 
@@ -181,7 +150,7 @@ async def create_stock_movement(
 async def read_stock_movement(
     movement_id: str,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get stock movement by ID within an organization.
@@ -199,10 +168,12 @@ async def read_stock_movement(
 @router.get("/product/{product_id}/history", response_model=List[StockMovementResponse])
 async def get_product_movement_history(
     product_id: str,
+    response: Response,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = None,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get stock movement history for a specific product.
@@ -211,5 +182,7 @@ async def get_product_movement_history(
     if organization_id:
         query["organization_id"] = organization_id
         
-    movements = await StockMovement.find(query).sort("-created_at").skip(skip).limit(limit).to_list()
-    return movements
+    return await list_page(
+        StockMovement, StockMovementResponse, query, response,
+        default_sort="-created_at", cursor=cursor, skip=skip, limit=limit,
+    )
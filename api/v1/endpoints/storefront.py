@@ -5,23 +5,23 @@ from datetime import datetime
 from fastapi import APIRouter, HTTPException, Query
 from beanie import PydanticObjectId
 
-from models.platform_settings import PlatformSettings
 from models.storefront_config import StorefrontConfig
 from models.product import Product
 from models.product_review import ProductReview
 from models.storefront_order import StorefrontOrder, StorefrontOrderItem
-from models.category import Category
 from models.warehouse import Warehouse
 from models.location import Location
 from models.alert import Alert, AlertType, AlertPriority
 from schemas.product_review import ReviewCreate, ReviewResponse
 from schemas.storefront_order import StorefrontOrderCreate, StorefrontOrderResponse
+from services.storefront_catalog import find_storefront_products, plan_storefront_products, storefront_categories
+from services.storefront_config import get_config_by_slug, get_platform_settings
 
 router = APIRouter()
 
 
 async def _get_config_by_slug(slug: str) -> StorefrontConfig:
-    config = await StorefrontConfig.find_one({"slug": slug})
+    config = await get_config_by_slug(slug)
     if not config:
         raise HTTPException(status_code=404, detail="Store not found")
     return config
@@ -31,7 +31,7 @@ async def _get_config_by_slug(slug: str) -> StorefrontConfig:
 async def get_storefront(slug: str) -> Any:
     """Get storefront configuration by slug (public)."""
     config = await _get_config_by_slug(slug)
-    platform_settings = await PlatformSettings.find_one()
+    platform_settings = await get_platform_settings()
     default_hero = platform_settings.default_hero_image if platform_settings else None
     allowed_payments = platform_settings.allowed_payment_methods if platform_settings else [
         "momo",
@@ -66,61 +66,17 @@ async def get_storefront_products(
     config = await _get_config_by_slug(slug)
     org_id = config.organization_id
 
-    query: dict = {"organization_id": org_id, "status": {"$ne": "discontinued"}}
-
-    if search:
-        query["$or"] = [
-            {"name": {"$regex": search, "$options": "i"}},
-            {"description": {"$regex": search, "$options": "i"}},
-            {"variants.sku": {"$regex": search, "$options": "i"}},
-        ]
-
-    if category:
-        query["category"] = category
-
-    if location:
-        location_query = {"$or": [{"location_id": location}, {"warehouse_id": location}]}
-        if "$or" in query:
-            existing_or = query.pop("$or")
-            query["$and"] = [{"$or": existing_or}, location_query]
-        else:
-            query.update(location_query)
-
-    products = await Product.find(query).skip(skip).limit(limit).to_list()
-
-    # Price filtering (post-query since price is in variants)
-    if min_price is not None or max_price is not None:
-        filtered = []
-        for p in products:
-            if not p.variants:
-                continue
-            lowest = min(v.unit_price for v in p.variants)
-            if min_price is not None and lowest < min_price:
-                continue
-            if max_price is not None and lowest > max_price:
-                continue
-            filtered.append(p)
-        products = filtered
-
-    # Sorting
-    if sort == "price_asc":
-        products.sort(key=lambda p: min((v.unit_price for v in p.variants), default=0))
-    elif sort == "price_desc":
-        products.sort(key=lambda p: min((v.unit_price for v in p.variants), default=0), reverse=True)
-    elif sort == "name_asc":
-        products.sort(key=lambda p: p.name.lower())
-    elif sort == "name_desc":
-        products.sort(key=lambda p: p.name.lower(), reverse=True)
-    elif sort == "newest":
-        products.sort(key=lambda p: p.created_at, reverse=True)
-    elif sort == "featured":
-        # Prioritize featured products
-        featured_ids = config.featured_product_ids or []
-        products.sort(key=lambda p: (0 if str(p.id) in featured_ids else 1, p.created_at), reverse=False)
-    elif sort == "best_selling":
-        # Proxy: sort by a mix of rating and review count (we don't have orders count on product easily)
-        # We'll calculate it on the fly below or just use a placeholder
-        pass # Will handle after computing fields
+    plan = plan_storefront_products(
+        org_id,
+        search=search,
+        category=category,
+        location=location,
+        min_price=min_price,
+        max_price=max_price,
+        sort=sort or "newest",
+        featured_product_ids=config.featured_product_ids,
+    )
+    products, total = await find_storefront_products(plan, skip, limit)
 
     # Fetch locations and warehouses for mapping
     warehouses = await Warehouse.find({"organization_id": org_id}).to_list()
@@ -155,10 +111,6 @@ async def get_storefront_products(
             
         lowest_price = min((v["unit_price"] for v in variants_dump), default=0) if variants_dump else 0
 
-        reviews = await ProductReview.find({"product_id": str(p.id), "is_approved": True}).to_list()
-        avg_rating = round(sum(r.rating for r in reviews) / len(reviews), 1) if reviews else 0
-        review_count = len(reviews)
-
         location_name = None
         if getattr(p, "warehouse_id", None) and p.warehouse_id in warehouse_map:
             location_name = warehouse_map[p.warehouse_id]
@@ -176,16 +128,13 @@ async def get_storefront_products(
             "total_stock": total_stock,
             "original_price": original_price,
             "lowest_price": lowest_price,
-            "avg_rating": avg_rating,
-            "review_count": review_count,
+            "avg_rating": round(p.avg_rating, 1),
+            "review_count": p.rating_count,
             "location_name": location_name,
             "created_at": p.created_at.isoformat(),
         })
 
-    if sort == "best_selling":
-        result.sort(key=lambda x: (x["avg_rating"], x["review_count"]), reverse=True)
-
-    return {"products": result, "total": len(result)}
+    return {"products": result, "total": total}
 
 
 @router.get("/{slug}/products/{product_id}")
@@ -206,7 +155,6 @@ async def get_storefront_product(slug: str, product_id: str) -> Any:
     reviews = await ProductReview.find(
         {"product_id": product_id, "is_approved": True}
     ).sort("-created_at").to_list()
-    avg_rating = round(sum(r.rating for r in reviews) / len(reviews), 1) if reviews else 0
 
     total_stock = sum(v.stock for v in product.variants)
 
@@ -241,8 +189,8 @@ async def get_storefront_product(slug: str, product_id: str) -> Any:
         "total_stock": total_stock,
         "original_price": original_price,
         "lowest_price": lowest_price,
-        "avg_rating": avg_rating,
-        "review_count": len(reviews),
+        "avg_rating": round(product.avg_rating, 1),
+        "review_count": product.rating_count,
         "reviews": [
             {
                 "id": str(r.id),
@@ -262,26 +210,7 @@ async def get_storefront_product(slug: str, product_id: str) -> Any:
 async def get_storefront_categories(slug: str) -> Any:
     """List categories for a storefront (public)."""
     config = await _get_config_by_slug(slug)
-    categories = await Category.find({"organization_id": config.organization_id}).to_list()
-
-    result = []
-    for cat in categories:
-        # Count products in category
-        count = await Product.find({
-            "organization_id": config.organization_id,
-            "category": cat.name,
-            "status": {"$ne": "discontinued"},
-        }).count()
-        result.append({
-            "id": str(cat.id),
-            "name": cat.name,
-            "description": cat.description,
-            "color": cat.color,
-            "icon": cat.icon,
-            "product_count": count,
-        })
-
-    return result
+    return await storefront_categories(config.organization_id)
 
 
 @router.get("/{slug}/locations")
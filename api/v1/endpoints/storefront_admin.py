@@ -3,9 +3,10 @@ import os
 import uuid
 from typing import List, Any, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Response
 
 from api import deps
+from api.pagination import paginate
 from core.uploads import build_upload_url, get_upload_dir
 from models.user import User
 from models.platform_settings import PlatformSettings
@@ -13,6 +14,12 @@ from models.storefront_config import StorefrontConfig, ThemeConfig, HeroSlide, S
 from models.product_review import ProductReview
 from models.storefront_order import StorefrontOrder, StorefrontOrderStatus
 from schemas.storefront_config import StorefrontConfigCreate, StorefrontConfigUpdate
+from services.product_ratings import apply_rating_change
+from services.storefront_config import (
+    get_config_for_organization,
+    get_platform_settings,
+    invalidate_storefront_config,
+)
 from services.stripe import StripeService
 
 router = APIRouter()
@@ -20,7 +27,7 @@ router = APIRouter()
 
 @router.get("/config")
 async def get_storefront_config(
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """Get own organization's storefront config."""
     import json
@@ -28,12 +35,12 @@ async def get_storefront_config(
     if not org_id:
         raise HTTPException(status_code=400, detail="No organization associated with user")
 
-    config = await StorefrontConfig.find_one({"organization_id": org_id})
+    config = await get_config_for_organization(org_id)
     if not config:
         return None
 
     # Inject platform-level allowed payment methods so the frontend can filter options
-    platform_settings = await PlatformSettings.find_one()
+    platform_settings = await get_platform_settings()
     platform_allowed = platform_settings.allowed_payment_methods if platform_settings else ["mtn", "orange", "stripe"]
 
     # Use model_dump_json to safely serialize ObjectId/_id fields, then parse back to dict
@@ -61,7 +68,7 @@ async def update_storefront_config(
         # Update existing
         update_data = config_in.model_dump(exclude_unset=True)
 
-        platform_settings = await PlatformSettings.find_one()
+        platform_settings = await get_platform_settings()
         if not platform_settings:
             platform_settings = PlatformSettings()
         allowed_methods = platform_settings.allowed_payment_methods or []
@@ -107,8 +114,10 @@ async def update_storefront_config(
             if existing:
                 raise HTTPException(status_code=400, detail="This slug is already taken")
 
+        previous_slug = config.slug
         await config.update({"$set": update_data})
         await config.save()
+        invalidate_storefront_config(config, previous_slug)
         return config
     else:
         # Create new
@@ -123,7 +132,7 @@ async def update_storefront_config(
         if existing:
             raise HTTPException(status_code=400, detail="This slug is already taken")
 
-        platform_settings = await PlatformSettings.find_one()
+        platform_settings = await get_platform_settings()
         if not platform_settings:
             platform_settings = PlatformSettings()
         allowed_methods = platform_settings.allowed_payment_methods or []
@@ -156,6 +165,7 @@ async def update_storefront_config(
             **data,
         )
         await config.create()
+        invalidate_storefront_config(config)
         return config
 
 
@@ -183,6 +193,7 @@ async def connect_stripe_account(
             account_id = StripeService.create_connect_account()
             config.stripe_account_id = account_id
             await config.save()
+            invalidate_storefront_config(config)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to create Stripe account: {str(e)}")
 
@@ -195,7 +206,7 @@ async def connect_stripe_account(
 
 @router.get("/config/stripe/status")
 async def check_stripe_status(
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """Check the Stripe Connect onboarding status and update config."""
     org_id = current_user.organization_id
@@ -210,6 +221,7 @@ async def check_stripe_status(
     if is_enabled != config.stripe_charges_enabled:
         config.stripe_charges_enabled = is_enabled
         await config.save()
+        invalidate_storefront_config(config)
 
     return {
         "stripe_account_id": config.stripe_account_id,
@@ -246,10 +258,12 @@ async def upload_storefront_image(
 
 @router.get("/reviews")
 async def list_reviews(
+    response: Response,
     is_approved: Optional[bool] = None,
     skip: int = 0,
     limit: int = 50,
-    current_user: User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """List all reviews for the organization (for moderation)."""
     org_id = current_user.organization_id
@@ -260,7 +274,10 @@ async def list_reviews(
     if is_approved is not None:
         query["is_approved"] = is_approved
 
-    reviews = await ProductReview.find(query).sort("-created_at").skip(skip).limit(limit).to_list()
+    reviews = await paginate(
+        ProductReview, query, response,
+        default_sort="-created_at", cursor=cursor, skip=skip, limit=limit,
+    )
     return reviews
 
 
@@ -284,12 +301,18 @@ async def approve_review(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid review ID")
 
-    review = await ProductReview.find_one({"_id": obj_id, "organization_id": org_id})
-    if not review:
-        raise HTTPException(status_code=404, detail="Review not found")
-
-    review.is_approved = approve
-    await review.save()
+    # Flip is_approved only if it changes, so the product's rating is adjusted exactly once
+    doc = await ProductReview.get_motor_collection().find_one_and_update(
+        {"_id": obj_id, "organization_id": org_id, "is_approved": not approve},
+        {"$set": {"is_approved": approve}},
+    )
+    if doc:
+        review = ProductReview.model_validate(doc)
+        await apply_rating_change(review.product_id, review.rating, 1 if approve else -1)
+    else:
+        review = await ProductReview.find_one({"_id": obj_id, "organization_id": org_id})
+        if not review:
+            raise HTTPException(status_code=404, detail="Review not found")
 
     return {"message": f"Review {'approved' if approve else 'rejected'}", "id": str(review.id)}
 
@@ -310,20 +333,24 @@ async def delete_review(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid review ID")
 
-    review = await ProductReview.find_one({"_id": obj_id, "organization_id": org_id})
-    if not review:
+    doc = await ProductReview.get_motor_collection().find_one_and_delete({"_id": obj_id, "organization_id": org_id})
+    if not doc:
         raise HTTPException(status_code=404, detail="Review not found")
 
-    await review.delete()
+    review = ProductReview.model_validate(doc)
+    if review.is_approved:
+        await apply_rating_change(review.product_id, review.rating, -1)
     return {"message": "Review deleted"}
 
 
 @router.get("/orders")
 async def list_storefront_orders(
+    response: Response,
     status: Optional[str] = None,
     skip: int = 0,
     limit: int = 50,
-    current_user: User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """List storefront orders for the organization."""
     org_id = current_user.organization_id
@@ -334,7 +361,10 @@ async def list_storefront_orders(
     if status:
         query["status"] = status
 
-    orders = await StorefrontOrder.find(query).sort("-created_at").skip(skip).limit(limit).to_list()
+    orders = await paginate(
+        StorefrontOrder, query, response,
+        default_sort="-created_at", cursor=cursor, skip=skip, limit=limit,
+    )
     return orders
 
 
@@ -18,7 +18,7 @@ async def read_suppliers(
     status: Optional[str] = None,
     search: Optional[str] = None,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Retrieve suppliers. Filtered by organization for non-superadmins.
@@ -82,7 +82,7 @@ async def create_supplier(
 async def read_supplier(
     supplier_id: str,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get supplier by ID within an organization.
@@ -7,9 +7,14 @@ from api import deps
 from models.user import User
 from schemas.user import UserCreate, UserUpdate, UserResponse
 from core import security
+from core.cache import user_cache
+from services.notification_helpers import invalidate_notification_recipients
 
 router = APIRouter()
 
+# User fields embedded in claims-bearing access tokens
+TOKEN_CLAIM_FIELDS = ("is_active", "role", "user_type", "organization_id")
+
 
 @router.get("/", response_model=List[UserResponse])
 async def read_users(
@@ -18,7 +23,7 @@ async def read_users(
     role: Optional[str] = None,
     status: Optional[str] = None,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Retrieve users. Filtered by organization for non-superadmins.
@@ -74,12 +79,13 @@ async def create_user(
     else:
         user_data = user_in.model_dump(exclude={"password"})
 
-    user_data["hashed_password"] = security.get_password_hash(user_in.password)
+    user_data["hashed_password"] = await security.get_password_hash_async(user_in.password)
     user_data["invited_by"] = str(current_user.id)
     user_data["invited_at"] = datetime.utcnow()
     
     user = User(**user_data)
     await user.create()
+    invalidate_notification_recipients(user.organization_id)
     return user
 
 
@@ -87,7 +93,7 @@ async def create_user(
 async def read_user(
     user_id: str,
     organization_id: Optional[str] = Query(None, description="Organization ID"),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get user by ID. Platform staff can access any user.
@@ -152,13 +158,26 @@ async def update_user(
     
     # Handle password update separately
     if "password" in update_data and update_data["password"]:
-        update_data["hashed_password"] = security.get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = await security.get_password_hash_async(update_data.pop("password"))
     elif "password" in update_data:
         del update_data["password"]
     
+    # Revoke outstanding access tokens when anything carried in their claims changes
+    revokes_tokens = "hashed_password" in update_data or any(
+        field in update_data and update_data[field] != getattr(user, field)
+        for field in TOKEN_CLAIM_FIELDS
+    )
+    if revokes_tokens:
+        update_data["token_version"] = user.token_version + 1
+
+    previous_organization_id = user.organization_id
     update_data["updated_at"] = datetime.utcnow()
     await user.update({"$set": update_data})
     await user.save()
+    user_cache.invalidate(str(user.id))
+    invalidate_notification_recipients(previous_organization_id, user.organization_id)
+    if revokes_tokens:
+        security.revoke_user_tokens(str(user.id), update_data["token_version"])
     return user
 
 
@@ -189,4 +208,7 @@ async def delete_user(
         raise HTTPException(status_code=400, detail="Cannot delete your own account")
     
     await user.delete()
+    user_cache.invalidate(str(user.id))
+    invalidate_notification_recipients(user.organization_id)
+    security.revoke_user_tokens(str(user.id), user.token_version + 1)
     return user
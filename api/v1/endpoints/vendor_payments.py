@@ -1,9 +1,11 @@
 """VendorPayment endpoints"""
 from typing import List, Any, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from beanie import PydanticObjectId
 from api import deps
+from api.pagination import list_page
+from api.projection import FIELDS_DESCRIPTION
 from models.user import User
 from models.vendor_payment import VendorPayment
 from models.vendor import Vendor
@@ -14,16 +16,20 @@ router = APIRouter()
 
 @router.get("/", response_model=List[VendorPaymentResponse])
 async def read_vendor_payments(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     vendor_id: Optional[str] = None,
     status: Optional[str] = None,
     payment_type: Optional[str] = None,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Retrieve vendor payments. Filtered by organization for non-superadmins.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
     """
     query = {}
     if organization_id:
@@ -36,8 +42,10 @@ async def read_vendor_payments(
     if payment_type:
         query["payment_type"] = payment_type
     
-    payments = await VendorPayment.find(query).skip(skip).limit(limit).to_list()
-    return payments
+    return await list_page(
+        VendorPayment, VendorPaymentResponse, query, response,
+        fields=fields, cursor=cursor, skip=skip, limit=limit,
+    )
 
 
 @router.post("/", response_model=VendorPaymentResponse)
@@ -72,7 +80,7 @@ async def create_vendor_payment(
 async def read_vendor_payment(
     payment_id: str,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get vendor payment by ID within an organization.
@@ -189,10 +197,12 @@ async def confirm_vendor_payment(
 @router.get("/vendor/{vendor_id}/history", response_model=List[VendorPaymentResponse])
 async def get_vendor_payment_history(
     vendor_id: str,
+    response: Response,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = None,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get payment history for a specific vendor.
@@ -201,5 +211,7 @@ async def get_vendor_payment_history(
     if organization_id:
         query["organization_id"] = organization_id
 
-    payments = await VendorPayment.find(query).sort("-created_at").skip(skip).limit(limit).to_list()
-    return payments
+    return await list_page(
+        VendorPayment, VendorPaymentResponse, query, response,
+        default_sort="-created_at", cursor=cursor, skip=skip, limit=limit,
+    )
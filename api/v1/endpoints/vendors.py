@@ -21,7 +21,7 @@ async def read_vendors(
     user_id: Optional[str] = None,
     search: Optional[str] = None,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Retrieve vendors. Filtered by organization for non-superadmins.
@@ -82,7 +82,7 @@ async def create_vendor(
 async def read_vendor_by_user(
     user_id: str,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get vendor by User ID within an organization.
@@ -101,7 +101,7 @@ async def read_vendor_by_user(
 async def read_vendor(
     vendor_id: str,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get vendor by ID within an organization.
@@ -168,7 +168,7 @@ async def delete_vendor(
 @router.get("/stats/summary", response_model=dict)
 async def get_vendor_stats(
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get vendor statistics for an organization.
@@ -17,7 +17,7 @@ async def read_warehouses(
     limit: int = 100,
     status: Optional[str] = None,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Retrieve warehouses. Filtered by organization for non-superadmins.
@@ -64,7 +64,7 @@ async def create_warehouse(
 async def read_warehouse(
     warehouse_id: str,
     organization_id: Optional[str] = Depends(deps.get_organization_id),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: User = Depends(deps.get_current_active_principal),
 ) -> Any:
     """
     Get warehouse by ID within an organization.
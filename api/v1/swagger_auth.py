@@ -24,7 +24,7 @@ async def get_swagger_auth(credentials: HTTPBasicCredentials = Depends(security_
         )
     
     # Verify password
-    if not security.verify_password(credentials.password, user.hashed_password):
+    if not await security.verify_password_async(credentials.password, user.hashed_password):
          raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -0,0 +1,111 @@
+"""Small in-process LRU/TTL caches for hot lookups"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from core.config import settings
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries also expire after `ttl_seconds`.
+    Not shared between worker processes, so keep the TTL short.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl_seconds: float):
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+user_cache = TTLCache("users", settings.AUTH_CACHE_MAX_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+organization_cache = TTLCache("organizations", settings.AUTH_CACHE_MAX_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+notification_recipient_cache = TTLCache(
+    "notification_recipients",
+    settings.AUTH_CACHE_MAX_SIZE,
+    settings.NOTIFICATION_RECIPIENT_CACHE_TTL_SECONDS,
+)
+# ("slug", slug) / ("organization", organization_id) -> StorefrontConfig
+storefront_config_cache = TTLCache(
+    "storefront_configs",
+    settings.AUTH_CACHE_MAX_SIZE,
+    settings.STOREFRONT_CACHE_TTL_SECONDS,
+)
+platform_settings_cache = TTLCache("platform_settings", 1, settings.STOREFRONT_CACHE_TTL_SECONDS)
+# organization_id -> storefront category list with product counts
+storefront_category_cache = TTLCache(
+    "storefront_categories",
+    settings.AUTH_CACHE_MAX_SIZE,
+    settings.STOREFRONT_CACHE_TTL_SECONDS,
+)
+# user_id -> lowest token_version still accepted; entries only need to outlive the claims tokens
+revoked_token_versions = TTLCache(
+    "revoked_token_versions",
+    settings.AUTH_CACHE_MAX_SIZE,
+    settings.ACCESS_TOKEN_CLAIMS_EXPIRE_MINUTES * 60,
+)
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {
+        cache.name: cache.stats()
+        for cache in (
+            user_cache,
+            organization_cache,
+            notification_recipient_cache,
+            storefront_config_cache,
+            platform_settings_cache,
+            storefront_category_cache,
+            revoked_token_versions,
+        )
+    }
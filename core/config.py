@@ -19,6 +19,42 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "CHANGE_THIS_TO_A_SECURE_SECRET_KEY_IN_PRODUCTION"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440 # 1 day
+    # Embed user_type/role/org/is_active in access tokens so read-only routes skip the user lookup.
+    # Revocation is tracked per process, so these tokens get a much shorter lifetime.
+    ACCESS_TOKEN_CLAIMS: bool = False
+    ACCESS_TOKEN_CLAIMS_EXPIRE_MINUTES: int = 15
+
+    # bcrypt thread pool: calls beyond WORKERS + MAX_QUEUE are rejected with 503
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+
+    # Serve list endpoints from raw Motor reads with orjson, skipping pydantic validation
+    FAST_JSON_RESPONSES: bool = False
+
+    # Maximum rows accepted by POST /sales/bulk (offline POS sync)
+    SALES_BULK_MAX_ROWS: int = 1000
+
+    # Background jobs (outbox_jobs): worker tasks per process, 0 only enqueues (another process delivers)
+    JOB_WORKERS: int = 2
+    JOB_POLL_INTERVAL_SECONDS: int = 5
+    JOB_LEASE_SECONDS: int = 300
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: int = 30
+    JOB_RETRY_MAX_SECONDS: int = 3600
+    # Low stock alerts per organization are gathered this long into one digest email (0 sends each alert)
+    LOW_STOCK_DIGEST_WINDOW_SECONDS: int = 300
+
+    # In-process cache for authenticated users/organizations (0 disables)
+    AUTH_CACHE_MAX_SIZE: int = 10000
+    AUTH_CACHE_TTL_SECONDS: float = 30
+    # Admins/managers notified per organization; invalidated locally on user writes, so other processes may lag by the TTL
+    NOTIFICATION_RECIPIENT_CACHE_TTL_SECONDS: float = 300
+    # Storefront configs (by slug / organization) and platform settings; writes invalidate locally,
+    # the TTL bounds staleness in other workers (0 disables)
+    STOREFRONT_CACHE_TTL_SECONDS: float = 30
+
+    # Background subscription expiry scan (0 disables; run scripts/scan_subscription_expiry.py via cron instead)
+    SUBSCRIPTION_SCAN_INTERVAL_MINUTES: int = 60
     
     # CORS
     BACKEND_CORS_ORIGINS: Union[List[str], str] = []
@@ -46,6 +82,9 @@ class Settings(BaseSettings):
     MAIL_SSL_TLS: bool = False
     USE_CREDENTIALS: bool = True
     VALIDATE_CERTS: bool = True
+    # Reused SMTP connections (0 opens a new connection per message)
+    SMTP_POOL_SIZE: int = 4
+    SMTP_POOL_IDLE_TIMEOUT_SECONDS: int = 60
 
     # PayUnit
     PAYUNIT_API_KEY: str = ""
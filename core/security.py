@@ -1,8 +1,13 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Any, Callable, Dict, Optional, Union
+from fastapi import HTTPException, status
 from jose import jwt
 import bcrypt
 from core.config import settings
+from core.cache import revoked_token_versions
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
@@ -10,22 +15,130 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
-def create_access_token(subject: Union[str, int], expires_delta: Optional[timedelta] = None) -> str:
+
+# bcrypt is deliberately slow (~250ms); run it off the event loop on a small
+# dedicated pool and shed load once too many calls are waiting for a thread.
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_password_stats = {"in_flight": 0, "completed": 0, "rejected": 0}
+_password_stats_lock = threading.Lock()  # also updated from the pool's threads
+
+
+def _password_task_done(future: Future) -> None:
+    # The slot is held until the thread is done, even if the awaiting request was cancelled
+    with _password_stats_lock:
+        _password_stats["in_flight"] -= 1
+        if not future.cancelled() and future.exception() is None:
+            _password_stats["completed"] += 1
+
+
+async def _run_password_task(func: Callable[..., Any], *args: Any) -> Any:
+    with _password_stats_lock:
+        queued = _password_stats["in_flight"] - settings.PASSWORD_HASH_WORKERS
+        if queued >= settings.PASSWORD_HASH_MAX_QUEUE:
+            _password_stats["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        _password_stats["in_flight"] += 1
+
+    future = _password_executor.submit(func, *args)
+    future.add_done_callback(_password_task_done)
+    return await asyncio.wrap_future(future)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_task(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_password_task(get_password_hash, password)
+
+
+def password_hash_stats() -> Dict[str, int]:
+    with _password_stats_lock:
+        stats = dict(_password_stats)
+    return {
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "max_queue": settings.PASSWORD_HASH_MAX_QUEUE,
+        "in_flight": stats["in_flight"],
+        "queue_depth": max(stats["in_flight"] - settings.PASSWORD_HASH_WORKERS, 0),
+        "completed": stats["completed"],
+        "rejected": stats["rejected"],
+    }
+
+def create_access_token(
+    subject: Union[str, int],
+    expires_delta: Optional[timedelta] = None,
+    claims: Optional[Dict[str, Any]] = None,
+) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode = {"exp": expire, "sub": str(subject)}
+    if claims:
+        to_encode.update(claims)
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def create_refresh_token(subject: Union[str, int], expires_delta: Optional[timedelta] = None) -> str:
+def user_token_claims(user: Any) -> Dict[str, Any]:
+    """Authorization claims embedded in access tokens when ACCESS_TOKEN_CLAIMS is on."""
+    return {
+        "user_type": user.user_type.value if hasattr(user.user_type, "value") else user.user_type,
+        "role": user.role.value if hasattr(user.role, "value") else user.role,
+        "org": user.organization_id,
+        "active": user.is_active,
+        "ver": user.token_version,
+    }
+
+
+def create_user_access_token(user: Any) -> str:
+    """Access token for `user`, carrying authorization claims if enabled."""
+    if not settings.ACCESS_TOKEN_CLAIMS:
+        return create_access_token(
+            str(user.id), expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        )
+    return create_access_token(
+        str(user.id),
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_CLAIMS_EXPIRE_MINUTES),
+        claims=user_token_claims(user),
+    )
+
+
+def access_token_max_age() -> int:
+    """Cookie max-age (seconds) matching the lifetime of tokens from create_user_access_token."""
+    if settings.ACCESS_TOKEN_CLAIMS:
+        return settings.ACCESS_TOKEN_CLAIMS_EXPIRE_MINUTES * 60
+    return settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+
+def revoke_user_tokens(user_id: str, token_version: int) -> None:
+    """Reject this worker's claims tokens for `user_id` older than `token_version`."""
+    revoked_token_versions.set(str(user_id), token_version)
+
+
+def is_token_version_revoked(user_id: str, token_version: int) -> bool:
+    min_version = revoked_token_versions.get(str(user_id))
+    return min_version is not None and token_version < min_version
+
+
+def create_refresh_token(
+    subject: Union[str, int],
+    expires_delta: Optional[timedelta] = None,
+    token_version: int = 0,
+) -> str:
+    """Refresh token carrying the user's token_version, so revocation also stops refreshes."""
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(days=2)
     
-    to_encode = {"exp": expire, "sub": str(subject), "type": "refresh"}
+    to_encode = {"exp": expire, "sub": str(subject), "type": "refresh", "ver": token_version}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
@@ -13,8 +13,10 @@ from models.vendor import Vendor
 from models.warehouse import Warehouse
 from models.purchase_order import PurchaseOrder
 from models.sale import Sale
+from models.sales_rollup import SalesDailyRollup
 from models.stock_movement import StockMovement
 from models.alert import Alert
+from models.outbox_job import JobLease, OutboxJob
 from models.vendor_payment import VendorPayment
 from models.location import Location
 from models.organization_payment import OrganizationPayment
@@ -64,8 +66,11 @@ async def init_db():
             Warehouse,
             PurchaseOrder,
             Sale,
+            SalesDailyRollup,
             StockMovement,
             Alert,
+            OutboxJob,
+            JobLease,
             VendorPayment,
             OrganizationPayment,
             Location,
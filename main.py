@@ -1,9 +1,11 @@
+import asyncio
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from core.config import settings
 from db.mongodb import init_db
+from api.pagination import NEXT_CURSOR_HEADER
 
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorGridFSBucket
 from gridfs.errors import NoFile
 from fastapi.openapi.docs import get_swagger_ui_html, get_redoc_html
@@ -13,9 +15,13 @@ from api.v1.swagger_auth import get_swagger_auth
 from middlewares.logging import LoggingMiddleware
 from core.uploads import UPLOAD_ROOT, get_upload_dir
 from db.mongodb import db
+from services.subscription_notifications import run_subscription_expiry_scheduler
+from services.jobs import start_job_workers
+from services.email import close_smtp_pool
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    default_response_class=ORJSONResponse if settings.FAST_JSON_RESPONSES else JSONResponse,
     docs_url=None,
     redoc_url=None,
     openapi_url=None
@@ -31,6 +37,7 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 else:
     app.add_middleware(
@@ -39,6 +46,7 @@ else:
         allow_credentials=False,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 
 # Protected Documentation Routes
@@ -85,9 +93,23 @@ async def get_gridfs_file(bucket_name: str, filename: str):
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+background_tasks = []
+
 @app.on_event("startup")
 async def startup_db_client():
     await init_db()
+    if settings.SUBSCRIPTION_SCAN_INTERVAL_MINUTES > 0:
+        background_tasks.append(
+            asyncio.create_task(run_subscription_expiry_scheduler(settings.SUBSCRIPTION_SCAN_INTERVAL_MINUTES))
+        )
+    if settings.JOB_WORKERS > 0:
+        background_tasks.extend(start_job_workers(settings.JOB_WORKERS))
+
+@app.on_event("shutdown")
+async def shutdown_background_tasks():
+    for task in background_tasks:
+        task.cancel()
+    await close_smtp_pool()
 
 @app.get("/")
 async def root():
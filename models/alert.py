@@ -2,6 +2,7 @@
 from typing import Annotated, Optional
 from datetime import datetime
 from beanie import Document, Indexed
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pydantic import Field
 from enum import Enum
 
@@ -44,3 +45,12 @@ class Alert(Document):
 
     class Settings:
         name = "alerts"
+        indexes = [
+            IndexModel([("organization_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("is_read", ASCENDING), ("is_dismissed", ASCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("type", ASCENDING), ("is_dismissed", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            # Low/out-of-stock alert de-duplication
+            IndexModel([("organization_id", ASCENDING), ("product_id", ASCENDING), ("type", ASCENDING), ("is_dismissed", ASCENDING)]),
+            # Subscription expiry scan looks alerts up by title
+            IndexModel([("organization_id", ASCENDING), ("title", ASCENDING)]),
+        ]
@@ -1,6 +1,7 @@
 from typing import Annotated, Optional
 from datetime import datetime
 from beanie import Document, Indexed
+from pymongo import ASCENDING, IndexModel
 from pydantic import Field
 
 class Category(Document):
@@ -14,3 +15,6 @@ class Category(Document):
 
     class Settings:
         name = "categories"
+        indexes = [
+            IndexModel([("organization_id", ASCENDING), ("name", ASCENDING)]),
+        ]
@@ -2,7 +2,7 @@
 from typing import Annotated, Optional, List, Dict, Any
 from datetime import datetime
 from beanie import Document, Indexed
-from pydantic import Field, EmailStr
+from pydantic import Field, EmailStr, BaseModel
 from enum import Enum
 
 
@@ -13,6 +13,20 @@ class OrganizationStatus(str, Enum):
     SUSPENDED = "suspended"
 
 
+class EntitlementStatus(str, Enum):
+    TRIALING = "trialing"
+    ACTIVE = "active"
+    EXPIRED = "expired"
+
+
+class OrganizationEntitlement(BaseModel):
+    """Materialized access window, refreshed when payments, approvals or trials change."""
+    status: EntitlementStatus = EntitlementStatus.EXPIRED
+    trial_ends_at: Optional[datetime] = None
+    subscription_expires_at: Optional[datetime] = None
+    refreshed_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 class Organization(Document):
     name: Annotated[str, Indexed()]
     code: Annotated[str, Indexed(unique=True)]
@@ -32,6 +46,7 @@ class Organization(Document):
     billing_cycle: str = "monthly"  # "monthly" | "yearly"
     trial_ends_at: Optional[datetime] = None
     storage_capacity_kb: Optional[int] = None
+    entitlement: Optional[OrganizationEntitlement] = None
 
     # Backward-compatible fields (older naming)
     subscription_plan_id: Optional[str] = None
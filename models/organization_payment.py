@@ -4,6 +4,7 @@ from typing import Annotated, Optional
 from datetime import datetime
 
 from beanie import Document, Indexed
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from enum import Enum
 from pydantic import Field
 
@@ -58,4 +59,8 @@ class OrganizationPayment(Document):
 
     class Settings:
         name = "organization_payments"
+        indexes = [
+            IndexModel([("organization_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING)]),
+            IndexModel([("reference_number", ASCENDING)]),
+        ]
 
@@ -0,0 +1,56 @@
+"""OutboxJob model - Persistent background jobs (notification delivery, ...)"""
+from typing import Any, Dict, Optional
+from datetime import datetime
+from beanie import Document
+from pymongo import ASCENDING, IndexModel
+from pydantic import Field
+from enum import Enum
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class OutboxJob(Document):
+    kind: str  # handler name, see services.jobs.job_handler
+    payload: Dict[str, Any] = Field(default_factory=dict)
+    coalesce_key: Optional[str] = None  # pending jobs with a key accept more payload items, see enqueue_coalesced
+    status: JobStatus = JobStatus.PENDING
+    attempts: int = 0
+    max_attempts: int = 5
+    available_at: datetime = Field(default_factory=datetime.utcnow)  # not run before this time
+    locked_until: Optional[datetime] = None  # lease of the worker processing the job
+    last_error: Optional[str] = None
+    completed_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "outbox_jobs"
+        indexes = [
+            # Claiming due jobs
+            IndexModel([("status", ASCENDING), ("available_at", ASCENDING)]),
+            # Reclaiming jobs whose worker died
+            IndexModel([("status", ASCENDING), ("locked_until", ASCENDING)]),
+            # At most one pending job per coalesce key; claiming a job removes its key
+            IndexModel(
+                [("coalesce_key", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"status": JobStatus.PENDING.value, "coalesce_key": {"$type": "string"}},
+            ),
+            # Completed jobs are removed after a week; pending/failed ones have no completed_at
+            IndexModel([("completed_at", ASCENDING)], expireAfterSeconds=7 * 24 * 3600),
+        ]
+
+
+class JobLease(Document):
+    """Named lease letting one of several API processes run a periodic task, see services.jobs.acquire_lease."""
+    id: str  # lease name
+    locked_until: datetime
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "job_leases"
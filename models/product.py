@@ -1,7 +1,8 @@
 """Product model - Updated with organization_id for multi-tenancy"""
-from typing import Optional, List, Annotated, Dict
+from typing import Any, Optional, List, Annotated, Dict
 from datetime import datetime, date
-from beanie import Document, Indexed
+from beanie import Document, Indexed, Insert, Replace, Save, SaveChanges, before_event
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pydantic import Field, BaseModel
 from enum import Enum
 
@@ -44,6 +45,57 @@ class ProductVariant(BaseModel):
     promotion_price: Optional[float] = None
 
 
+def variant_aggregates(
+    variants: List[ProductVariant],
+    is_on_promotion: bool,
+    reorder_point: Optional[int],
+) -> Dict[str, Any]:
+    """Values of the denormalized Product aggregate fields for these variants."""
+    total_stock = sum(v.stock for v in variants)
+    effective_prices = [
+        v.promotion_price if is_on_promotion and v.promotion_price is not None else v.unit_price
+        for v in variants
+    ]
+    return {
+        "total_stock": total_stock,
+        "min_unit_price": min((v.unit_price for v in variants), default=None),
+        "effective_min_price": min(effective_prices, default=None),
+        "is_low_stock": reorder_point is not None and total_stock <= reorder_point,
+    }
+
+
+# Same computation as variant_aggregates() for pipeline updates
+# (update_many([{"$set": VARIANT_AGGREGATES_STAGE}]) after atomic variant writes and backfills)
+VARIANT_AGGREGATES_STAGE: Dict[str, Any] = {
+    "total_stock": {"$sum": "$variants.stock"},
+    "min_unit_price": {"$min": "$variants.unit_price"},
+    "effective_min_price": {
+        "$min": {
+            "$map": {
+                "input": {"$ifNull": ["$variants", []]},
+                "as": "v",
+                "in": {
+                    "$cond": [
+                        {"$and": [
+                            {"$eq": ["$is_on_promotion", True]},
+                            {"$ne": [{"$ifNull": ["$$v.promotion_price", None]}, None]},
+                        ]},
+                        "$$v.promotion_price",
+                        "$$v.unit_price",
+                    ]
+                },
+            }
+        }
+    },
+    "is_low_stock": {
+        "$and": [
+            {"$ne": [{"$ifNull": ["$reorder_point", None]}, None]},
+            {"$lte": [{"$sum": "$variants.stock"}, "$reorder_point"]},
+        ]
+    },
+}
+
+
 class Product(Document):
     organization_id: Annotated[str, Indexed()]
     name: Annotated[str, Indexed()]
@@ -63,8 +115,41 @@ class Product(Document):
     is_on_promotion: bool = False
     promotion_start: Optional[datetime] = None
     promotion_end: Optional[datetime] = None
+    # Denormalized from variants on every save; see variant_aggregates()
+    total_stock: int = 0
+    min_unit_price: Optional[float] = None
+    effective_min_price: Optional[float] = None  # promotion prices applied when is_on_promotion
+    is_low_stock: bool = False  # reorder_point set and total_stock <= reorder_point
+    # Approved storefront reviews, maintained at moderation time; see services.product_ratings
+    rating_sum: int = 0
+    rating_count: int = 0
+    avg_rating: float = 0
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+    @before_event(Insert, Replace, Save, SaveChanges)
+    def sync_variant_aggregates(self) -> None:
+        for field, value in variant_aggregates(self.variants, self.is_on_promotion, self.reorder_point).items():
+            setattr(self, field, value)
+
     class Settings:
         name = "products"
+        indexes = [
+            IndexModel([("organization_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("category", ASCENDING), ("status", ASCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("variants.sku", ASCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("warehouse_id", ASCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("location_id", ASCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("is_low_stock", ASCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("total_stock", ASCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("min_unit_price", ASCENDING), ("_id", ASCENDING)]),
+            # Storefront name sorts; queries must use services.storefront_catalog.NAME_COLLATION
+            IndexModel(
+                [("organization_id", ASCENDING), ("name", ASCENDING), ("_id", ASCENDING)],
+                collation={"locale": "en", "strength": 2},
+            ),
+            IndexModel([("organization_id", ASCENDING), ("effective_min_price", ASCENDING)]),
+            # Storefront rating / best_selling sorts
+            IndexModel([("organization_id", ASCENDING), ("avg_rating", DESCENDING), ("rating_count", DESCENDING), ("_id", DESCENDING)]),
+        ]
@@ -2,6 +2,7 @@
 from typing import Annotated, Optional
 from datetime import datetime
 from beanie import Document, Indexed
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pydantic import Field
 
 
@@ -18,3 +19,9 @@ class ProductReview(Document):
 
     class Settings:
         name = "product_reviews"
+        indexes = [
+            IndexModel([("organization_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("is_approved", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            # Approved reviews of products: storefront rating summaries and product pages
+            IndexModel([("product_id", ASCENDING), ("is_approved", ASCENDING), ("created_at", DESCENDING)]),
+        ]
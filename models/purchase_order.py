@@ -2,6 +2,7 @@
 from typing import Optional, List, Annotated
 from datetime import datetime, date
 from beanie import Document, Indexed
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pydantic import Field, BaseModel
 from enum import Enum
 
@@ -75,3 +76,9 @@ class PurchaseOrder(Document):
 
     class Settings:
         name = "purchase_orders"
+        indexes = [
+            IndexModel([("organization_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("supplier_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("po_number", ASCENDING)]),
+        ]
@@ -2,6 +2,7 @@
 from typing import Annotated, Optional, List
 from datetime import datetime
 from beanie import Document, Indexed
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pydantic import Field, BaseModel
 from enum import Enum
 
@@ -53,3 +54,9 @@ class Sale(Document):
 
     class Settings:
         name = "sales"
+        indexes = [
+            IndexModel([("organization_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("vendor_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("sale_number", ASCENDING)]),
+        ]
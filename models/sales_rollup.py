@@ -0,0 +1,79 @@
+"""SalesDailyRollup model - Pre-aggregated daily sales per vendor and product"""
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from beanie import Document
+from pymongo import ASCENDING, IndexModel
+from pydantic import Field
+
+from models.sale import Sale, SaleStatus
+
+
+class SalesDailyRollup(Document):
+    """
+    Completed sales of one organization for one UTC day, per vendor.
+    Rows with product_id None hold sale-level totals (count, items sold, sale totals);
+    rows with a product_id hold that product's lines (sales containing it, quantity, line totals).
+    """
+    organization_id: str
+    date: datetime  # UTC midnight
+    vendor_id: Optional[str] = None
+    product_id: Optional[str] = None
+    sales_count: int = 0
+    quantity: int = 0
+    revenue: float = 0.0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "sales_daily_rollups"
+        indexes = [
+            IndexModel(
+                [("organization_id", ASCENDING), ("date", ASCENDING), ("vendor_id", ASCENDING), ("product_id", ASCENDING)],
+                unique=True,
+            ),
+            IndexModel([("organization_id", ASCENDING), ("product_id", ASCENDING), ("date", ASCENDING)]),
+        ]
+
+
+RollupKey = Tuple[str, datetime, Optional[str], Optional[str]]
+
+# Rollup row key fields, in RollupKey order
+ROLLUP_KEY_FIELDS = ("organization_id", "date", "vendor_id", "product_id")
+
+
+def rollup_day(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, moment.day)
+
+
+def sale_rollup_increments(sale: Sale, sign: int = 1) -> Dict[RollupKey, Dict[str, Any]]:
+    """
+    $inc amounts a sale contributes to the rollups (negated with sign=-1).
+    Only completed sales are counted, so refunds and cancellations drop out.
+    """
+    if sale.status != SaleStatus.COMPLETED:
+        return {}
+    day = rollup_day(sale.created_at)
+    increments: Dict[RollupKey, Dict[str, Any]] = {
+        (sale.organization_id, day, sale.vendor_id, None): {
+            "sales_count": sign,
+            "quantity": sign * sum(item.quantity for item in sale.items),
+            "revenue": sign * sale.total,
+        }
+    }
+    for item in sale.items:
+        key = (sale.organization_id, day, sale.vendor_id, item.product_id)
+        if key not in increments:
+            increments[key] = {"sales_count": sign, "quantity": 0, "revenue": 0.0}
+        increments[key]["quantity"] += sign * item.quantity
+        increments[key]["revenue"] += sign * item.total
+    return increments
+
+
+def merge_increments(contributions: List[Dict[RollupKey, Dict[str, Any]]]) -> Dict[RollupKey, Dict[str, Any]]:
+    """Sum several sale_rollup_increments results, dropping rows that cancel out."""
+    merged: Dict[RollupKey, Dict[str, Any]] = {}
+    for increments in contributions:
+        for key, inc in increments.items():
+            row = merged.setdefault(key, {"sales_count": 0, "quantity": 0, "revenue": 0.0})
+            for field, amount in inc.items():
+                row[field] += amount
+    return {key: inc for key, inc in merged.items() if any(inc.values())}
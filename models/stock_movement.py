@@ -2,6 +2,7 @@
 from typing import Annotated, Optional
 from datetime import datetime
 from beanie import Document, Indexed
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pydantic import Field
 from enum import Enum
 
@@ -30,3 +31,10 @@ class StockMovement(Document):
 
     class Settings:
         name = "stock_movements"
+        indexes = [
+            IndexModel([("organization_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("product_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("type", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            # Product history without an organization filter (platform staff)
+            IndexModel([("product_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        ]
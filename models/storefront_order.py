@@ -2,6 +2,7 @@
 from typing import Optional, List, Annotated
 from datetime import datetime
 from beanie import Document, Indexed
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pydantic import Field, BaseModel
 from enum import Enum
 
@@ -47,3 +48,9 @@ class StorefrontOrder(Document):
 
     class Settings:
         name = "storefront_orders"
+        indexes = [
+            IndexModel([("organization_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("customer_phone", ASCENDING), ("created_at", DESCENDING)]),
+            IndexModel([("customer_email", ASCENDING), ("created_at", DESCENDING)]),
+        ]
@@ -2,6 +2,7 @@
 from typing import Annotated, Optional
 from datetime import datetime
 from beanie import Document, Indexed
+from pymongo import ASCENDING, IndexModel
 from pydantic import Field, EmailStr
 from enum import Enum
 
@@ -36,3 +37,6 @@ class Supplier(Document):
 
     class Settings:
         name = "suppliers"
+        indexes = [
+            IndexModel([("organization_id", ASCENDING), ("status", ASCENDING)]),
+        ]
@@ -2,6 +2,7 @@
 from typing import Annotated, Optional, List, Dict
 from datetime import datetime
 from beanie import Document, Indexed
+from pymongo import ASCENDING, IndexModel
 from pydantic import Field, EmailStr, BaseModel
 from enum import Enum
 from core.privileges import Privilege
@@ -63,6 +64,7 @@ class User(Document):
     warehouse_access: List[str] = []  # IDs of warehouses user can access
     status: UserStatus = UserStatus.PENDING
     is_active: bool = True
+    token_version: int = 0  # bumped to revoke claims-bearing access tokens
     last_login: Optional[datetime] = None
     email_verified: bool = False
     two_factor_enabled: bool = False
@@ -74,3 +76,7 @@ class User(Document):
 
     class Settings:
         name = "users"
+        indexes = [
+            # Notification recipients (admins/managers) of an organization
+            IndexModel([("organization_id", ASCENDING), ("role", ASCENDING), ("is_active", ASCENDING)]),
+        ]
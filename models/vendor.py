@@ -2,6 +2,7 @@
 from typing import Optional, Annotated
 from datetime import datetime, date
 from beanie import Document, Indexed
+from pymongo import ASCENDING, IndexModel
 from pydantic import Field, EmailStr
 from enum import Enum
 
@@ -49,3 +50,7 @@ class Vendor(Document):
 
     class Settings:
         name = "vendors"
+        indexes = [
+            IndexModel([("organization_id", ASCENDING), ("status", ASCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("user_id", ASCENDING)]),
+        ]
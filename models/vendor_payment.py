@@ -2,6 +2,7 @@
 from typing import Annotated, Optional
 from datetime import datetime, date
 from beanie import Document, Indexed
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pydantic import Field
 from enum import Enum
 
@@ -46,3 +47,9 @@ class VendorPayment(Document):
 
     class Settings:
         name = "vendor_payments"
+        indexes = [
+            IndexModel([("organization_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("vendor_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("organization_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("vendor_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        ]
@@ -2,7 +2,7 @@
 from typing import Optional, Dict, Any
 from datetime import datetime
 from pydantic import BaseModel, EmailStr
-from models.organization import OrganizationStatus
+from models.organization import OrganizationStatus, OrganizationEntitlement
 
 
 class OrganizationBase(BaseModel):
@@ -65,6 +65,7 @@ class OrganizationResponse(OrganizationBase):
     id: PydanticObjectId
     setup_completed: bool = False
     setup_answers: Optional[Dict[str, Any]] = None
+    entitlement: Optional[OrganizationEntitlement] = None
     created_at: datetime
     updated_at: datetime
 
@@ -74,6 +74,10 @@ from beanie import PydanticObjectId
 class ProductResponse(ProductBase):
     id: PydanticObjectId
     organization_id: str
+    total_stock: int = 0
+    min_unit_price: Optional[float] = None
+    effective_min_price: Optional[float] = None
+    is_low_stock: bool = False
     created_at: datetime
     updated_at: datetime
 
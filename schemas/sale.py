@@ -1,5 +1,5 @@
 """Sale schemas"""
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import datetime
 from pydantic import BaseModel
 from models.sale import PaymentMethod, SaleStatus, SaleItem
@@ -56,6 +56,15 @@ class SaleUpdate(BaseModel):
     location: Optional[str] = None
 
 
+class SaleBulkResult(BaseModel):
+    """Outcome of one row of POST /sales/bulk"""
+    index: int
+    sale_number: Optional[str] = None
+    status: Literal["created", "duplicate", "invalid", "rejected"]
+    id: Optional[str] = None
+    detail: Optional[str] = None
+
+
 from beanie import PydanticObjectId
 
 class SaleResponse(SaleBase):
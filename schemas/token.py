@@ -8,6 +8,17 @@ class Token(BaseModel):
 
 class TokenPayload(BaseModel):
     sub: Optional[str] = None
+    type: Optional[str] = None
+    # Present only on claims-bearing access tokens (ACCESS_TOKEN_CLAIMS)
+    user_type: Optional[str] = None
+    role: Optional[str] = None
+    org: Optional[str] = None
+    active: Optional[bool] = None
+    ver: Optional[int] = None  # user's token_version; also on refresh tokens
+
+    @property
+    def has_claims(self) -> bool:
+        return self.ver is not None and self.user_type is not None
 
 class RefreshToken(BaseModel):
     refresh_token: str
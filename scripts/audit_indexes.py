@@ -0,0 +1,151 @@
+"""
+Script to check that the queries issued by the API endpoints are served by an index.
+Runs explain() on a representative query per endpoint filter/sort combination and
+reports any plan that falls back to a collection scan (COLLSCAN) or an in-memory sort.
+
+Usage:
+    python scripts/audit_indexes.py [--org ORGANIZATION_ID]
+
+init_db() creates the indexes declared in each model's Settings.indexes, so running
+this also brings a database's indexes up to date before auditing.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+# Add the parent directory to sys.path to import from models, core, etc.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.mongodb import init_db
+from models.alert import Alert
+from models.category import Category
+from models.organization import Organization
+from models.organization_payment import OrganizationPayment
+from models.product import Product
+from models.product_review import ProductReview
+from models.purchase_order import PurchaseOrder
+from models.sale import Sale
+from models.sales_rollup import SalesDailyRollup
+from models.stock_movement import StockMovement
+from models.storefront_order import StorefrontOrder
+from models.supplier import Supplier
+from models.user import User
+from models.vendor import Vendor
+from models.vendor_payment import VendorPayment
+
+# List endpoints page with keyset cursors on (created_at, _id), see api/pagination.py
+NEWEST = [("created_at", -1), ("_id", -1)]
+OLDEST = [("created_at", 1), ("_id", 1)]
+
+
+def representative_queries(org_id: str, product_id: str):
+    """(label, model, filter, sort) tuples mirroring api/v1/endpoints/*."""
+    return [
+        ("products list", Product, {"organization_id": org_id}, OLDEST),
+        ("products by status", Product, {"organization_id": org_id, "status": "low_stock"}, OLDEST),
+        ("products by category", Product, {"organization_id": org_id, "category": "Other", "status": {"$ne": "discontinued"}}, None),
+        ("products by warehouse", Product, {"organization_id": org_id, "warehouse_id": "x"}, None),
+        ("products sku check", Product, {"organization_id": org_id, "variants.sku": {"$in": ["SKU-1"]}}, None),
+        ("products low stock", Product, {"organization_id": org_id, "is_low_stock": True}, None),
+        ("storefront products by price", Product, {"organization_id": org_id, "status": {"$ne": "discontinued"}, "min_unit_price": {"$gte": 5, "$lte": 50}}, [("min_unit_price", 1), ("_id", 1)]),
+        ("storefront products newest", Product, {"organization_id": org_id, "status": {"$ne": "discontinued"}}, NEWEST),
+        ("storefront products by rating", Product, {"organization_id": org_id, "status": {"$ne": "discontinued"}}, [("avg_rating", -1), ("rating_count", -1), ("_id", -1)]),
+        ("sales list", Sale, {"organization_id": org_id}, NEWEST),
+        ("sales by status", Sale, {"organization_id": org_id, "status": "completed"}, NEWEST),
+        ("sales by vendor", Sale, {"organization_id": org_id, "vendor_id": "x"}, NEWEST),
+        ("sale number check", Sale, {"organization_id": org_id, "sale_number": "S-1"}, None),
+        ("sales stats by date range", Sale, {"organization_id": org_id, "created_at": {"$gte": datetime(2024, 1, 1)}}, None),
+        ("sales timeseries", SalesDailyRollup, {"organization_id": org_id, "date": {"$gte": datetime(2024, 1, 1)}, "product_id": None}, None),
+        ("product sales timeseries", SalesDailyRollup, {"organization_id": org_id, "product_id": product_id, "date": {"$gte": datetime(2024, 1, 1)}}, None),
+        ("stock movements list", StockMovement, {"organization_id": org_id}, NEWEST),
+        ("stock movements by product", StockMovement, {"organization_id": org_id, "product_id": product_id}, NEWEST),
+        ("stock movements by type", StockMovement, {"organization_id": org_id, "type": "received"}, NEWEST),
+        ("notification recipients", User, {"organization_id": org_id, "role": {"$in": ["admin", "manager"]}, "is_active": True}, None),
+        ("alerts list", Alert, {"organization_id": org_id}, NEWEST),
+        ("alerts by type", Alert, {"organization_id": org_id, "type": "low_stock", "is_dismissed": False}, NEWEST),
+        ("alerts unread count", Alert, {"organization_id": org_id, "is_read": False, "is_dismissed": False}, None),
+        ("alerts stock dedupe", Alert, {"organization_id": org_id, "product_id": product_id, "type": "low_stock", "is_dismissed": False}, None),
+        ("purchase orders by status", PurchaseOrder, {"organization_id": org_id, "status": "ordered"}, OLDEST),
+        ("purchase orders by supplier", PurchaseOrder, {"organization_id": org_id, "supplier_id": "x"}, OLDEST),
+        ("vendor payment history", VendorPayment, {"organization_id": org_id, "vendor_id": "x"}, NEWEST),
+        ("vendor payments by status", VendorPayment, {"organization_id": org_id, "status": "pending"}, OLDEST),
+        ("organization payments", OrganizationPayment, {"organization_id": org_id, "status": "completed"}, NEWEST),
+        ("payment by reference", OrganizationPayment, {"reference_number": "x"}, None),
+        ("storefront orders", StorefrontOrder, {"organization_id": org_id, "status": "pending"}, NEWEST),
+        ("storefront order tracking", StorefrontOrder, {"customer_phone": "x"}, NEWEST),
+        ("reviews moderation", ProductReview, {"organization_id": org_id, "is_approved": False}, NEWEST),
+        ("product page reviews", ProductReview, {"product_id": product_id, "is_approved": True}, [("created_at", -1)]),
+        ("categories", Category, {"organization_id": org_id}, None),
+        ("suppliers by status", Supplier, {"organization_id": org_id, "status": "active"}, None),
+        ("vendors by status", Vendor, {"organization_id": org_id, "status": "active"}, None),
+    ]
+
+
+def plan_stages(plan: dict):
+    """Yield every stage name in a winning plan tree."""
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan["stage"]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+
+async def explain_query(model, query: dict, sort):
+    cursor = model.get_motor_collection().find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    explanation = await cursor.limit(100).explain()
+    planner = explanation.get("queryPlanner", {})
+    stages = list(plan_stages(planner.get("winningPlan", {})))
+    stats = explanation.get("executionStats", {})
+    return stages, stats.get("totalDocsExamined"), stats.get("nReturned")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Report API queries that are not served by an index")
+    parser.add_argument("--org", help="Organization ID to use in the sample queries (defaults to the first one)")
+    args = parser.parse_args()
+
+    await init_db()
+
+    org_id = args.org
+    if not org_id:
+        org = await Organization.find_one({})
+        if not org:
+            print("No organizations found; nothing to audit.")
+            return
+        org_id = str(org.id)
+
+    product = await Product.find_one({"organization_id": org_id})
+    product_id = str(product.id) if product else "000000000000000000000000"
+
+    print(f"Auditing index usage for organization {org_id}\n")
+    problems = 0
+    queries = representative_queries(org_id, product_id)
+    for label, model, query, sort in queries:
+        stages, examined, returned = await explain_query(model, query, sort)
+        issues = []
+        if "COLLSCAN" in stages:
+            issues.append("COLLSCAN")
+        if "SORT" in stages:
+            issues.append("in-memory SORT")
+        status = "OK  " if not issues else "WARN"
+        detail = f"docsExamined={examined} returned={returned}" if examined is not None else ""
+        print(f"[{status}] {model.Settings.name:<22} {label:<28} {' > '.join(reversed(stages))} {detail}")
+        if issues:
+            problems += 1
+            print(f"       {', '.join(issues)} for filter={query} sort={sort}")
+
+    print(f"\n{problems} of {len(queries)} queries not fully served by an index.")
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,48 @@
+"""
+Script to backfill the denormalized Product aggregates
+(total_stock, min_unit_price, effective_min_price, is_low_stock) from variants,
+and replace null variant warehouse_stocks of old documents with an empty list
+(services.stock pushes new warehouse records onto it).
+Runs server-side updates only, so it is safe to re-run at any time.
+
+Usage:
+    python scripts/backfill_product_aggregates.py [--org ORGANIZATION_ID]
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+# Add the parent directory to sys.path to import from models, core, etc.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.mongodb import init_db
+from models.product import Product, VARIANT_AGGREGATES_STAGE
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backfill denormalized product stock/price aggregates")
+    parser.add_argument("--org", help="Only backfill this organization's products")
+    args = parser.parse_args()
+
+    print(f"[{datetime.utcnow()}] Backfilling product aggregates...")
+    await init_db()
+
+    query = {"organization_id": args.org} if args.org else {}
+    collection = Product.get_motor_collection()
+    result = await collection.update_many(
+        {**query, "variants": {"$elemMatch": {"warehouse_stocks": None}}},
+        {"$set": {"variants.$[v].warehouse_stocks": []}},
+        array_filters=[{"v.warehouse_stocks": None}],
+    )
+    print(f"Products with null warehouse_stocks fixed: {result.modified_count}")
+    result = await collection.update_many(
+        query, [{"$set": VARIANT_AGGREGATES_STAGE}]
+    )
+    print(f"Products matched: {result.matched_count}, updated: {result.modified_count}")
+    print(f"[{datetime.utcnow()}] Backfill completed.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
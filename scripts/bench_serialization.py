@@ -0,0 +1,139 @@
+"""
+Benchmark list response serialization with and without FAST_JSON_RESPONSES.
+
+"validated" mirrors the default path: Beanie parses each document into a model,
+FastAPI re-validates the page against response_model and encodes it with json.
+"fast" mirrors api.fast_json: raw documents are shaped to the schema and
+encoded with orjson.
+
+Usage:
+    python scripts/bench_serialization.py [--variants 5] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+# Add the parent directory to sys.path to import from models, core, etc.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+from api.fast_json import shape_document
+from schemas.product import ProductResponse
+from schemas.sale import SaleResponse
+
+PAGE_SIZES = (100, 1000)
+
+
+def raw_product(index: int, variants: int) -> dict:
+    """A products document as Motor returns it."""
+    now = datetime.utcnow()
+    return {
+        "_id": ObjectId(),
+        "organization_id": "65f000000000000000000001",
+        "name": f"Product {index}",
+        "category": "Beverages",
+        "description": "Sparkling water, 24 x 330ml cans",
+        "reorder_point": 10,
+        "reorder_quantity": 50,
+        "warehouse_id": "65f000000000000000000002",
+        "supplier_name": "Acme Supplies",
+        "status": "active",
+        "variants": [
+            {
+                "sku": f"SKU-{index}-{v}",
+                "attributes": {"size": "330ml", "flavour": f"flavour-{v}"},
+                "unit_price": 12.5 + v,
+                "cost_price": 8.25 + v,
+                "stock": 40 + v,
+                "warehouse_stocks": [
+                    {"warehouse_id": f"wh-{w}", "warehouse_name": f"Warehouse {w}", "stock": 10 + w}
+                    for w in range(3)
+                ],
+                "barcode": f"0000{index:06d}{v}",
+            }
+            for v in range(variants)
+        ],
+        "is_on_promotion": False,
+        "created_at": now - timedelta(days=index % 365),
+        "updated_at": now,
+    }
+
+
+def raw_sale(index: int, items: int) -> dict:
+    """A sales document as Motor returns it."""
+    now = datetime.utcnow()
+    lines = [
+        {
+            "product_id": str(ObjectId()),
+            "product_name": f"Product {i}",
+            "sku": f"SKU-{i}",
+            "quantity": 2,
+            "unit_price": 12.5,
+            "total": 25.0,
+        }
+        for i in range(items)
+    ]
+    return {
+        "_id": ObjectId(),
+        "organization_id": "65f000000000000000000001",
+        "sale_number": f"S-{index:08d}",
+        "vendor_name": "Front desk",
+        "client_name": "Walk-in",
+        "items": lines,
+        "subtotal": 25.0 * items,
+        "tax": 0.0,
+        "discount": 0.0,
+        "total": 25.0 * items,
+        "payment_method": "cash",
+        "status": "completed",
+        "created_at": now - timedelta(minutes=index),
+        "updated_at": now,
+    }
+
+
+def validated_path(docs, response_model, adapter):
+    # Beanie: build a model per document (stands in for Document parsing)
+    parsed = [response_model.model_validate({**doc, "id": doc["_id"]}) for doc in docs]
+    # FastAPI: dump, validate against response_model, serialize to JSON
+    content = [model.model_dump(by_alias=True) for model in parsed]
+    value = adapter.validate_python(content)
+    payload = adapter.dump_python(value, mode="json")
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(docs, response_model):
+    return orjson.dumps([shape_document(doc, response_model) for doc in docs])
+
+
+def bench(label, response_model, make_doc, size, repeat):
+    docs = [make_doc(i) for i in range(size)]
+    adapter = TypeAdapter(list[response_model])
+    assert json.loads(validated_path(docs, response_model, adapter))[0]["id"] == str(docs[0]["_id"])
+
+    validated = min(timeit.repeat(lambda: validated_path(docs, response_model, adapter), number=1, repeat=repeat))
+    fast = min(timeit.repeat(lambda: fast_path(docs, response_model), number=1, repeat=repeat))
+    print(
+        f"{label:<16} {size:>6} {validated * 1000:>14.2f} {fast * 1000:>12.2f} {validated / fast:>9.1f}x"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list response serialization")
+    parser.add_argument("--variants", type=int, default=5, help="Variants per product / items per sale")
+    parser.add_argument("--repeat", type=int, default=20, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    print(f"{'schema':<16} {'items':>6} {'validated ms':>14} {'fast ms':>12} {'speedup':>10}")
+    for size in PAGE_SIZES:
+        bench("ProductResponse", ProductResponse, lambda i: raw_product(i, args.variants), size, args.repeat)
+        bench("SaleResponse", SaleResponse, lambda i: raw_sale(i, args.variants), size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
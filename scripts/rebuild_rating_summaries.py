@@ -0,0 +1,36 @@
+"""
+Script to rebuild the rating summary stored on products (rating_sum,
+rating_count, avg_rating) from approved product reviews, e.g. to backfill
+existing products or repair drift. Safe to re-run at any time.
+
+Usage:
+    python scripts/rebuild_rating_summaries.py [--org ORGANIZATION_ID]
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+# Add the parent directory to sys.path to import from models, core, etc.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.mongodb import init_db
+from services.product_ratings import rebuild_rating_summaries
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Rebuild product rating summaries from reviews")
+    parser.add_argument("--org", help="Only rebuild this organization's products")
+    args = parser.parse_args()
+
+    print(f"[{datetime.utcnow()}] Rebuilding product rating summaries...")
+    await init_db()
+
+    rated = await rebuild_rating_summaries(args.org)
+    print(f"Products with approved reviews: {rated}")
+    print(f"[{datetime.utcnow()}] Rebuild completed.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
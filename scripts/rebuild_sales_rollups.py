@@ -0,0 +1,37 @@
+"""
+Script to rebuild the daily sales rollups (sales_daily_rollups) from the sales
+collection, e.g. to backfill history or repair drift after a failed rollup update.
+Rows are recomputed in place and rows without remaining sales are removed,
+so it is safe to re-run at any time.
+
+Usage:
+    python scripts/rebuild_sales_rollups.py [--org ORGANIZATION_ID]
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+# Add the parent directory to sys.path to import from models, core, etc.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.mongodb import init_db
+from services.sales_rollup import rebuild_rollups
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Rebuild daily sales rollups from sales")
+    parser.add_argument("--org", help="Only rebuild this organization's rollups")
+    args = parser.parse_args()
+
+    print(f"[{datetime.utcnow()}] Rebuilding sales rollups...")
+    await init_db()
+
+    written = await rebuild_rollups(args.org)
+    print(f"Rollup rows written: {written}")
+    print(f"[{datetime.utcnow()}] Rebuild completed.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,29 @@
+"""
+Script to run the subscription expiry scan once: creates expiry alerts/emails
+and suspends organizations whose trial and subscription have lapsed.
+Run this via cron when SUBSCRIPTION_SCAN_INTERVAL_MINUTES=0 disables the in-process scheduler.
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+# Add the parent directory to sys.path to import from models, core, etc.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.mongodb import init_db
+from services.subscription_notifications import scan_subscription_expiries
+
+
+async def main():
+    print(f"[{datetime.utcnow()}] Starting subscription expiry scan...")
+    await init_db()
+    summary = await scan_subscription_expiries()
+    print(f"Organizations scanned: {summary['organizations_scanned']}")
+    print(f"Alerts created: {summary['alerts_created']}")
+    print(f"Organizations suspended: {summary['organizations_suspended']}")
+    print(f"[{datetime.utcnow()}] Subscription expiry scan completed.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,99 +1,190 @@
 """
 Script to send weekly inventory reports to all users who have enabled them.
 Run this script weekly via cron or manually.
+
+Report figures are computed with one $group aggregation per collection for a
+batch of organizations at a time, each organization's summary is rendered once
+for all of its users, and emails go out in batches over the pooled SMTP
+connections (at most --concurrency at once).
+
+Usage:
+    python scripts/send_weekly_reports.py [--dry-run] [--concurrency 8] [--org-batch-size 500]
+
+--dry-run gathers and renders every report and prints timings without sending.
 """
+import argparse
 import asyncio
 import os
 import sys
+import time
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import List
+from typing import Any, Dict, List, Optional
 
 # Add the parent directory to sys.path to import from models, core, etc.
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from beanie import Document
+
 from core.config import settings
 from db.mongodb import init_db
 from models.user import User
-from models.organization import Organization
+from models.product import Product
 from models.sale import Sale
 from models.purchase_order import PurchaseOrder
 from models.stock_movement import StockMovement
-from services.notification import send_weekly_report
+from services.email import OutgoingEmail, send_many
+from services.notification import weekly_report_email, weekly_report_summary
+
+SEND_BATCH_SIZE = 500
+
 
+async def _group_by_organization(model: type[Document], match: Dict[str, Any], value: Any = 1) -> Dict[str, Any]:
+    """Sum `value` per organization over the documents matching `match`."""
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": "$organization_id", "value": {"$sum": value}}},
+    ]
+    rows = await model.get_motor_collection().aggregate(pipeline).to_list(length=None)
+    return {row["_id"]: row["value"] for row in rows}
 
-async def gather_report_data(organization_id: str):
-    """Gather inventory stats for the last 7 days for an organization"""
+
+async def gather_report_data(organization_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Gather inventory stats for the last 7 days for several organizations at once"""
     last_week = datetime.utcnow() - timedelta(days=7)
-    
-    # Total Sales Revenue
-    sales = await Sale.find({
-        "organization_id": organization_id,
-        "status": "completed",
-        "created_at": {"$gte": last_week}
-    }).to_list()
-    total_sales = sum(s.total for s in sales)
-    
-    # Orders Count
-    orders_count = await PurchaseOrder.find({
-        "organization_id": organization_id,
-        "status": "received",
-        "received_date": {"$gte": last_week.date()}
-    }).count()
-    
-    # Stock Movements
-    movements_count = await StockMovement.find({
-        "organization_id": organization_id,
-        "created_at": {"$gte": last_week}
-    }).count()
-    
-    # Low Stock Items count (Current snapshot)
-    from models.product import Product
-    low_stock_count = await Product.find({
-        "organization_id": organization_id,
-        "status": "low_stock"
-    }).count()
-    
+    # received_date is a date, stored as midnight
+    last_week_day = datetime.combine(last_week.date(), datetime.min.time())
+    organizations = {"$in": organization_ids}
+
+    total_sales, orders_count, movements_count, low_stock_count = await asyncio.gather(
+        _group_by_organization(
+            Sale,
+            {"organization_id": organizations, "status": "completed", "created_at": {"$gte": last_week}},
+            "$total",
+        ),
+        _group_by_organization(
+            PurchaseOrder,
+            {"organization_id": organizations, "status": "received", "received_date": {"$gte": last_week_day}},
+        ),
+        _group_by_organization(
+            StockMovement,
+            {"organization_id": organizations, "created_at": {"$gte": last_week}},
+        ),
+        # Low Stock Items count (Current snapshot)
+        _group_by_organization(
+            Product,
+            {"organization_id": organizations, "status": "low_stock"},
+        ),
+    )
+
     return {
-        "total_sales": total_sales,
-        "orders_count": orders_count,
-        "low_stock_count": low_stock_count,
-        "movements_count": movements_count
+        organization_id: {
+            "total_sales": total_sales.get(organization_id, 0),
+            "orders_count": orders_count.get(organization_id, 0),
+            "low_stock_count": low_stock_count.get(organization_id, 0),
+            "movements_count": movements_count.get(organization_id, 0),
+        }
+        for organization_id in organization_ids
     }
 
 
-async def main():
-    print(f"[{datetime.utcnow()}] Starting weekly reports distribution...")
-    await init_db()
-    
-    # Find all users who want weekly reports
-    users = await User.find({
+async def load_recipients() -> Dict[str, List[User]]:
+    """Users who want weekly reports by email, grouped by organization."""
+    by_organization: Dict[str, List[User]] = defaultdict(list)
+    async for user in User.find({
         "preferences.notifications.weekly_reports": True,
-        "is_active": True
-    }).to_list()
-    
-    print(f"Found {len(users)} users with weekly reports enabled.")
-    
-    processed_orgs = {}
-    
-    for user in users:
-        if not user.organization_id:
-            continue
-            
-        # Cache org data to avoid redundant queries
-        if user.organization_id not in processed_orgs:
-            print(f"Gathering data for organization: {user.organization_id}")
-            processed_orgs[user.organization_id] = await gather_report_data(user.organization_id)
-            
-        report_data = processed_orgs[user.organization_id]
-        
-        try:
-            print(f"Sending weekly report to: {user.email}")
-            await send_weekly_report(user, report_data)
-        except Exception as e:
-            print(f"Failed to send report to {user.email}: {e}")
+        "preferences.notifications.email": True,
+        "is_active": True,
+        "organization_id": {"$ne": None},
+    }):
+        by_organization[user.organization_id].append(user)
+    return by_organization
+
+
+class BatchSender:
+    """Sends one batch of emails in the background while the next one is prepared."""
+
+    def __init__(self, dry_run: bool):
+        self.dry_run = dry_run
+        self.submitted = 0
+        self.failed = 0
+        self.waiting_seconds = 0.0
+        self._sending: Optional[asyncio.Task] = None
+        self._batch: List[OutgoingEmail] = []
+
+    async def submit(self, emails: List[OutgoingEmail]) -> None:
+        await self.wait()
+        self.submitted += len(emails)
+        if not self.dry_run:
+            self._sending = asyncio.create_task(send_many(emails))
+            self._batch = emails
+
+    async def wait(self) -> None:
+        if self._sending is None:
+            return
+        started = time.perf_counter()
+        results = await self._sending
+        self.waiting_seconds += time.perf_counter() - started
+        self._sending = None
+        for email, sent in zip(self._batch, results):
+            if not sent:
+                self.failed += 1
+                print(f"Failed to send report to {', '.join(email.email_to)}")
+
+
+async def main(dry_run: bool, concurrency: Optional[int], org_batch_size: int):
+    print(f"[{datetime.utcnow()}] Starting weekly reports distribution{' (dry run)' if dry_run else ''}...")
+    if concurrency is not None:
+        settings.SMTP_POOL_SIZE = concurrency
+    await init_db()
+
+    timings: Dict[str, float] = defaultdict(float)
+    started = time.perf_counter()
+    recipients = await load_recipients()
+    timings["load users"] = time.perf_counter() - started
+    print(f"Found {sum(map(len, recipients.values()))} users in {len(recipients)} organizations with weekly reports enabled.")
+
+    organization_ids = list(recipients)
+    sender = BatchSender(dry_run)
+    emails: List[OutgoingEmail] = []
+    for offset in range(0, len(organization_ids), org_batch_size):
+        batch = organization_ids[offset:offset + org_batch_size]
+
+        started = time.perf_counter()
+        report_data = await gather_report_data(batch)
+        timings["aggregate"] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        for organization_id in batch:
+            data = report_data[organization_id]
+            summary = weekly_report_summary(data)
+            for user in recipients[organization_id]:
+                email = weekly_report_email(user, data, summary)
+                if email:
+                    emails.append(email)
+        timings["render"] += time.perf_counter() - started
+
+        while len(emails) >= SEND_BATCH_SIZE:
+            await sender.submit(emails[:SEND_BATCH_SIZE])
+            emails = emails[SEND_BATCH_SIZE:]
+    if emails:
+        await sender.submit(emails)
+    await sender.wait()
+    timings["send (waiting)"] = sender.waiting_seconds
 
+    for phase, seconds in timings.items():
+        print(f"  {phase:<16} {seconds:8.2f}s")
+    if dry_run:
+        print(f"Rendered {sender.submitted} weekly reports (not sent).")
+    else:
+        print(f"Sent {sender.submitted - sender.failed} of {sender.submitted} weekly reports.")
     print(f"[{datetime.utcnow()}] Weekly reports distribution completed.")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Send weekly inventory reports")
+    parser.add_argument("--dry-run", action="store_true", help="Gather and render reports and print timings without sending")
+    parser.add_argument("--concurrency", type=int, help="Emails sent at once (defaults to SMTP_POOL_SIZE)")
+    parser.add_argument("--org-batch-size", type=int, default=500, help="Organizations aggregated per query")
+    args = parser.parse_args()
+    asyncio.run(main(args.dry_run, args.concurrency, args.org_batch_size))
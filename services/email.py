@@ -1,30 +1,154 @@
+import asyncio
 import logging
-from typing import List, Optional
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from pydantic import EmailStr
+import time
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiosmtplib
+from pydantic import BaseModel, EmailStr
 from core.config import settings
 
 logger = logging.getLogger(__name__)
 
-def _get_mail_config() -> ConnectionConfig:
-    """Build mail config at call-time so env changes are picked up."""
-    return ConnectionConfig(
-        MAIL_USERNAME=settings.MAIL_USERNAME,
-        MAIL_PASSWORD=settings.MAIL_PASSWORD,
-        MAIL_FROM=settings.MAIL_FROM,
-        MAIL_PORT=settings.MAIL_PORT,
-        MAIL_SERVER=settings.MAIL_SERVER,
-        MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-        MAIL_STARTTLS=settings.MAIL_STARTTLS,
-        MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
-        USE_CREDENTIALS=settings.USE_CREDENTIALS,
-        VALIDATE_CERTS=settings.VALIDATE_CERTS
+
+class OutgoingEmail(BaseModel):
+    """One message for send_many"""
+    email_to: List[EmailStr]
+    subject: str
+    html_content: str
+
+
+class SMTPPool:
+    """
+    Authenticated SMTP connections reused across messages. At most `size`
+    connections are open (and sending) at once; connections idle for longer
+    than `idle_timeout` seconds are closed instead of reused.
+    """
+
+    def __init__(self, connect: Callable[[], Awaitable[aiosmtplib.SMTP]], size: int, idle_timeout: float):
+        self._connect = connect
+        self._size = size
+        self._idle_timeout = idle_timeout
+        self._idle: List[Tuple[aiosmtplib.SMTP, float]] = []  # (connection, last used)
+        self._slots = asyncio.Semaphore(size)
+        self.loop = asyncio.get_running_loop()
+        self.opened = 0
+        self.reused = 0
+
+    async def _checkout(self, fresh: bool) -> aiosmtplib.SMTP:
+        now = time.monotonic()
+        while self._idle and not fresh:
+            smtp, last_used = self._idle.pop()
+            if now - last_used <= self._idle_timeout and smtp.is_connected:
+                self.reused += 1
+                return smtp
+            await _quit(smtp)
+        smtp = await self._connect()
+        self.opened += 1
+        return smtp
+
+    @asynccontextmanager
+    async def connection(self, fresh: bool = False) -> AsyncIterator[aiosmtplib.SMTP]:
+        """Borrow a connection; `fresh` skips idle ones and opens a new connection."""
+        async with self._slots:
+            smtp = await self._checkout(fresh)
+            try:
+                yield smtp
+            except BaseException:
+                # The connection may be mid-transaction; never hand it out again
+                await _quit(smtp)
+                raise
+            if self._idle_timeout > 0:
+                self._idle.append((smtp, time.monotonic()))
+            else:
+                await _quit(smtp)
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            await _quit(smtp)
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": self._size, "idle": len(self._idle), "opened": self.opened, "reused": self.reused}
+
+
+async def _quit(smtp: aiosmtplib.SMTP) -> None:
+    try:
+        if smtp.is_connected:
+            await smtp.quit()
+    except Exception:
+        smtp.close()
+
+
+async def _connect() -> aiosmtplib.SMTP:
+    """Open and authenticate an SMTP connection using configured settings."""
+    smtp = aiosmtplib.SMTP(
+        hostname=settings.MAIL_SERVER,
+        port=settings.MAIL_PORT,
+        username=settings.MAIL_USERNAME if settings.USE_CREDENTIALS else None,
+        password=settings.MAIL_PASSWORD if settings.USE_CREDENTIALS else None,
+        use_tls=settings.MAIL_SSL_TLS,
+        start_tls=settings.MAIL_STARTTLS,
+        validate_certs=settings.VALIDATE_CERTS,
     )
+    await smtp.connect()
+    return smtp
+
+
+_pool: Optional[SMTPPool] = None
+
+
+def get_smtp_pool() -> SMTPPool:
+    """The process-wide pool (one per event loop, as scripts may run several)."""
+    global _pool
+    if _pool is None or _pool.loop is not asyncio.get_running_loop():
+        _pool = SMTPPool(
+            _connect,
+            size=max(settings.SMTP_POOL_SIZE, 1),
+            # Pooling disabled: every message gets a fresh connection
+            idle_timeout=settings.SMTP_POOL_IDLE_TIMEOUT_SECONDS if settings.SMTP_POOL_SIZE > 0 else 0,
+        )
+    return _pool
+
+
+async def close_smtp_pool() -> None:
+    """Quit the pooled connections of this event loop's pool, e.g. on application shutdown."""
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None and pool.loop is asyncio.get_running_loop():
+        await pool.close()
+
+
+def smtp_pool_stats() -> Dict[str, int]:
+    return _pool.stats() if _pool is not None else {}
+
+
+def _build_message(email_to: List[str], subject: str, html_content: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = formataddr((settings.MAIL_FROM_NAME, settings.MAIL_FROM))
+    message["To"] = ", ".join(email_to)
+    message["Subject"] = subject
+    message.set_content(html_content, subtype="html")
+    return message
+
+
+async def _deliver(message: EmailMessage) -> None:
+    pool = get_smtp_pool()
+    try:
+        async with pool.connection() as smtp:
+            await smtp.send_message(message)
+    except aiosmtplib.SMTPServerDisconnected:
+        # The server dropped a pooled connection; retry once on a new one
+        async with pool.connection(fresh=True) as smtp:
+            await smtp.send_message(message)
+
 
 async def send_email(
-    email_to: List[EmailStr], 
-    subject: str, 
-    html_content: str, 
+    email_to: List[EmailStr],
+    subject: str,
+    html_content: str,
     raise_on_failure: bool = True
 ) -> bool:
     """
@@ -32,15 +156,7 @@ async def send_email(
     Returns True if successful, False otherwise (if raise_on_failure is False).
     """
     try:
-        message = MessageSchema(
-            subject=subject,
-            recipients=email_to,
-            body=html_content,
-            subtype=MessageType.html
-        )
-        conf = _get_mail_config()
-        fm = FastMail(conf)
-        await fm.send_message(message)
+        await _deliver(_build_message(email_to, subject, html_content))
         logger.info(f"Successfully sent email to {email_to}")
         return True
     except Exception as e:
@@ -48,3 +164,14 @@ async def send_email(
         if raise_on_failure:
             raise e
         return False
+
+
+async def send_many(emails: List[OutgoingEmail]) -> List[bool]:
+    """
+    Send several emails over the pooled connections, up to SMTP_POOL_SIZE at once.
+    Failures are logged, not raised; returns whether each email was sent.
+    """
+    return list(await asyncio.gather(*(
+        send_email(email.email_to, email.subject, email.html_content, raise_on_failure=False)
+        for email in emails
+    )))
@@ -0,0 +1,96 @@
+"""Materialized subscription entitlement for organizations"""
+import calendar
+from datetime import datetime
+from typing import Optional
+
+from core.cache import organization_cache
+from models.organization import Organization, OrganizationEntitlement, EntitlementStatus
+from models.organization_payment import OrganizationPayment, OPStatus
+
+
+def compute_next_billing_date(base_date: datetime, billing_cycle: str) -> datetime:
+    """Next billing date after `base_date`, keeping the same day of month when possible."""
+    if billing_cycle == "yearly":
+        year = base_date.year + 1
+        day = min(base_date.day, calendar.monthrange(year, base_date.month)[1])
+        return base_date.replace(year=year, day=day)
+
+    # monthly
+    month_index = base_date.month
+    year = base_date.year + month_index // 12
+    month = (month_index % 12) + 1
+    day = min(base_date.day, calendar.monthrange(year, month)[1])
+    return base_date.replace(year=year, month=month, day=day)
+
+
+def build_entitlement(
+    organization: Organization,
+    last_payment: Optional[OrganizationPayment],
+    now: Optional[datetime] = None,
+) -> OrganizationEntitlement:
+    """Derive the entitlement window from the trial and the latest completed payment."""
+    now = now or datetime.utcnow()
+
+    subscription_expires_at: Optional[datetime] = None
+    if last_payment:
+        base_date = last_payment.payment_date or last_payment.created_at
+        subscription_expires_at = compute_next_billing_date(base_date, organization.billing_cycle)
+
+    trial_ends_at = organization.trial_ends_at
+    if trial_ends_at and now <= trial_ends_at:
+        status = EntitlementStatus.TRIALING
+    elif subscription_expires_at and now <= subscription_expires_at:
+        status = EntitlementStatus.ACTIVE
+    else:
+        status = EntitlementStatus.EXPIRED
+
+    return OrganizationEntitlement(
+        status=status,
+        trial_ends_at=trial_ends_at,
+        subscription_expires_at=subscription_expires_at,
+        refreshed_at=now,
+    )
+
+
+async def _current_entitlement(organization: Organization) -> OrganizationEntitlement:
+    last_completed = await OrganizationPayment.find(
+        {"organization_id": str(organization.id), "status": OPStatus.COMPLETED}
+    ).sort("-created_at").limit(1).to_list()
+    return build_entitlement(organization, last_completed[0] if last_completed else None)
+
+
+async def refresh_entitlement(organization: Organization, save: bool = True) -> OrganizationEntitlement:
+    """
+    Recompute and store the organization's entitlement.
+    Call this whenever payments, approvals or trial dates change.
+    """
+    entitlement = await _current_entitlement(organization)
+    organization.entitlement = entitlement
+    if save:
+        await organization.save()
+    organization_cache.invalidate(str(organization.id))
+    return entitlement
+
+
+async def ensure_entitlement(organization: Organization) -> OrganizationEntitlement:
+    """
+    The stored entitlement; for organizations created before entitlements were
+    materialized it is built and stored once, so later checks need no payment query.
+    """
+    if organization.entitlement is not None:
+        return organization.entitlement
+    entitlement = await _current_entitlement(organization)
+    organization.entitlement = entitlement
+    # Only while still missing, so a concurrent refresh (e.g. a payment) wins
+    await Organization.find_one({"_id": organization.id, "entitlement": None}).update(
+        {"$set": {Organization.entitlement: entitlement}}
+    )
+    organization_cache.invalidate(str(organization.id))
+    return entitlement
+
+
+async def refresh_entitlement_by_id(organization_id: str) -> Optional[OrganizationEntitlement]:
+    organization = await Organization.get(organization_id)
+    if not organization:
+        return None
+    return await refresh_entitlement(organization)
@@ -0,0 +1,237 @@
+"""
+In-process background job queue backed by a persistent outbox (outbox_jobs).
+
+enqueue() stores a job and wakes the local workers, so requests only pay for one
+insert. Workers claim due jobs with an atomic find_one_and_update, which lets
+several API processes share the outbox. Jobs left behind by a restart or crash
+are claimed again once their lease expires. Failing jobs are retried with
+exponential backoff until max_attempts. enqueue_coalesced() gathers events
+into one delayed job (e.g. a digest email) until that job is claimed.
+acquire_lease() lets only one process run a periodic task such as a scan.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from core.config import settings
+from models.outbox_job import JobLease, JobStatus, OutboxJob
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+_handlers: Dict[str, JobHandler] = {}
+_wakeup: Optional[asyncio.Queue] = None
+_worker_count = 0
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """Register the coroutine that runs jobs of `kind`; it receives the job payload."""
+    def register(handler: JobHandler) -> JobHandler:
+        _handlers[kind] = handler
+        return handler
+    return register
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before retrying a job that has failed `attempts` times."""
+    delay = settings.JOB_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return min(delay, settings.JOB_RETRY_MAX_SECONDS)
+
+
+def _wake(jobs: int) -> None:
+    if _wakeup is None:
+        return
+    # One token per idle worker is enough; a woken worker drains every due job
+    for _ in range(min(jobs, _worker_count - _wakeup.qsize())):
+        _wakeup.put_nowait(None)
+
+
+async def enqueue(kind: str, payload: Dict[str, Any], *, delay_seconds: float = 0) -> OutboxJob:
+    """Persist a job for the workers; it runs after `delay_seconds` at the earliest."""
+    job = OutboxJob(
+        kind=kind,
+        payload=payload,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+        available_at=datetime.utcnow() + timedelta(seconds=delay_seconds),
+    )
+    await job.insert()
+    if not delay_seconds:
+        _wake(1)
+    return job
+
+
+async def enqueue_many(jobs: List[Tuple[str, Dict[str, Any]]]) -> None:
+    """Persist several (kind, payload) jobs with one insert."""
+    if not jobs:
+        return
+    await OutboxJob.insert_many([
+        OutboxJob(kind=kind, payload=payload, max_attempts=settings.JOB_MAX_ATTEMPTS)
+        for kind, payload in jobs
+    ])
+    _wake(len(jobs))
+
+
+async def enqueue_coalesced(
+    kind: str,
+    key: str,
+    payload: Dict[str, Any],
+    items: Dict[str, Any],
+    *,
+    delay_seconds: float,
+) -> None:
+    """
+    Append `items` (field -> value) to the array fields of the pending `kind`
+    job for `key`, creating it with `payload` to run after `delay_seconds`.
+    Events arriving before the job is claimed share it; later ones start a new job.
+    """
+    now = datetime.utcnow()
+    coalesce_key = f"{kind}:{key}"
+    update = {
+        "$push": {f"payload.{field}": value for field, value in items.items()},
+        "$set": {"updated_at": now},
+        "$setOnInsert": {
+            "kind": kind,
+            "coalesce_key": coalesce_key,
+            **{f"payload.{field}": value for field, value in payload.items()},
+            "attempts": 0,
+            "max_attempts": settings.JOB_MAX_ATTEMPTS,
+            "available_at": now + timedelta(seconds=delay_seconds),
+            "locked_until": None,
+            "last_error": None,
+            "completed_at": None,
+            "created_at": now,
+        },
+    }
+    query = {"coalesce_key": coalesce_key, "status": JobStatus.PENDING.value}
+    collection = OutboxJob.get_motor_collection()
+    try:
+        await collection.update_one(query, update, upsert=True)
+    except DuplicateKeyError:
+        # A concurrent call created the job first; append to it
+        await collection.update_one(query, update, upsert=True)
+    if not delay_seconds:
+        _wake(1)
+
+
+async def claim_job() -> Optional[OutboxJob]:
+    """
+    Lease the next due job (or one whose previous lease expired) to this worker.
+    A job whose lease expired on its last attempt is marked failed instead.
+    """
+    collection = OutboxJob.get_motor_collection()
+    while True:
+        now = datetime.utcnow()
+        doc = await collection.find_one_and_update(
+            {"$or": [
+                {"status": JobStatus.PENDING.value, "available_at": {"$lte": now}},
+                {"status": JobStatus.PROCESSING.value, "locked_until": {"$lt": now}},
+            ]},
+            {
+                "$set": {
+                    "status": JobStatus.PROCESSING.value,
+                    "locked_until": now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+                # A claimed job no longer gathers events (and may be retried alongside a new pending one)
+                "$unset": {"coalesce_key": ""},
+            },
+            sort=[("available_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if not doc:
+            return None
+        job = OutboxJob.model_validate(doc)
+        if job.attempts <= job.max_attempts:
+            return job
+
+        # Its last attempt never finished (e.g. the process died while running it)
+        await collection.update_one({"_id": job.id}, {
+            "$set": {
+                "status": JobStatus.FAILED.value,
+                "locked_until": None,
+                "last_error": "Lease expired during the last attempt",
+                "updated_at": now,
+            },
+            "$inc": {"attempts": -1},
+        })
+        logger.error(f"Job {job.id} ({job.kind}) failed permanently: lease expired during attempt {job.max_attempts}")
+
+
+async def run_job(job: OutboxJob) -> None:
+    """Run a claimed job and record the outcome: done, retry later, or failed."""
+    handler = _handlers.get(job.kind)
+    now = datetime.utcnow()
+    update: Dict[str, Any] = {"locked_until": None, "updated_at": now}
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind '{job.kind}'")
+        await handler(job.payload)
+    except Exception as e:
+        update["last_error"] = str(e)
+        if handler is None or job.attempts >= job.max_attempts:
+            update["status"] = JobStatus.FAILED.value
+            logger.error(f"Job {job.id} ({job.kind}) failed permanently after {job.attempts} attempts: {e}")
+        else:
+            update["status"] = JobStatus.PENDING.value
+            update["available_at"] = now + timedelta(seconds=backoff_seconds(job.attempts))
+            logger.warning(f"Job {job.id} ({job.kind}) failed, attempt {job.attempts}/{job.max_attempts}: {e}")
+    else:
+        update["status"] = JobStatus.DONE.value
+        update["completed_at"] = now
+        update["last_error"] = None
+    await OutboxJob.get_motor_collection().update_one({"_id": job.id}, {"$set": update})
+
+
+async def _worker(poll_interval: float) -> None:
+    while True:
+        try:
+            await asyncio.wait_for(_wakeup.get(), timeout=poll_interval)
+        except asyncio.TimeoutError:
+            pass  # poll for retries that became due and expired leases
+        try:
+            while (job := await claim_job()) is not None:
+                await run_job(job)
+        except Exception as e:
+            logger.error(f"Job worker error: {str(e)}", exc_info=True)
+
+
+def start_job_workers(count: int) -> List[asyncio.Task]:
+    """Start `count` worker tasks on the running event loop."""
+    global _wakeup, _worker_count
+    _wakeup = asyncio.Queue()
+    _worker_count = count
+    return [
+        asyncio.create_task(_worker(settings.JOB_POLL_INTERVAL_SECONDS))
+        for _ in range(count)
+    ]
+
+
+async def acquire_lease(name: str, seconds: float) -> bool:
+    """Hold the lease `name` for `seconds` unless another process holds it; True if taken."""
+    now = datetime.utcnow()
+    try:
+        await JobLease.get_motor_collection().update_one(
+            {"_id": name, "locked_until": {"$lte": now}},
+            {"$set": {"locked_until": now + timedelta(seconds=seconds), "updated_at": now}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # The lease exists and has not expired
+        return False
+    return True
+
+
+async def job_stats() -> Dict[str, int]:
+    """Number of outbox jobs per status."""
+    rows = await OutboxJob.get_motor_collection().aggregate([
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+    ]).to_list(length=None)
+    stats = {status.value: 0 for status in JobStatus}
+    stats.update({row["_id"]: row["count"] for row in rows})
+    return stats
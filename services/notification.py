@@ -1,7 +1,9 @@
 """Notification service for sending various types of notifications"""
-from typing import List
+from typing import Any, Dict, List, Optional
 from core.config import settings
-from services.email import send_email
+from services.email import OutgoingEmail, send_email
+from services.jobs import enqueue, enqueue_coalesced, enqueue_many, job_handler
+from services.notification_helpers import get_org_notification_recipients
 from models.user import User
 
 
@@ -35,27 +37,45 @@ async def send_low_stock_alert(user: User, product_name: str, current_stock: int
         )
 
 
-async def send_order_update(user: User, order_number: str, status: str):
-    """Send order update notification"""
-    if not user.preferences.notifications.order_updates:
+async def send_low_stock_digest(user: User, products: List[Dict[str, Any]]):
+    """Send one low stock email listing several products"""
+    if not user.preferences.notifications.low_stock_alerts:
         return
-    
+
     if user.preferences.notifications.email:
+        rows = "".join(
+            f"""
+                            <tr>
+                                <td style="padding: 6px 0;">{product['product_name']}</td>
+                                <td style="padding: 6px 0; text-align: right;">{product['current_stock']}</td>
+                                <td style="padding: 6px 0; text-align: right;">{product['reorder_point']}</td>
+                            </tr>"""
+            for product in products
+        )
+        subject = (
+            f"Low Stock Alert: {products[0]['product_name']}" if len(products) == 1
+            else f"Low Stock Alert: {len(products)} products"
+        )
         await send_email(
             email_to=[user.email],
-            subject=f"Order Update: {order_number}",
+            subject=subject,
             html_content=f"""
             <html>
                 <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
                     <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                        <h2 style="color: #0d9488;">📦 Order Update</h2>
+                        <h2 style="color: #dc2626;">⚠️ Low Stock Alert</h2>
                         <p>Hi {user.full_name or user.username},</p>
-                        <p>Your order has been updated:</p>
-                        <div style="background-color: #f0fdfa; border-left: 4px solid #0d9488; padding: 15px; margin: 20px 0;">
-                            <p style="margin: 0;"><strong>Order Number:</strong> {order_number}</p>
-                            <p style="margin: 5px 0 0 0;"><strong>New Status:</strong> {status.upper()}</p>
+                        <p>The following products are running low on stock:</p>
+                        <div style="background-color: #fef2f2; border-left: 4px solid #dc2626; padding: 15px; margin: 20px 0;">
+                            <table style="width: 100%; border-collapse: collapse;">
+                                <tr>
+                                    <th style="text-align: left;">Product</th>
+                                    <th style="text-align: right;">Current Stock</th>
+                                    <th style="text-align: right;">Reorder Point</th>
+                                </tr>{rows}
+                            </table>
                         </div>
-                        <p>You can view the full order details in your StockFlow dashboard.</p>
+                        <p>Please consider restocking these items soon to avoid stockouts.</p>
                         <p style="margin-top: 30px;">Best regards,<br>The StockFlow Team</p>
                     </div>
                 </body>
@@ -64,29 +84,35 @@ async def send_order_update(user: User, order_number: str, status: str):
         )
 
 
-async def send_weekly_report(user: User, report_data: dict):
-    """Send weekly report notification"""
-    if not user.preferences.notifications.weekly_reports:
+def latest_per_product(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Collapse buffered low stock events to the most recent one per product, sorted by name."""
+    latest: Dict[str, Dict[str, Any]] = {}
+    for event in events:
+        latest[event["product_name"]] = event
+    return sorted(latest.values(), key=lambda event: event["product_name"].lower())
+
+
+async def send_order_update(user: User, order_number: str, status: str):
+    """Send order update notification"""
+    if not user.preferences.notifications.order_updates:
         return
     
     if user.preferences.notifications.email:
         await send_email(
             email_to=[user.email],
-            subject="Your Weekly StockFlow Report",
+            subject=f"Order Update: {order_number}",
             html_content=f"""
             <html>
                 <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
                     <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                        <h2 style="color: #0d9488;">📊 Weekly Report</h2>
+                        <h2 style="color: #0d9488;">📦 Order Update</h2>
                         <p>Hi {user.full_name or user.username},</p>
-                        <p>Here's your weekly inventory summary:</p>
-                        <div style="background-color: #f8fafc; border-radius: 8px; padding: 20px; margin: 20px 0;">
-                            <p style="margin: 0;"><strong>Total Sales:</strong> ${report_data.get('total_sales', 0):,.2f}</p>
-                            <p style="margin: 10px 0 0 0;"><strong>Orders Processed:</strong> {report_data.get('orders_count', 0)}</p>
-                            <p style="margin: 10px 0 0 0;"><strong>Low Stock Items:</strong> {report_data.get('low_stock_count', 0)}</p>
-                            <p style="margin: 10px 0 0 0;"><strong>Stock Movements:</strong> {report_data.get('movements_count', 0)}</p>
+                        <p>Your order has been updated:</p>
+                        <div style="background-color: #f0fdfa; border-left: 4px solid #0d9488; padding: 15px; margin: 20px 0;">
+                            <p style="margin: 0;"><strong>Order Number:</strong> {order_number}</p>
+                            <p style="margin: 5px 0 0 0;"><strong>New Status:</strong> {status.upper()}</p>
                         </div>
-                        <p>Keep up the great work managing your inventory!</p>
+                        <p>You can view the full order details in your StockFlow dashboard.</p>
                         <p style="margin-top: 30px;">Best regards,<br>The StockFlow Team</p>
                     </div>
                 </body>
@@ -95,6 +121,155 @@ async def send_weekly_report(user: User, report_data: dict):
         )
 
 
+async def queue_low_stock_alert(organization_id: str, product_name: str, current_stock: int, reorder_point: int):
+    """
+    Queue a low stock alert to the organization's admins and managers. Alerts are
+    buffered for LOW_STOCK_DIGEST_WINDOW_SECONDS and sent as one digest email.
+    """
+    if settings.LOW_STOCK_DIGEST_WINDOW_SECONDS > 0:
+        await enqueue_coalesced(
+            "notify.low_stock_digest",
+            organization_id,
+            {"organization_id": organization_id},
+            {"products": {
+                "product_name": product_name,
+                "current_stock": current_stock,
+                "reorder_point": reorder_point,
+            }},
+            delay_seconds=settings.LOW_STOCK_DIGEST_WINDOW_SECONDS,
+        )
+        return
+    await enqueue("notify.low_stock", {
+        "organization_id": organization_id,
+        "product_name": product_name,
+        "current_stock": current_stock,
+        "reorder_point": reorder_point,
+    })
+
+
+async def queue_order_update(organization_id: str, order_number: str, status: str):
+    """Queue order update emails to the organization's admins and managers."""
+    await enqueue("notify.order_update", {
+        "organization_id": organization_id,
+        "order_number": order_number,
+        "status": status,
+    })
+
+
+# Background job handlers. An organization-wide notification fans out into one
+# email job per recipient, so a retry never re-sends to recipients already reached.
+
+@job_handler("notify.low_stock")
+async def _fan_out_low_stock_alert(payload: Dict[str, Any]):
+    recipients = await get_org_notification_recipients(payload["organization_id"])
+    await enqueue_many([
+        ("email.low_stock", {**payload, "user_id": str(recipient.id)})
+        for recipient in recipients
+    ])
+
+
+@job_handler("notify.low_stock_digest")
+async def _fan_out_low_stock_digest(payload: Dict[str, Any]):
+    products = latest_per_product(payload.get("products", []))
+    if not products:
+        return
+    recipients = await get_org_notification_recipients(payload["organization_id"])
+    await enqueue_many([
+        ("email.low_stock_digest", {"products": products, "user_id": str(recipient.id)})
+        for recipient in recipients
+    ])
+
+
+@job_handler("notify.order_update")
+async def _fan_out_order_update(payload: Dict[str, Any]):
+    recipients = await get_org_notification_recipients(payload["organization_id"])
+    await enqueue_many([
+        ("email.order_update", {**payload, "user_id": str(recipient.id)})
+        for recipient in recipients
+    ])
+
+
+@job_handler("email.low_stock")
+async def _deliver_low_stock_alert(payload: Dict[str, Any]):
+    user = await User.get(payload["user_id"])
+    if not user or not user.is_active:
+        return
+    await send_low_stock_alert(
+        user=user,
+        product_name=payload["product_name"],
+        current_stock=payload["current_stock"],
+        reorder_point=payload["reorder_point"],
+    )
+
+
+@job_handler("email.low_stock_digest")
+async def _deliver_low_stock_digest(payload: Dict[str, Any]):
+    user = await User.get(payload["user_id"])
+    if not user or not user.is_active:
+        return
+    await send_low_stock_digest(user=user, products=payload["products"])
+
+
+@job_handler("email.order_update")
+async def _deliver_order_update(payload: Dict[str, Any]):
+    user = await User.get(payload["user_id"])
+    if not user or not user.is_active:
+        return
+    await send_order_update(user=user, order_number=payload["order_number"], status=payload["status"])
+
+
+# Rendered with str.format; the per-organization summary is rendered once and shared by its users
+_WEEKLY_REPORT_TEMPLATE = """
+        <html>
+            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                    <h2 style="color: #0d9488;">📊 Weekly Report</h2>
+                    <p>Hi {name},</p>
+                    <p>Here's your weekly inventory summary:</p>
+                    {summary}
+                    <p>Keep up the great work managing your inventory!</p>
+                    <p style="margin-top: 30px;">Best regards,<br>The StockFlow Team</p>
+                </div>
+            </body>
+        </html>
+        """
+
+
+def weekly_report_summary(report_data: dict) -> str:
+    """HTML block with an organization's weekly figures"""
+    return f"""<div style="background-color: #f8fafc; border-radius: 8px; padding: 20px; margin: 20px 0;">
+                        <p style="margin: 0;"><strong>Total Sales:</strong> ${report_data.get('total_sales', 0):,.2f}</p>
+                        <p style="margin: 10px 0 0 0;"><strong>Orders Processed:</strong> {report_data.get('orders_count', 0)}</p>
+                        <p style="margin: 10px 0 0 0;"><strong>Low Stock Items:</strong> {report_data.get('low_stock_count', 0)}</p>
+                        <p style="margin: 10px 0 0 0;"><strong>Stock Movements:</strong> {report_data.get('movements_count', 0)}</p>
+                    </div>"""
+
+
+def weekly_report_email(user: User, report_data: dict, summary: Optional[str] = None) -> Optional[OutgoingEmail]:
+    """
+    Weekly report email for a user, or None if they do not want it by email.
+    Pass `summary` (weekly_report_summary(report_data)) to reuse it across users.
+    """
+    if not user.preferences.notifications.weekly_reports or not user.preferences.notifications.email:
+        return None
+
+    return OutgoingEmail(
+        email_to=[user.email],
+        subject="Your Weekly StockFlow Report",
+        html_content=_WEEKLY_REPORT_TEMPLATE.format(
+            name=user.full_name or user.username,
+            summary=summary if summary is not None else weekly_report_summary(report_data),
+        ),
+    )
+
+
+async def send_weekly_report(user: User, report_data: dict):
+    """Send weekly report notification"""
+    email = weekly_report_email(user, report_data)
+    if email:
+        await send_email(email_to=email.email_to, subject=email.subject, html_content=email.html_content)
+
+
 async def send_push_notification_test(user: User):
     """Send a test notification when push notifications are enabled"""
     await send_email(
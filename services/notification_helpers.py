@@ -1,5 +1,6 @@
 """Helper functions for notification management"""
-from typing import List
+from typing import List, Optional
+from core.cache import notification_recipient_cache
 from models.user import User, UserRole
 
 
@@ -10,11 +11,22 @@ async def get_org_notification_recipients(organization_id: str) -> List[User]:
     """
     if not organization_id:
         return []
-        
+
+    recipients = notification_recipient_cache.get(organization_id)
+    if recipients is not None:
+        return recipients
+
     recipients = await User.find({
         "organization_id": organization_id,
         "role": {"$in": [UserRole.ADMIN, UserRole.MANAGER]},
         "is_active": True
     }).to_list()
-    
+    notification_recipient_cache.set(organization_id, recipients)
     return recipients
+
+
+def invalidate_notification_recipients(*organization_ids: Optional[str]) -> None:
+    """Drop cached recipients after users of these organizations are created, changed or removed."""
+    for organization_id in organization_ids:
+        if organization_id:
+            notification_recipient_cache.invalidate(organization_id)
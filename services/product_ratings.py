@@ -0,0 +1,95 @@
+"""
+Rating summary kept on products (rating_sum, rating_count, avg_rating).
+
+Only approved reviews count, so the summary changes when a review is approved,
+rejected after approval, or deleted while approved. Moderation applies the
+change with a single-document pipeline update; rebuild_rating_summaries()
+recomputes it from product_reviews for backfills or to repair drift.
+"""
+from typing import Any, Dict, List, Optional, Set
+
+from beanie import PydanticObjectId
+from pymongo import UpdateOne
+
+from models.product import Product
+from models.product_review import ProductReview
+
+REBUILD_BATCH_SIZE = 1000
+
+# Recompute the average from the counters in the same atomic update
+_AVG_RATING_STAGE = {
+    "$set": {
+        "avg_rating": {
+            "$cond": [
+                {"$gt": ["$rating_count", 0]},
+                {"$divide": ["$rating_sum", "$rating_count"]},
+                0,
+            ]
+        }
+    }
+}
+
+
+async def apply_rating_change(product_id: str, rating: int, sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) one approved review's rating on its product."""
+    try:
+        obj_id = PydanticObjectId(product_id)
+    except Exception:
+        return
+    await Product.get_motor_collection().update_one(
+        {"_id": obj_id},
+        [
+            {"$set": {
+                "rating_sum": {"$add": [{"$ifNull": ["$rating_sum", 0]}, sign * rating]},
+                "rating_count": {"$add": [{"$ifNull": ["$rating_count", 0]}, sign]},
+            }},
+            _AVG_RATING_STAGE,
+        ],
+    )
+
+
+async def rebuild_rating_summaries(organization_id: Optional[str] = None) -> int:
+    """
+    Recompute rating summaries from approved reviews (all organizations, or one)
+    and reset products without approved reviews. Returns the number of products rated.
+    """
+    match: Dict[str, Any] = {"is_approved": True}
+    scope: Dict[str, Any] = {}
+    if organization_id:
+        match["organization_id"] = organization_id
+        scope["organization_id"] = organization_id
+
+    collection = Product.get_motor_collection()
+    rated: Set[PydanticObjectId] = set()
+    ops: List[UpdateOne] = []
+
+    async def flush(force: bool = False) -> None:
+        nonlocal ops
+        if ops and (force or len(ops) >= REBUILD_BATCH_SIZE):
+            await collection.bulk_write(ops, ordered=False)
+            ops = []
+
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": "$product_id", "rating_sum": {"$sum": "$rating"}, "rating_count": {"$sum": 1}}},
+    ]
+    async for row in ProductReview.get_motor_collection().aggregate(pipeline, allowDiskUse=True):
+        try:
+            obj_id = PydanticObjectId(row["_id"])
+        except Exception:
+            continue
+        rated.add(obj_id)
+        ops.append(UpdateOne({"_id": obj_id}, {"$set": {
+            "rating_sum": row["rating_sum"],
+            "rating_count": row["rating_count"],
+            "avg_rating": row["rating_sum"] / row["rating_count"],
+        }}))
+        await flush()
+
+    # Products without approved reviews: reset stale summaries and backfill missing ones
+    async for doc in collection.find({**scope, "rating_count": {"$ne": 0}}, {"_id": 1}):
+        if doc["_id"] not in rated:
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"rating_sum": 0, "rating_count": 0, "avg_rating": 0}}))
+            await flush()
+    await flush(force=True)
+    return len(rated)
@@ -0,0 +1,143 @@
+"""
+Maintenance of the daily sales rollups (models.sales_rollup).
+
+Sale writes apply their contribution with $inc upserts; rebuild_rollups()
+recomputes rows from the sales collection for history or to repair drift.
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import PyMongoError
+
+from models.sale import Sale, SaleStatus
+from models.sales_rollup import (
+    ROLLUP_KEY_FIELDS,
+    RollupKey,
+    SalesDailyRollup,
+    merge_increments,
+    sale_rollup_increments,
+)
+
+logger = logging.getLogger(__name__)
+
+REBUILD_BATCH_SIZE = 1000
+
+
+async def apply_rollup_increments(increments: Dict[RollupKey, Dict[str, Any]]) -> None:
+    """
+    $inc-upsert rollup rows. Rollups are derived data, so a failure is logged
+    rather than failing the sale write; rebuild_rollups() repairs it.
+    """
+    if not increments:
+        return
+    now = datetime.utcnow()
+    ops = [
+        UpdateOne(
+            dict(zip(ROLLUP_KEY_FIELDS, key)),
+            {"$inc": inc, "$set": {"updated_at": now}},
+            upsert=True,
+        )
+        for key, inc in increments.items()
+    ]
+    try:
+        await SalesDailyRollup.get_motor_collection().bulk_write(ops, ordered=False)
+    except PyMongoError:
+        logger.exception("Failed to update sales rollups; run scripts/rebuild_sales_rollups.py to repair")
+
+
+async def record_sales(sales: Iterable[Sale], sign: int = 1) -> None:
+    """Add (or with sign=-1 remove) the contribution of created (deleted) sales."""
+    await apply_rollup_increments(merge_increments([sale_rollup_increments(sale, sign) for sale in sales]))
+
+
+async def record_sale_update(before: Dict[RollupKey, Dict[str, Any]], sale: Sale) -> None:
+    """Move an updated sale's contribution; `before` is sale_rollup_increments(sale, -1) taken before the update."""
+    await apply_rollup_increments(merge_increments([before, sale_rollup_increments(sale)]))
+
+
+def _rebuild_pipelines(match: Dict[str, Any]) -> List[List[Dict[str, Any]]]:
+    day = {
+        "$dateFromParts": {
+            "year": {"$year": "$created_at"},
+            "month": {"$month": "$created_at"},
+            "day": {"$dayOfMonth": "$created_at"},
+        }
+    }
+    row = {
+        "_id": 0,
+        "organization_id": "$_id.organization_id",
+        "date": "$_id.date",
+        "vendor_id": {"$ifNull": ["$_id.vendor_id", None]},
+        "sales_count": 1,
+        "quantity": 1,
+        "revenue": 1,
+    }
+    sale_rows = [
+        {"$match": match},
+        {"$group": {
+            "_id": {"organization_id": "$organization_id", "date": day, "vendor_id": "$vendor_id"},
+            "sales_count": {"$sum": 1},
+            "quantity": {"$sum": {"$sum": "$items.quantity"}},
+            "revenue": {"$sum": "$total"},
+        }},
+        {"$project": {**row, "product_id": {"$literal": None}}},
+    ]
+    product_rows = [
+        {"$match": match},
+        {"$unwind": "$items"},
+        # Per sale first, so a product on several lines of one sale counts as one sale
+        {"$group": {
+            "_id": {
+                "organization_id": "$organization_id", "date": day, "vendor_id": "$vendor_id",
+                "product_id": "$items.product_id", "sale": "$_id",
+            },
+            "quantity": {"$sum": "$items.quantity"},
+            "revenue": {"$sum": "$items.total"},
+        }},
+        {"$group": {
+            "_id": {
+                "organization_id": "$_id.organization_id", "date": "$_id.date",
+                "vendor_id": "$_id.vendor_id", "product_id": "$_id.product_id",
+            },
+            "sales_count": {"$sum": 1},
+            "quantity": {"$sum": "$quantity"},
+            "revenue": {"$sum": "$revenue"},
+        }},
+        {"$project": {**row, "product_id": "$_id.product_id"}},
+    ]
+    return [sale_rows, product_rows]
+
+
+async def rebuild_rollups(organization_id: Optional[str] = None) -> int:
+    """
+    Recompute rollups from sales (all organizations, or one) and drop rows with
+    no remaining sales. Returns the number of rows written.
+    """
+    started = datetime.utcnow()
+    match: Dict[str, Any] = {"status": SaleStatus.COMPLETED.value}
+    scope: Dict[str, Any] = {}
+    if organization_id:
+        match["organization_id"] = organization_id
+        scope["organization_id"] = organization_id
+
+    collection = SalesDailyRollup.get_motor_collection()
+    written = 0
+    for pipeline in _rebuild_pipelines(match):
+        ops: List[ReplaceOne] = []
+        async for doc in Sale.get_motor_collection().aggregate(pipeline, allowDiskUse=True):
+            doc["updated_at"] = started
+            key = {field: doc[field] for field in ROLLUP_KEY_FIELDS}
+            ops.append(ReplaceOne(key, doc, upsert=True))
+            if len(ops) >= REBUILD_BATCH_SIZE:
+                await collection.bulk_write(ops, ordered=False)
+                written += len(ops)
+                ops = []
+        if ops:
+            await collection.bulk_write(ops, ordered=False)
+            written += len(ops)
+
+    # Rows not rewritten (and not touched by a sale since) no longer have any sales
+    await collection.delete_many({**scope, "updated_at": {"$lt": started}})
+    return written
@@ -0,0 +1,392 @@
+"""
+Atomic, batched stock mutations shared by sales, stock movements and PO receiving.
+
+All variant stock changes of a request go to Mongo as one ordered bulk_write of
+conditional updates: decrements only match while the variant still has enough
+stock, so concurrent terminals cannot oversell. Each update also pushes a
+token onto the product's pending_stock_ops. When fewer updates matched than
+were sent, one read of those tokens shows which went through; they are undone
+with one compensating bulk_write (standalone MongoDB deployments have no
+multi-document transactions) and the first change without a token is rejected.
+The tokens are pulled with the status refresh that follows every batch.
+
+Products created before warehouse_stocks defaulted to a list may store null
+there; run scripts/backfill_product_aggregates.py so new records can be pushed.
+"""
+import logging
+from datetime import datetime
+from typing import Any, Collection, Dict, List, Optional, Set, Tuple
+
+from beanie.odm.utils.encoder import Encoder
+from bson import ObjectId
+from pydantic import BaseModel, Field
+from pymongo import UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from models.product import Product, ProductStatus, VARIANT_AGGREGATES_STAGE
+from models.stock_movement import MovementType, StockMovement
+from services.product_loader import ProductLoader
+from services.storefront_catalog import invalidate_storefront_categories
+
+logger = logging.getLogger(__name__)
+
+# Tokens of applied but not yet confirmed stock updates, see the module docstring
+PENDING_OPS_FIELD = "pending_stock_ops"
+
+
+class StockError(Exception):
+    """
+    A stock change that cannot be applied; carries the HTTP status to report and
+    the position of the offending change in the list passed to apply_stock_changes.
+    """
+
+    def __init__(self, status_code: int, detail: str, change_index: Optional[int] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.change_index = change_index
+
+
+class StockChange(BaseModel):
+    """One variant stock delta and the movement recorded for it."""
+    product_id: str
+    sku: Optional[str] = None
+    quantity: int  # signed change applied to the variant stock
+    movement_type: MovementType
+    product_name: Optional[str] = None  # used in error messages before the product is loaded
+    # Per-warehouse stock record to adjust alongside the variant total
+    warehouse_id: Optional[str] = None
+    warehouse_name: Optional[str] = None
+    # Extra product fields to set in the same update (e.g. PO associations)
+    set_fields: Dict[str, Any] = Field(default_factory=dict)
+    # Extra StockMovement fields (quantity, notes, from_location, ...)
+    movement_fields: Dict[str, Any] = Field(default_factory=dict)
+
+
+def _resolve_variant_sku(product: Product, sku: Optional[str], case_insensitive: bool) -> Optional[str]:
+    """SKU of the variant a change refers to; a single-variant product needs none."""
+    if sku:
+        wanted = sku.strip().upper() if case_insensitive else sku
+        for variant in product.variants:
+            candidate = variant.sku.strip().upper() if case_insensitive else variant.sku
+            if candidate == wanted:
+                return variant.sku
+    if len(product.variants) == 1:
+        return product.variants[0].sku
+    return None
+
+
+def _missing_product(change: StockChange, index: int) -> StockError:
+    return StockError(404, f"Product {change.product_name or change.product_id} (ID: {change.product_id}) not found", index)
+
+
+def _missing_sku(product: Product, index: int) -> StockError:
+    return StockError(400, f"Specific variant SKU is required for product {product.name}", index)
+
+
+def _insufficient_stock(change: StockChange, product: Product, index: int) -> StockError:
+    return StockError(
+        400,
+        f"Insufficient stock for variant {change.sku or 'default'} of product {change.product_name or product.name}",
+        index,
+    )
+
+
+def _rejected_change(change: StockChange, product: Product, index: int) -> StockError:
+    """Error for a change whose guarded update matched nothing."""
+    if change.quantity < 0:
+        return _insufficient_stock(change, product, index)
+    # The variant was removed, or its warehouse record was created by another request
+    return StockError(
+        409,
+        f"Stock of variant {change.sku or 'default'} of product {change.product_name or product.name} "
+        f"changed concurrently; retry",
+        index,
+    )
+
+
+class StockLedger:
+    """
+    Variant stock of loaded products, for checking many changes before applying
+    them; the guarded updates of apply_stock_changes still decide under concurrency.
+    """
+
+    def __init__(self, products: Dict[str, Product]):
+        self._products = products
+        self._stock = {
+            (product_id, variant.sku): variant.stock
+            for product_id, product in products.items()
+            for variant in product.variants
+        }
+
+    def reserve(self, changes: List[StockChange]) -> Optional[StockError]:
+        """Take all of `changes` from the remaining stock, or none of them and return why."""
+        pending: Dict[Tuple[str, str], int] = {}
+        for index, change in enumerate(changes):
+            product = self._products.get(change.product_id)
+            if not product:
+                return _missing_product(change, index)
+            sku = _resolve_variant_sku(product, change.sku, False)
+            if sku is None:
+                return _missing_sku(product, index)
+            key = (change.product_id, sku)
+            pending[key] = pending.get(key, self._stock[key]) + change.quantity
+            if pending[key] < 0:
+                return _insufficient_stock(change, product, index)
+        self._stock.update(pending)
+        return None
+
+
+def _status_stage(default_reorder_point: int) -> Dict[str, Any]:
+    return {
+        "status": {
+            "$switch": {
+                "branches": [
+                    {"case": {"$eq": ["$total_stock", 0]}, "then": ProductStatus.OUT_OF_STOCK.value},
+                    {
+                        "case": {"$lte": ["$total_stock", {"$ifNull": ["$reorder_point", default_reorder_point]}]},
+                        "then": ProductStatus.LOW_STOCK.value,
+                    },
+                ],
+                "default": ProductStatus.ACTIVE.value,
+            }
+        }
+    }
+
+
+def _build_op(
+    organization_id: str,
+    product: Product,
+    sku: str,
+    change: StockChange,
+    now: datetime,
+    token: str,
+) -> Tuple[UpdateOne, UpdateOne]:
+    """The guarded update for one change and its compensating update."""
+    variant = next(v for v in product.variants if v.sku == sku)
+    element: Dict[str, Any] = {"sku": sku}
+    if change.quantity < 0:
+        element["stock"] = {"$gte": -change.quantity}
+    inc: Dict[str, int] = {"variants.$[v].stock": change.quantity}
+    array_filters: List[Dict[str, Any]] = [{"v.sku": sku}]
+    push: Dict[str, Any] = {PENDING_OPS_FIELD: token}
+    pull: Dict[str, Any] = {PENDING_OPS_FIELD: token}
+
+    if change.warehouse_id:
+        if any(ws.warehouse_id == change.warehouse_id for ws in variant.warehouse_stocks or []):
+            element["warehouse_stocks.warehouse_id"] = change.warehouse_id
+            inc["variants.$[v].warehouse_stocks.$[w].stock"] = change.quantity
+            array_filters.append({"w.warehouse_id": change.warehouse_id})
+        else:
+            # Start a per-warehouse record; the guard fails if another request started it meanwhile
+            element["warehouse_stocks.warehouse_id"] = {"$ne": change.warehouse_id}
+            push["variants.$[v].warehouse_stocks"] = {
+                "warehouse_id": change.warehouse_id, "warehouse_name": change.warehouse_name, "stock": change.quantity,
+            }
+            pull["variants.$[v].warehouse_stocks"] = {"warehouse_id": change.warehouse_id}
+
+    # Raw updates bypass Beanie, so encode values (e.g. dates) the way it would
+    encoder = Encoder()
+    restore = encoder.encode({field: getattr(product, field, None) for field in change.set_fields})
+    undo_update: Dict[str, Any] = {"$inc": {path: -delta for path, delta in inc.items()}, "$pull": pull}
+    if restore:
+        undo_update["$set"] = restore
+    product_filter = {"_id": product.id, "organization_id": organization_id}
+    return (
+        UpdateOne(
+            {**product_filter, "variants": {"$elemMatch": element}},
+            {"$inc": inc, "$push": push, "$set": {**encoder.encode(change.set_fields), "updated_at": now}},
+            array_filters=array_filters,
+        ),
+        UpdateOne(product_filter, undo_update, array_filters=array_filters),
+    )
+
+
+class StockBatch:
+    """Result of apply_stock_changes; rollback() undoes it if a later step of the request fails."""
+
+    def __init__(
+        self,
+        organization_id: str,
+        products: Dict[str, Product],
+        movements: List[StockMovement],
+        undo_ops: List[Tuple[int, UpdateOne]],
+        movement_changes: List[int],
+        default_reorder_point: int,
+    ):
+        self.organization_id = organization_id
+        self.products = products
+        self.movements = movements
+        self._undo_ops = undo_ops  # (change index, compensating update)
+        self._movement_changes = movement_changes  # change index of each movement
+        self._default_reorder_point = default_reorder_point
+
+    async def rollback(self, change_indexes: Optional[Collection[int]] = None) -> None:
+        """Undo the whole batch, or only the changes at `change_indexes` of the applied list."""
+        def selected(index: int) -> bool:
+            return change_indexes is None or index in change_indexes
+
+        await _compensate([undo for index, undo in self._undo_ops if selected(index)])
+        self._undo_ops = [(index, undo) for index, undo in self._undo_ops if not selected(index)]
+
+        movement_ids = [
+            m.id for m, index in zip(self.movements, self._movement_changes) if selected(index) and m.id is not None
+        ]
+        if movement_ids:
+            await StockMovement.find({"_id": {"$in": movement_ids}}).delete()
+        kept = [(m, index) for m, index in zip(self.movements, self._movement_changes) if not selected(index)]
+        self.movements = [m for m, _ in kept]
+        self._movement_changes = [index for _, index in kept]
+
+        product_ids = [p.id for p in self.products.values()]
+        await refresh_stock_status(self.organization_id, product_ids, self._default_reorder_point)
+        if change_indexes is not None:
+            self.products = await _load_products(self.organization_id, product_ids)
+
+
+async def _compensate(undo_ops: List[UpdateOne]) -> None:
+    """Undo applied updates, latest first, in one ordered bulk write."""
+    if not undo_ops:
+        return
+    try:
+        await Product.get_motor_collection().bulk_write(list(reversed(undo_ops)), ordered=True)
+    except BulkWriteError as e:
+        logger.error(f"Stock rollback failed, manual correction needed: {e.details}")
+        raise
+
+
+async def _applied_tokens(organization_id: str, product_ids: List[Any], tokens: List[str]) -> Set[str]:
+    """The tokens of `tokens` still pending on the products, i.e. the updates that were applied."""
+    docs = await Product.get_motor_collection().find(
+        {"_id": {"$in": product_ids}, "organization_id": organization_id, PENDING_OPS_FIELD: {"$in": tokens}},
+        {PENDING_OPS_FIELD: 1},
+    ).to_list(length=None)
+    pending = {token for doc in docs for token in doc.get(PENDING_OPS_FIELD) or []}
+    return pending.intersection(tokens)
+
+
+async def _load_products(organization_id: str, product_ids: List[Any]) -> Dict[str, Product]:
+    products = await Product.find({"_id": {"$in": product_ids}, "organization_id": organization_id}).to_list()
+    return {str(product.id): product for product in products}
+
+
+async def refresh_stock_status(
+    organization_id: str,
+    product_ids: List[Any],
+    default_reorder_point: int = 0,
+    tokens: Optional[List[str]] = None,
+) -> None:
+    """
+    Recompute the variant aggregates and stock status of products server-side,
+    using `default_reorder_point` for products without one, and clear the
+    pending markers `tokens` of a completed batch in the same bulk write.
+    """
+    query = {"_id": {"$in": product_ids}, "organization_id": organization_id}
+    ops = [UpdateMany(query, [{"$set": VARIANT_AGGREGATES_STAGE}, {"$set": _status_stage(default_reorder_point)}])]
+    if tokens:
+        ops.append(UpdateMany(query, {"$pull": {PENDING_OPS_FIELD: {"$in": tokens}}}))
+    await Product.get_motor_collection().bulk_write(ops, ordered=False)
+
+
+async def apply_stock_changes(
+    organization_id: str,
+    changes: List[StockChange],
+    *,
+    reference: Optional[str] = None,
+    performed_by: Optional[str] = None,
+    notes: Optional[str] = None,
+    default_reorder_point: int = 0,
+    case_insensitive_sku: bool = False,
+    skip_missing: bool = False,
+    products: Optional[Dict[str, Product]] = None,
+) -> StockBatch:
+    """
+    Apply `changes` atomically per variant and record one StockMovement each.
+    Raises StockError (nothing applied) when a product or variant is missing, unless
+    `skip_missing`, or when a decrement exceeds the available stock.
+    Product aggregates and status (using `default_reorder_point` when a product
+    has none) are recomputed server-side afterwards. `products` (by id) can be
+    passed when the caller has just loaded them; the guards still check stock.
+    """
+    if products is None:
+        products = await ProductLoader(organization_id).add(change.product_id for change in changes).load()
+
+    now = datetime.utcnow()
+    batch_id = str(ObjectId())
+    ops: List[UpdateOne] = []
+    undo_ops: List[Tuple[int, UpdateOne]] = []
+    tokens: List[str] = []
+    applied_changes: List[Tuple[int, StockChange, Product, str]] = []
+    for index, change in enumerate(changes):
+        product = products.get(change.product_id)
+        if not product:
+            if skip_missing:
+                continue
+            raise _missing_product(change, index)
+        sku = _resolve_variant_sku(product, change.sku, case_insensitive_sku)
+        if sku is None:
+            if skip_missing:
+                continue
+            raise _missing_sku(product, index)
+        token = f"{batch_id}:{len(ops)}"
+        op, undo = _build_op(organization_id, product, sku, change, now, token)
+        ops.append(op)
+        undo_ops.append((index, undo))
+        tokens.append(token)
+        applied_changes.append((index, change, product, sku))
+
+    if not ops:
+        return StockBatch(organization_id, {}, [], [], [], default_reorder_point)
+
+    touched = {str(product.id): product for _, _, product, _ in applied_changes}
+    product_ids = [p.id for p in touched.values()]
+    write_error: Optional[BulkWriteError] = None
+    try:
+        result = await Product.get_motor_collection().bulk_write(ops, ordered=True)
+        matched = result.matched_count
+    except BulkWriteError as e:
+        write_error, matched = e, e.details.get("nMatched", 0)
+    if write_error or matched < len(ops):
+        # Some guards failed (or a write errored); the pending markers tell which updates went through
+        applied = await _applied_tokens(organization_id, product_ids, tokens)
+        await _compensate([undo for token, (_, undo) in zip(tokens, undo_ops) if token in applied])
+        if write_error:
+            raise write_error
+        position = next(position for position, token in enumerate(tokens) if token not in applied)
+        index, change, product, _ = applied_changes[position]
+        raise _rejected_change(change, product, index)
+
+    movements = [
+        StockMovement(**{
+            "organization_id": organization_id,
+            "product_id": str(product.id),
+            "product_name": product.name,
+            "sku": sku,
+            "type": change.movement_type,
+            "quantity": change.quantity,
+            "reference": reference,
+            "notes": notes,
+            "performed_by": performed_by,
+            "created_at": now,
+            **change.movement_fields,
+        })
+        for _, change, product, sku in applied_changes
+    ]
+    movement_changes = [index for index, _, _, _ in applied_changes]
+    batch = StockBatch(organization_id, touched, movements, undo_ops, movement_changes, default_reorder_point)
+
+    try:
+        await refresh_stock_status(organization_id, product_ids, default_reorder_point, tokens)
+        # The refresh moves discontinued products back to a stock status, so they list again
+        if any(p.status == ProductStatus.DISCONTINUED for p in touched.values()):
+            invalidate_storefront_categories(organization_id)
+        if movements:
+            result = await StockMovement.insert_many(movements)
+            for movement, inserted_id in zip(movements, result.inserted_ids):
+                movement.id = inserted_id
+    except Exception:
+        await batch.rollback()
+        raise
+
+    batch.products = await _load_products(organization_id, product_ids)
+    return batch
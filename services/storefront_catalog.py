@@ -0,0 +1,165 @@
+"""
+Query planning for the public storefront product listing, and its category list.
+
+plan_storefront_products() turns the listing's filters and sort option into one
+Mongo filter plus an indexed sort; find_storefront_products() runs it with
+skip/limit applied after filtering and counts the matching products.
+storefront_categories() is cached per organization until product or category
+writes call invalidate_storefront_categories().
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from beanie import PydanticObjectId
+from pydantic import BaseModel
+
+from core.cache import storefront_category_cache
+from models.category import Category
+from models.product import Product, ProductStatus
+
+# Case-insensitive name ordering; must match the collation of the name index
+NAME_COLLATION: Dict[str, Any] = {"locale": "en", "strength": 2}
+
+# Sort option -> index order, each ending with _id so pages are stable
+STOREFRONT_SORTS: Dict[str, List[Tuple[str, int]]] = {
+    "newest": [("created_at", -1), ("_id", -1)],
+    "price_asc": [("min_unit_price", 1), ("_id", 1)],
+    "price_desc": [("min_unit_price", -1), ("_id", -1)],
+    "name_asc": [("name", 1), ("_id", 1)],
+    "name_desc": [("name", -1), ("_id", -1)],
+    # best_selling is a proxy: rating, then number of reviews (no order counts on products)
+    "rating": [("avg_rating", -1), ("rating_count", -1), ("_id", -1)],
+    "best_selling": [("avg_rating", -1), ("rating_count", -1), ("_id", -1)],
+    # Featured products first (see ProductQueryPlan.featured_ids), each group oldest first
+    "featured": [("created_at", 1), ("_id", 1)],
+}
+
+
+class ProductQueryPlan(BaseModel):
+    filter: Dict[str, Any]
+    sort: List[Tuple[str, int]]
+    collation: Optional[Dict[str, Any]] = None
+    featured_ids: List[PydanticObjectId] = []  # listed before all other matches
+
+
+def plan_storefront_products(
+    organization_id: str,
+    *,
+    search: Optional[str] = None,
+    category: Optional[str] = None,
+    location: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    sort: str = "newest",
+    featured_product_ids: Optional[List[str]] = None,
+) -> ProductQueryPlan:
+    """Build the filter and sort for a storefront listing request."""
+    query: Dict[str, Any] = {"organization_id": organization_id, "status": {"$ne": "discontinued"}}
+    conditions: List[Dict[str, Any]] = []
+
+    if search:
+        conditions.append({"$or": [
+            {"name": {"$regex": search, "$options": "i"}},
+            {"description": {"$regex": search, "$options": "i"}},
+            {"variants.sku": {"$regex": search, "$options": "i"}},
+        ]})
+
+    if category:
+        query["category"] = category
+
+    if location:
+        conditions.append({"$or": [{"location_id": location}, {"warehouse_id": location}]})
+
+    # Lowest variant list price (products without variants have none and never match)
+    if min_price is not None or max_price is not None:
+        price: Dict[str, float] = {}
+        if min_price is not None:
+            price["$gte"] = min_price
+        if max_price is not None:
+            price["$lte"] = max_price
+        query["min_unit_price"] = price
+
+    if len(conditions) == 1:
+        query.update(conditions[0])
+    elif conditions:
+        query["$and"] = conditions
+
+    featured_ids: List[PydanticObjectId] = []
+    if sort == "featured":
+        for product_id in featured_product_ids or []:
+            try:
+                featured_ids.append(PydanticObjectId(product_id))
+            except Exception:
+                continue
+
+    return ProductQueryPlan(
+        filter=query,
+        sort=STOREFRONT_SORTS[sort],
+        collation=NAME_COLLATION if sort in ("name_asc", "name_desc") else None,
+        featured_ids=featured_ids,
+    )
+
+
+async def _find(plan: ProductQueryPlan, query: Dict[str, Any], skip: int, limit: int) -> List[Product]:
+    kwargs = {"collation": plan.collation} if plan.collation else {}
+    return await Product.find(query, **kwargs).sort(plan.sort).skip(skip).limit(limit).to_list()
+
+
+async def find_storefront_products(plan: ProductQueryPlan, skip: int, limit: int) -> Tuple[List[Product], int]:
+    """One page of products matching the plan, and the number of matching products."""
+    if not plan.featured_ids:
+        products, total = await asyncio.gather(
+            _find(plan, plan.filter, skip, limit),
+            Product.find(plan.filter).count(),
+        )
+        return products, total
+
+    # Featured products form a short first segment; page across both segments
+    featured = {**plan.filter, "_id": {"$in": plan.featured_ids}}
+    others = {**plan.filter, "_id": {"$nin": plan.featured_ids}}
+    featured_total, others_total = await asyncio.gather(
+        Product.find(featured).count(),
+        Product.find(others).count(),
+    )
+    products: List[Product] = []
+    if skip < featured_total:
+        products = await _find(plan, featured, skip, limit)
+    if len(products) < limit:
+        products += await _find(plan, others, max(skip - featured_total, 0), limit - len(products))
+    return products, featured_total + others_total
+
+
+async def storefront_categories(organization_id: str) -> List[Dict[str, Any]]:
+    """The organization's categories with their number of listed (not discontinued) products."""
+    categories = storefront_category_cache.get(organization_id)
+    if categories is not None:
+        return categories
+
+    counts_pipeline = [
+        {"$match": {"organization_id": organization_id, "status": {"$ne": ProductStatus.DISCONTINUED.value}}},
+        {"$group": {"_id": "$category", "count": {"$sum": 1}}},
+    ]
+    rows, counts = await asyncio.gather(
+        Category.find({"organization_id": organization_id}).to_list(),
+        Product.get_motor_collection().aggregate(counts_pipeline).to_list(length=None),
+    )
+    product_counts = {row["_id"]: row["count"] for row in counts}
+    categories = [
+        {
+            "id": str(category.id),
+            "name": category.name,
+            "description": category.description,
+            "color": category.color,
+            "icon": category.icon,
+            "product_count": product_counts.get(category.name, 0),
+        }
+        for category in rows
+    ]
+    storefront_category_cache.set(organization_id, categories)
+    return categories
+
+
+def invalidate_storefront_categories(organization_id: Optional[str]) -> None:
+    """Drop cached category counts after products or categories of the organization change."""
+    if organization_id:
+        storefront_category_cache.invalidate(organization_id)
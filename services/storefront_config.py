@@ -0,0 +1,58 @@
+"""
+Cached reads of storefront configs and the platform settings singleton.
+
+Public storefront requests read these on every call, while they only change
+through storefront_admin and platform endpoints, which call the invalidate_*
+functions after writing. Writers should load documents with find_one rather
+than from here, since cached documents are shared between requests.
+"""
+from typing import Optional
+
+from core.cache import platform_settings_cache, storefront_config_cache
+from models.platform_settings import PlatformSettings
+from models.storefront_config import StorefrontConfig
+
+# Cached when no platform settings document exists yet
+_NO_SETTINGS = object()
+
+
+def _cache_config(config: StorefrontConfig) -> None:
+    storefront_config_cache.set(("slug", config.slug), config)
+    storefront_config_cache.set(("organization", config.organization_id), config)
+
+
+async def get_config_by_slug(slug: str) -> Optional[StorefrontConfig]:
+    config = storefront_config_cache.get(("slug", slug))
+    if config is None:
+        config = await StorefrontConfig.find_one({"slug": slug})
+        if config:
+            _cache_config(config)
+    return config
+
+
+async def get_config_for_organization(organization_id: str) -> Optional[StorefrontConfig]:
+    config = storefront_config_cache.get(("organization", organization_id))
+    if config is None:
+        config = await StorefrontConfig.find_one({"organization_id": organization_id})
+        if config:
+            _cache_config(config)
+    return config
+
+
+def invalidate_storefront_config(config: StorefrontConfig, previous_slug: Optional[str] = None) -> None:
+    """Drop a config after it was created or saved; pass the old slug if it changed."""
+    for slug in {config.slug, previous_slug} - {None}:
+        storefront_config_cache.invalidate(("slug", slug))
+    storefront_config_cache.invalidate(("organization", config.organization_id))
+
+
+async def get_platform_settings() -> Optional[PlatformSettings]:
+    settings = platform_settings_cache.get("settings")
+    if settings is None:
+        settings = await PlatformSettings.find_one() or _NO_SETTINGS
+        platform_settings_cache.set("settings", settings)
+    return None if settings is _NO_SETTINGS else settings
+
+
+def invalidate_platform_settings() -> None:
+    platform_settings_cache.invalidate("settings")
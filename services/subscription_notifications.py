@@ -1,11 +1,76 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from core.cache import organization_cache
 from models.alert import Alert, AlertType, AlertPriority
-from models.organization import Organization
+from models.organization import Organization, OrganizationStatus
 from services.email import send_email
+from services.entitlement import ensure_entitlement
+from services.jobs import acquire_lease
+
+logger = logging.getLogger(__name__)
+
+# Alerts start this many days before the trial/subscription ends.
+EXPIRY_WARNING_DAYS = 7
+# Lease taken by the process that runs the periodic expiry scan
+SUBSCRIPTION_SCAN_LEASE = "subscription_expiry_scan"
+
+
+def _expiry_alert_title(expiry_date: datetime) -> str:
+    return f"Subscription expiring on {expiry_date.date().isoformat()}"
+
+
+def _build_expiry_alert(
+    *,
+    organization: Organization,
+    expiry_date: datetime,
+    days_left: int,
+    action_url: Optional[str] = None,
+) -> Alert:
+    message = (
+        f"Your subscription will expire on {expiry_date.date().isoformat()}. "
+        f"Payment must be completed to keep using the platform."
+    )
+    return Alert(
+        organization_id=str(organization.id),
+        type=AlertType.SUBSCRIPTION_EXPIRING,
+        priority=AlertPriority.CRITICAL if days_left <= 3 else AlertPriority.HIGH,
+        title=_expiry_alert_title(expiry_date),
+        message=message,
+        action_url=action_url,
+    )
+
+
+async def _send_expiry_email(organization: Organization, expiry_date: datetime, days_left: int) -> None:
+    if not organization.email:
+        return
+    try:
+        await send_email(
+            email_to=[organization.email],
+            subject="StockFlow subscription expiry notice",
+            html_content=f"""
+            <html>
+                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                    <div style="max-width: 640px; margin: 0 auto; padding: 20px;">
+                        <h2 style="color:#dc2626;">Subscription Expiry Notice</h2>
+                        <p>Hi {organization.name},</p>
+                        <p>Your subscription will expire on <strong>{expiry_date.date().isoformat()}</strong>.</p>
+                        <p>Please complete payment to avoid service interruption.</p>
+                        <p style="margin-top: 18px; color:#64748b; font-size: 13px;">
+                            Days left: {days_left}
+                        </p>
+                    </div>
+                </body>
+            </html>
+            """,
+        )
+    except Exception:
+        # Avoid breaking the caller if email fails; alert still exists in dashboard.
+        pass
 
 
 async def create_subscription_expiry_alert(
@@ -19,60 +84,123 @@ async def create_subscription_expiry_alert(
     Create a dashboard alert (and email) for a subscription/trial expiry.
     Returns True only when we created a new alert (idempotency).
     """
-    title = f"Subscription expiring on {expiry_date.date().isoformat()}"
-
     existing = await Alert.find_one(
         {
             "organization_id": str(organization.id),
             "type": AlertType.SUBSCRIPTION_EXPIRING,
-            "title": title,
+            "title": _expiry_alert_title(expiry_date),
         }
     )
     if existing:
         return False
 
-    message = (
-        f"Your subscription will expire on {expiry_date.date().isoformat()}. "
-        f"Payment must be completed to keep using the platform."
-    )
-
-    alert = Alert(
-        organization_id=str(organization.id),
-        type=AlertType.SUBSCRIPTION_EXPIRING,
-        priority=AlertPriority.CRITICAL if days_left <= 3 else AlertPriority.HIGH,
-        title=title,
-        message=message,
+    alert = _build_expiry_alert(
+        organization=organization,
+        expiry_date=expiry_date,
+        days_left=days_left,
         action_url=action_url,
     )
     await alert.create()
+    await _send_expiry_email(organization, expiry_date, days_left)
+    return True
 
-    # Email notifications to the organization's contact email (if provided)
-    if organization.email:
-        try:
-            await send_email(
-                email_to=[organization.email],
-                subject="StockFlow subscription expiry notice",
-                html_content=f"""
-                <html>
-                    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                        <div style="max-width: 640px; margin: 0 auto; padding: 20px;">
-                            <h2 style="color:#dc2626;">Subscription Expiry Notice</h2>
-                            <p>Hi {organization.name},</p>
-                            <p>Your subscription will expire on <strong>{expiry_date.date().isoformat()}</strong>.</p>
-                            <p>Please complete payment to avoid service interruption.</p>
-                            <p style="margin-top: 18px; color:#64748b; font-size: 13px;">
-                                Days left: {days_left}
-                            </p>
-                        </div>
-                    </body>
-                </html>
-                """,
+
+async def scan_subscription_expiries(
+    now: Optional[datetime] = None,
+    warning_days: int = EXPIRY_WARNING_DAYS,
+) -> Dict[str, int]:
+    """
+    Batched expiry pass over all active organizations.
+
+    Creates the "expiring soon"/"expired" alerts (same title-based idempotency as
+    create_subscription_expiry_alert) and suspends organizations whose trial and
+    subscription have both lapsed. Keeps these writes out of the request path.
+    """
+    now = now or datetime.utcnow()
+    organizations = await Organization.find({"status": OrganizationStatus.ACTIVE}).to_list()
+
+    candidates: List[Tuple[Organization, datetime, int]] = []
+    expired_ids: List[Any] = []
+    for org in organizations:
+        entitlement = await ensure_entitlement(org)
+
+        trial_expiry = entitlement.trial_ends_at
+        subscription_expiry = entitlement.subscription_expires_at
+        if trial_expiry and now <= trial_expiry:
+            expiry_date = trial_expiry
+        elif subscription_expiry and now <= subscription_expiry:
+            expiry_date = subscription_expiry
+        else:
+            expired_ids.append(org.id)
+            expiry_date = subscription_expiry or trial_expiry
+            if expiry_date:
+                days_left = (expiry_date.date() - now.date()).days
+                candidates.append((org, expiry_date, max(days_left, 0)))
+            continue
+
+        days_left = (expiry_date.date() - now.date()).days
+        if days_left <= warning_days:
+            candidates.append((org, expiry_date, days_left))
+
+    if expired_ids:
+        await Organization.find({"_id": {"$in": expired_ids}}).update_many(
+            {"$set": {"status": OrganizationStatus.SUSPENDED, "updated_at": now}}
+        )
+        for org_id in expired_ids:
+            organization_cache.invalidate(str(org_id))
+
+    created = 0
+    if candidates:
+        existing = await Alert.find(
+            {
+                "organization_id": {"$in": [str(org.id) for org, _, _ in candidates]},
+                "type": AlertType.SUBSCRIPTION_EXPIRING,
+                "title": {"$in": list({_expiry_alert_title(expiry) for _, expiry, _ in candidates})},
+            }
+        ).to_list()
+        already_alerted = {(a.organization_id, a.title) for a in existing}
+
+        new_alerts = []
+        to_email = []
+        for org, expiry_date, days_left in candidates:
+            if (str(org.id), _expiry_alert_title(expiry_date)) in already_alerted:
+                continue
+            new_alerts.append(
+                _build_expiry_alert(
+                    organization=org,
+                    expiry_date=expiry_date,
+                    days_left=days_left,
+                    action_url=f"OrganizationMembers?id={org.id}",
+                )
             )
-        except Exception:
-            # Avoid breaking API access if email fails; alert still exists in dashboard.
-            pass
+            to_email.append((org, expiry_date, days_left))
 
-    return True
+        if new_alerts:
+            await Alert.insert_many(new_alerts)
+            created = len(new_alerts)
+            for org, expiry_date, days_left in to_email:
+                await _send_expiry_email(org, expiry_date, days_left)
+
+    return {
+        "organizations_scanned": len(organizations),
+        "alerts_created": created,
+        "organizations_suspended": len(expired_ids),
+    }
+
+
+async def run_subscription_expiry_scheduler(interval_minutes: int) -> None:
+    """
+    Run scan_subscription_expiries every `interval_minutes`. Every API process
+    runs this loop; the lease lets only one of them scan per interval.
+    """
+    while True:
+        try:
+            if await acquire_lease(SUBSCRIPTION_SCAN_LEASE, interval_minutes * 60):
+                summary = await scan_subscription_expiries()
+                logger.info(f"Subscription expiry scan completed: {summary}")
+        except Exception as e:
+            logger.error(f"Subscription expiry scan failed: {str(e)}", exc_info=True)
+        await asyncio.sleep(interval_minutes * 60)
 
 
 async def create_org_approved_notification(
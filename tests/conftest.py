@@ -0,0 +1,124 @@
+"""
+Shared fixtures for tests that need Beanie documents backed by a database.
+
+`mongo` binds the given models to a fresh in-memory mongomock database. mongomock
+enforces unique partial indexes on every document (it ignores the filter), has
+no array_filters support and a bulk_write that does not accept current pymongo
+operations, so those indexes are dropped and ArrayFilterCollection applies
+updates with array filters and runs bulk writes one operation at a time.
+"""
+import copy
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import pytest
+from beanie import init_beanie
+from pymongo import IndexModel, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+
+def _element_matches(element: Any, conditions: Dict[str, Any]) -> bool:
+    if not isinstance(element, dict):
+        return False
+    return all(element.get(field) == value for field, value in conditions.items())
+
+
+def _pulled(element: Any, condition: Any) -> bool:
+    if isinstance(condition, dict):
+        return _element_matches(element, condition)
+    return element == condition
+
+
+def _targets(node: Any, path: List[str], filters: Dict[str, Dict[str, Any]]) -> List[tuple]:
+    """(container, key) pairs addressed by a dotted update path with $[name] segments."""
+    head, rest = path[0], path[1:]
+    if head.startswith("$[") and head.endswith("]"):
+        conditions = filters[head[2:-1]]
+        keys = [i for i, element in enumerate(node) if _element_matches(element, conditions)]
+    else:
+        keys = [int(head) if isinstance(node, list) else head]
+    if not rest:
+        return [(node, key) for key in keys]
+    targets = []
+    for key in keys:
+        child = node[key] if isinstance(node, list) else node.get(key)
+        if child is not None:
+            targets.extend(_targets(child, rest, filters))
+    return targets
+
+
+def apply_array_filter_update(doc: Dict[str, Any], update: Dict[str, Any], array_filters: List[Dict[str, Any]]) -> None:
+    filters: Dict[str, Dict[str, Any]] = {}
+    for array_filter in array_filters:
+        for key, value in array_filter.items():
+            name, field = key.split(".", 1)
+            filters.setdefault(name, {})[field] = value
+    for operator, fields in update.items():
+        for path, value in fields.items():
+            for container, key in _targets(doc, path.split("."), filters):
+                if operator == "$inc":
+                    container[key] = container[key] + value
+                elif operator == "$set":
+                    container[key] = copy.deepcopy(value)
+                elif operator == "$push":
+                    container.setdefault(key, []).append(copy.deepcopy(value))
+                elif operator == "$pull":
+                    container[key] = [e for e in container.get(key) or [] if not _pulled(e, value)]
+                else:
+                    raise NotImplementedError(operator)
+
+
+class ArrayFilterCollection:
+    """Motor collection wrapper adding array_filters support to update_one."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._collection, name)
+
+    async def update_one(self, filter, update, *args, array_filters: Optional[List[Dict[str, Any]]] = None, **kwargs):
+        if not array_filters:
+            return await self._collection.update_one(filter, update, *args, **kwargs)
+        doc = await self._collection.find_one(filter)
+        if doc is None:
+            return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+        apply_array_filter_update(doc, update, array_filters)
+        await self._collection.replace_one({"_id": doc["_id"]}, doc)
+        return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+
+    async def bulk_write(self, requests, ordered: bool = True, **kwargs):
+        matched = 0
+        for index, request in enumerate(requests):
+            try:
+                if isinstance(request, UpdateOne):
+                    result = await self.update_one(request._filter, request._doc, array_filters=request._array_filters)
+                elif isinstance(request, UpdateMany):
+                    result = await self._collection.update_many(request._filter, request._doc)
+                else:
+                    raise NotImplementedError(type(request).__name__)
+            except (PyMongoError, KeyError, TypeError) as e:
+                raise BulkWriteError({
+                    "writeErrors": [{"index": index, "code": 2, "errmsg": str(e)}], "nMatched": matched,
+                })
+            matched += result.matched_count
+        return SimpleNamespace(matched_count=matched, modified_count=matched)
+
+
+@pytest.fixture
+def mongo():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+
+    async def init(*models):
+        client = mongomock_motor.AsyncMongoMockClient()
+        await init_beanie(database=client.test, document_models=list(models))
+        for model in models:
+            collection = model.get_motor_collection()
+            # index_information() does not report the filter, so take it from the model
+            for index in getattr(model.Settings, "indexes", []):
+                if isinstance(index, IndexModel) and "partialFilterExpression" in index.document:
+                    await collection.drop_index(index.document["name"])
+            model.get_settings().motor_collection = ArrayFilterCollection(collection)
+        return client.test
+
+    return init
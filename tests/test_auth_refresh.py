@@ -0,0 +1,49 @@
+import asyncio
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from jose import jwt
+
+from api.v1.endpoints import auth
+from core import security
+from core.config import settings
+from models.user import User
+
+
+async def _refresh(token: str):
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/auth")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        return await client.post("/auth/refresh-token", json={"refresh_token": token})
+
+
+def test_refresh_token_carries_the_token_version():
+    token = security.create_refresh_token("user-1", token_version=3)
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    assert payload["type"] == "refresh"
+    assert payload["ver"] == 3
+
+
+def test_refresh_token_from_before_a_revocation_is_rejected(mongo):
+    async def scenario():
+        await mongo(User)
+        user = await User(email="ana@example.com", username="ana", hashed_password="x").insert()
+        old_token = security.create_refresh_token(str(user.id), token_version=user.token_version)
+
+        response = await _refresh(old_token)
+        assert response.status_code == 200
+        new_token = response.json()["refresh_token"]
+        assert jwt.get_unverified_claims(new_token)["ver"] == 0
+
+        # e.g. a password change or reset
+        await user.set({User.token_version: user.token_version + 1})
+
+        response = await _refresh(old_token)
+        assert response.status_code == 403
+        assert response.json()["detail"] == "Token has been revoked"
+        assert (await _refresh(new_token)).status_code == 403
+
+        current = security.create_refresh_token(str(user.id), token_version=1)
+        assert (await _refresh(current)).status_code == 200
+
+    asyncio.run(scenario())
@@ -0,0 +1,37 @@
+import time
+
+from core.cache import TTLCache
+
+
+def test_lru_eviction_and_counters() -> None:
+    cache = TTLCache("test", max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+    assert stats["size"] == 2
+
+
+def test_entries_expire_and_can_be_invalidated() -> None:
+    cache = TTLCache("test", max_size=10, ttl_seconds=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+    cache.ttl_seconds = 60
+    cache.set("b", 2)
+    cache.invalidate("b")
+    assert cache.get("b") is None
+
+
+def test_zero_size_disables_cache() -> None:
+    cache = TTLCache("test", max_size=0, ttl_seconds=60)
+    cache.set("a", 1)
+    assert cache.get("a") is None
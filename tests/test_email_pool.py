@@ -0,0 +1,84 @@
+import asyncio
+import socket
+
+import pytest
+
+from core.config import settings
+from services.email import OutgoingEmail, close_smtp_pool, get_smtp_pool, send_many
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+
+class RecordingHandler:
+    """Local SMTP stand-in that records messages and the client connection they arrived on."""
+
+    def __init__(self) -> None:
+        self.peers = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.peers.append(session.peer)
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    handler = RecordingHandler()
+    port = _free_port()
+    controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    monkeypatch.setattr(settings, "MAIL_SERVER", "127.0.0.1")
+    monkeypatch.setattr(settings, "MAIL_PORT", port)
+    monkeypatch.setattr(settings, "MAIL_STARTTLS", False)
+    monkeypatch.setattr(settings, "MAIL_SSL_TLS", False)
+    monkeypatch.setattr(settings, "USE_CREDENTIALS", False)
+    yield handler
+    controller.stop()
+
+
+def _emails(count: int):
+    return [
+        OutgoingEmail(email_to=[f"user{i}@example.com"], subject=f"Report {i}", html_content="<p>hi</p>")
+        for i in range(count)
+    ]
+
+
+def test_send_many_reuses_pooled_connections(smtp_server, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "SMTP_POOL_SIZE", 2)
+
+    results = asyncio.run(send_many(_emails(20)))
+
+    assert results == [True] * 20
+    assert len(smtp_server.peers) == 20
+    assert len(set(smtp_server.peers)) <= 2
+
+
+def test_pool_size_zero_opens_a_connection_per_message(smtp_server, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "SMTP_POOL_SIZE", 0)
+
+    results = asyncio.run(send_many(_emails(5)))
+
+    assert results == [True] * 5
+    assert len(set(smtp_server.peers)) == 5
+
+
+def test_close_smtp_pool_quits_idle_connections(smtp_server, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "SMTP_POOL_SIZE", 2)
+
+    async def scenario():
+        await send_many(_emails(4))
+        pool = get_smtp_pool()
+        idle = [smtp for smtp, _ in pool._idle]
+        assert idle and all(smtp.is_connected for smtp in idle)
+
+        await close_smtp_pool()
+
+        assert not any(smtp.is_connected for smtp in idle)
+        assert get_smtp_pool() is not pool
+
+    asyncio.run(scenario())
@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from models.organization import EntitlementStatus, Organization
+from models.organization_payment import OrganizationPayment
+from services.entitlement import build_entitlement, compute_next_billing_date, ensure_entitlement, refresh_entitlement
+
+
+def _organization(**kwargs) -> Organization:
+    return Organization.model_construct(name="Acme", code="ACME", billing_cycle="monthly", **kwargs)
+
+
+def test_next_billing_date_clamps_to_end_of_month() -> None:
+    assert compute_next_billing_date(datetime(2026, 1, 31), "monthly") == datetime(2026, 2, 28)
+    assert compute_next_billing_date(datetime(2026, 12, 15), "monthly") == datetime(2027, 1, 15)
+    assert compute_next_billing_date(datetime(2028, 2, 29), "yearly") == datetime(2029, 2, 28)
+
+
+def test_entitlement_prefers_active_trial() -> None:
+    now = datetime(2026, 5, 1)
+    org = _organization(trial_ends_at=now + timedelta(days=3))
+
+    entitlement = build_entitlement(org, None, now=now)
+
+    assert entitlement.status == EntitlementStatus.TRIALING
+    assert entitlement.trial_ends_at == now + timedelta(days=3)
+    assert entitlement.subscription_expires_at is None
+
+
+def test_entitlement_from_latest_payment() -> None:
+    now = datetime(2026, 5, 10)
+    org = _organization(trial_ends_at=datetime(2026, 4, 1))
+    payment = OrganizationPayment.model_construct(
+        organization_id="org", amount=10.0, currency="XAF",
+        payment_date=datetime(2026, 5, 1), created_at=datetime(2026, 5, 1),
+    )
+
+    entitlement = build_entitlement(org, payment, now=now)
+
+    assert entitlement.status == EntitlementStatus.ACTIVE
+    assert entitlement.subscription_expires_at == datetime(2026, 6, 1)
+
+
+def test_entitlement_expired_without_trial_or_payment() -> None:
+    entitlement = build_entitlement(_organization(trial_ends_at=None), None, now=datetime(2026, 5, 1))
+
+    assert entitlement.status == EntitlementStatus.EXPIRED
+
+
+def test_missing_entitlement_is_stored_once(mongo, monkeypatch) -> None:
+    async def scenario():
+        await mongo(Organization, OrganizationPayment)
+        trial_end = datetime.utcnow().replace(microsecond=0) + timedelta(days=5)
+        org = await Organization(name="Acme", code="ACME", trial_ends_at=trial_end).insert()
+        payment_queries = 0
+        find = OrganizationPayment.find
+
+        def counting_find(*args, **kwargs):
+            nonlocal payment_queries
+            payment_queries += 1
+            return find(*args, **kwargs)
+
+        monkeypatch.setattr(OrganizationPayment, "find", counting_find)
+        legacy = await Organization.get(org.id)
+        entitlement = await ensure_entitlement(legacy)
+        assert entitlement.status == EntitlementStatus.TRIALING
+
+        stored = await Organization.get(org.id)
+        assert stored.entitlement.trial_ends_at == trial_end
+        assert await ensure_entitlement(stored) == stored.entitlement
+        assert payment_queries == 1
+
+    asyncio.run(scenario())
+
+
+def test_stored_entitlement_is_not_overwritten_by_a_stale_build(mongo) -> None:
+    async def scenario():
+        await mongo(Organization, OrganizationPayment)
+        org = await Organization(name="Acme", code="ACME").insert()
+        stale = await Organization.get(org.id)
+        # e.g. a payment was approved after `stale` was loaded
+        await refresh_entitlement(await Organization.get(org.id))
+        paid = (await Organization.get(org.id)).entitlement
+
+        await ensure_entitlement(stale)
+        assert (await Organization.get(org.id)).entitlement == paid
+
+    asyncio.run(scenario())
@@ -0,0 +1,160 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from core.config import settings
+from models.outbox_job import JobLease, JobStatus, OutboxJob
+from services import jobs
+from services.jobs import (
+    acquire_lease, backoff_seconds, claim_job, enqueue, enqueue_coalesced, job_stats, run_job,
+)
+
+
+def test_backoff_doubles_per_attempt_up_to_the_cap(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "JOB_RETRY_BASE_SECONDS", 30)
+    monkeypatch.setattr(settings, "JOB_RETRY_MAX_SECONDS", 300)
+
+    assert [backoff_seconds(attempt) for attempt in range(1, 6)] == [30, 60, 120, 240, 300]
+
+
+def test_lease_is_held_by_one_caller_until_it_expires(mongo) -> None:
+    async def scenario():
+        await mongo(JobLease)
+
+        assert await asyncio.gather(*(acquire_lease("scan", 60) for _ in range(3))) == [True, False, False]
+        assert await acquire_lease("other", 60)
+
+        await JobLease.find_one(JobLease.id == "scan").set({JobLease.locked_until: datetime.utcnow() - timedelta(seconds=1)})
+        assert await acquire_lease("scan", 60)
+        assert not await acquire_lease("scan", 60)
+
+    asyncio.run(scenario())
+
+
+def _handle(monkeypatch, kind: str, handler) -> None:
+    monkeypatch.setitem(jobs._handlers, kind, handler)
+
+
+def test_claimed_job_is_leased_until_its_lease_expires(mongo, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "JOB_LEASE_SECONDS", 60)
+
+    async def scenario():
+        await mongo(OutboxJob)
+        job = await enqueue("report", {"id": 1})
+
+        claimed = await claim_job()
+        assert claimed.id == job.id
+        assert claimed.status == JobStatus.PROCESSING
+        assert claimed.attempts == 1
+        assert claimed.locked_until > datetime.utcnow()
+        assert await claim_job() is None
+
+        # The worker died; once the lease expires another one takes the job over
+        await OutboxJob.find_one(OutboxJob.id == job.id).set({OutboxJob.locked_until: datetime.utcnow() - timedelta(seconds=1)})
+        reclaimed = await claim_job()
+        assert reclaimed.id == job.id
+        assert reclaimed.attempts == 2
+
+    asyncio.run(scenario())
+
+
+def test_job_whose_lease_expires_on_its_last_attempt_is_failed(mongo, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "JOB_MAX_ATTEMPTS", 2)
+
+    async def scenario():
+        await mongo(OutboxJob)
+        stuck = await enqueue("report", {"id": 1})
+        expired = {OutboxJob.locked_until: datetime.utcnow() - timedelta(seconds=1)}
+        for attempt in (1, 2):  # the worker dies during every attempt
+            assert (await claim_job()).attempts == attempt
+            await OutboxJob.find_one(OutboxJob.id == stuck.id).set(expired)
+        due = await enqueue("report", {"id": 2})
+
+        assert (await claim_job()).id == due.id
+        failed = await OutboxJob.get(stuck.id)
+        assert failed.status == JobStatus.FAILED
+        assert failed.attempts == 2
+        assert failed.locked_until is None
+        assert failed.last_error == "Lease expired during the last attempt"
+        assert await claim_job() is None
+
+    asyncio.run(scenario())
+
+
+def test_failing_job_is_retried_with_backoff_then_failed(mongo, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "JOB_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(settings, "JOB_RETRY_BASE_SECONDS", 30)
+    calls = []
+
+    async def flaky(payload):
+        calls.append(payload)
+        raise RuntimeError("smtp down")
+
+    _handle(monkeypatch, "flaky", flaky)
+
+    async def scenario():
+        await mongo(OutboxJob)
+        job = await enqueue("flaky", {"to": "a@example.com"})
+
+        started = datetime.utcnow().replace(microsecond=0)  # stored dates have millisecond precision
+        await run_job(await claim_job())
+        retried = await OutboxJob.get(job.id)
+        assert retried.status == JobStatus.PENDING
+        assert retried.last_error == "smtp down"
+        assert retried.locked_until is None
+        assert retried.available_at >= started + timedelta(seconds=30)
+        assert await claim_job() is None  # not due before the backoff
+
+        await OutboxJob.find_one(OutboxJob.id == job.id).set({OutboxJob.available_at: datetime.utcnow()})
+        await run_job(await claim_job())
+        failed = await OutboxJob.get(job.id)
+        assert failed.status == JobStatus.FAILED
+        assert failed.attempts == 2
+        assert calls == [{"to": "a@example.com"}] * 2
+        assert await claim_job() is None
+
+    asyncio.run(scenario())
+
+
+def test_successful_job_is_done(mongo, monkeypatch) -> None:
+    async def ok(payload):
+        pass
+
+    _handle(monkeypatch, "ok", ok)
+
+    async def scenario():
+        await mongo(OutboxJob)
+        job = await enqueue("ok", {})
+        await run_job(await claim_job())
+
+        done = await OutboxJob.get(job.id)
+        assert done.status == JobStatus.DONE
+        assert done.completed_at is not None
+        assert await job_stats() == {"pending": 0, "processing": 0, "done": 1, "failed": 0}
+
+    asyncio.run(scenario())
+
+
+def test_coalesced_events_share_a_job_until_it_is_claimed(mongo) -> None:
+    async def scenario():
+        await mongo(OutboxJob)
+
+        await enqueue_coalesced("digest", "org-1", {"organization_id": "org-1"}, {"items": "A"}, delay_seconds=0)
+        await enqueue_coalesced("digest", "org-1", {"organization_id": "org-1"}, {"items": "B"}, delay_seconds=0)
+        await enqueue_coalesced("digest", "org-2", {"organization_id": "org-2"}, {"items": "C"}, delay_seconds=0)
+
+        pending = await OutboxJob.find(OutboxJob.status == JobStatus.PENDING).sort("created_at").to_list()
+        assert [job.payload for job in pending] == [
+            {"organization_id": "org-1", "items": ["A", "B"]},
+            {"organization_id": "org-2", "items": ["C"]},
+        ]
+
+        claimed = await claim_job()
+        assert claimed.payload["items"] == ["A", "B"]
+        assert claimed.coalesce_key is None
+
+        # A claimed job no longer gathers events
+        await enqueue_coalesced("digest", "org-1", {"organization_id": "org-1"}, {"items": "D"}, delay_seconds=0)
+        assert (await OutboxJob.get(claimed.id)).payload["items"] == ["A", "B"]
+        assert await OutboxJob.find({"coalesce_key": "digest:org-1"}).count() == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,56 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from core.config import settings
+from models.outbox_job import JobStatus, OutboxJob
+from services.jobs import claim_job
+from services.notification import latest_per_product, queue_low_stock_alert
+
+
+def test_digest_keeps_latest_event_per_product() -> None:
+    events = [
+        {"product_name": "Rice", "current_stock": 8, "reorder_point": 10},
+        {"product_name": "beans", "current_stock": 3, "reorder_point": 5},
+        {"product_name": "Rice", "current_stock": 4, "reorder_point": 10},
+    ]
+
+    assert latest_per_product(events) == [
+        {"product_name": "beans", "current_stock": 3, "reorder_point": 5},
+        {"product_name": "Rice", "current_stock": 4, "reorder_point": 10},
+    ]
+
+
+def test_events_inside_the_window_coalesce_into_one_digest(mongo, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "LOW_STOCK_DIGEST_WINDOW_SECONDS", 300)
+
+    async def scenario():
+        await mongo(OutboxJob)
+
+        await queue_low_stock_alert("org", product_name="Rice", current_stock=8, reorder_point=10)
+        first = await OutboxJob.find_one(OutboxJob.kind == "notify.low_stock_digest")
+        await queue_low_stock_alert("org", product_name="Beans", current_stock=3, reorder_point=5)
+        await queue_low_stock_alert("other-org", product_name="Salt", current_stock=1, reorder_point=2)
+
+        jobs = await OutboxJob.find(OutboxJob.kind == "notify.low_stock_digest").sort("created_at").to_list()
+        assert len(jobs) == 2
+        digest = jobs[0]
+        assert digest.id == first.id
+        assert digest.payload["organization_id"] == "org"
+        assert [p["product_name"] for p in digest.payload["products"]] == ["Rice", "Beans"]
+        # Later events do not push the digest back
+        assert digest.available_at == first.available_at
+        assert [p["product_name"] for p in jobs[1].payload["products"]] == ["Salt"]
+        assert await claim_job() is None  # the window is still open
+
+        # Once the window closed and the digest was claimed, new events start the next digest
+        await OutboxJob.find_one(OutboxJob.id == digest.id).set({OutboxJob.available_at: datetime.utcnow() - timedelta(seconds=1)})
+        assert (await claim_job()).id == digest.id
+        await queue_low_stock_alert("org", product_name="Rice", current_stock=2, reorder_point=10)
+
+        pending = await OutboxJob.find(
+            OutboxJob.status == JobStatus.PENDING, {"payload.organization_id": "org"},
+        ).to_list()
+        assert [[p["product_name"] for p in job.payload["products"]] for job in pending] == [["Rice"]]
+        assert pending[0].id != digest.id
+
+    asyncio.run(scenario())
@@ -0,0 +1,96 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException, Response
+from pymongo import ASCENDING, DESCENDING
+
+from api.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, keyset_filter, list_page
+from core.config import settings
+from models.product import Product, ProductVariant
+from schemas.product import ProductResponse
+
+
+def test_cursor_round_trip_preserves_datetime_and_id() -> None:
+    doc_id = ObjectId()
+    created_at = datetime(2024, 3, 1, 12, 30, 15, 123000)
+
+    cursor = encode_cursor("created_at", created_at, doc_id)
+
+    assert decode_cursor(cursor, "created_at") == (created_at, doc_id)
+
+
+def test_cursor_rejects_other_sort_field_and_garbage() -> None:
+    cursor = encode_cursor("created_at", datetime(2024, 1, 1), ObjectId())
+
+    with pytest.raises(HTTPException):
+        decode_cursor(cursor, "name")
+    with pytest.raises(HTTPException):
+        decode_cursor("not-a-cursor", "created_at")
+
+
+def test_keyset_filter_breaks_ties_on_id() -> None:
+    doc_id = ObjectId()
+    created_at = datetime(2024, 1, 1)
+
+    assert keyset_filter("created_at", ASCENDING, created_at, doc_id) == {
+        "$or": [
+            {"created_at": {"$gt": created_at}},
+            {"created_at": created_at, "_id": {"$gt": doc_id}},
+        ]
+    }
+    assert keyset_filter("_id", DESCENDING, doc_id, doc_id) == {"_id": {"$lt": doc_id}}
+
+
+async def _products(mongo):
+    await mongo(Product)
+    created_at = datetime(2024, 1, 1)
+    for index, name in enumerate(("Tea", "Coffee", "Cocoa")):
+        await Product(
+            organization_id="org",
+            name=name,
+            variants=[ProductVariant(sku=name, attributes={}, unit_price=10, cost_price=5, stock=index)],
+            created_at=created_at + timedelta(days=index),
+        ).insert()
+
+
+async def _page(**page):
+    response = Response()
+    result = await list_page(Product, ProductResponse, {"organization_id": "org"}, response, limit=2, **page)
+    return json.loads(result.body), result.headers.get(NEXT_CURSOR_HEADER)
+
+
+def test_projected_pages_return_only_the_requested_fields(mongo) -> None:
+    async def scenario():
+        await _products(mongo)
+
+        items, cursor = await _page(fields="name", sort="-total_stock")
+        assert items == [{"id": items[0]["id"], "name": "Cocoa"}, {"id": items[1]["id"], "name": "Coffee"}]
+        assert cursor
+
+        items, cursor = await _page(fields="name", sort="-total_stock", cursor=cursor)
+        assert [item["name"] for item in items] == ["Tea"]
+        assert cursor is None
+
+    asyncio.run(scenario())
+
+
+def test_fast_json_pages_are_shaped_like_the_response_model(mongo, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+
+    async def scenario():
+        await _products(mongo)
+
+        items, cursor = await _page()
+        assert [item["name"] for item in items] == ["Tea", "Coffee"]
+        assert set(items[0]) == set(ProductResponse.model_fields)
+        assert ProductResponse.model_validate(items[0]).total_stock == 0
+        assert isinstance(items[0]["id"], str)
+
+        items, cursor = await _page(cursor=cursor)
+        assert [item["name"] for item in items] == ["Cocoa"]
+        assert cursor is None
+
+    asyncio.run(scenario())
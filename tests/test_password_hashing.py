@@ -0,0 +1,81 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+from core import security
+from core.config import settings
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """One worker and room for one waiting call, with fresh counters."""
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 1)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_QUEUE", 1)
+    monkeypatch.setattr(security, "_password_executor", executor)
+    monkeypatch.setattr(security, "_password_stats", {"in_flight": 0, "completed": 0, "rejected": 0})
+    yield
+    executor.shutdown(wait=True)
+
+
+async def _wait_for(condition):
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+def test_calls_beyond_the_queue_are_shed_with_503(pool):
+    async def scenario():
+        release = threading.Event()
+        running = [asyncio.create_task(security._run_password_task(release.wait)) for _ in range(2)]
+        await _wait_for(lambda: security.password_hash_stats()["in_flight"] == 2)
+        assert security.password_hash_stats()["queue_depth"] == 1
+
+        with pytest.raises(HTTPException) as error:
+            await security._run_password_task(release.wait)
+        assert error.value.status_code == 503
+        assert error.value.headers == {"Retry-After": "1"}
+
+        release.set()
+        await asyncio.gather(*running)
+        stats = security.password_hash_stats()
+        assert (stats["in_flight"], stats["queue_depth"], stats["completed"], stats["rejected"]) == (0, 0, 2, 1)
+
+    asyncio.run(scenario())
+
+
+def test_failed_calls_are_not_counted_as_completed(pool):
+    def fail():
+        raise ValueError("bad hash")
+
+    async def scenario():
+        with pytest.raises(ValueError):
+            await security._run_password_task(fail)
+        assert await security._run_password_task(security.get_password_hash, "secret")
+        stats = security.password_hash_stats()
+        assert (stats["in_flight"], stats["completed"]) == (0, 1)
+
+    asyncio.run(scenario())
+
+
+def test_a_cancelled_call_holds_its_slot_until_the_thread_finishes(pool):
+    async def scenario():
+        release = threading.Event()
+        task = asyncio.create_task(security._run_password_task(release.wait))
+        await _wait_for(lambda: security.password_hash_stats()["in_flight"] == 1)
+        await asyncio.sleep(0.05)  # let the worker pick it up
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert security.password_hash_stats()["in_flight"] == 1
+        release.set()
+        await _wait_for(lambda: security.password_hash_stats()["in_flight"] == 0)
+        assert security.password_hash_stats()["completed"] == 1
+
+    asyncio.run(scenario())
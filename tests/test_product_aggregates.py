@@ -0,0 +1,42 @@
+from models.product import ProductVariant, variant_aggregates
+
+
+def _variant(sku: str, unit_price: float, stock: int, promotion_price=None) -> ProductVariant:
+    return ProductVariant(
+        sku=sku,
+        attributes={},
+        unit_price=unit_price,
+        cost_price=unit_price / 2,
+        stock=stock,
+        promotion_price=promotion_price,
+    )
+
+
+def test_aggregates_apply_promotion_prices_only_when_on_promotion() -> None:
+    variants = [_variant("A", 10.0, 3, promotion_price=6.0), _variant("B", 8.0, 4)]
+
+    regular = variant_aggregates(variants, is_on_promotion=False, reorder_point=None)
+    promo = variant_aggregates(variants, is_on_promotion=True, reorder_point=None)
+
+    assert regular == {
+        "total_stock": 7,
+        "min_unit_price": 8.0,
+        "effective_min_price": 8.0,
+        "is_low_stock": False,
+    }
+    assert promo["effective_min_price"] == 6.0
+    assert promo["min_unit_price"] == 8.0
+
+
+def test_low_stock_requires_reorder_point() -> None:
+    variants = [_variant("A", 10.0, 2)]
+
+    assert variant_aggregates(variants, False, reorder_point=2)["is_low_stock"] is True
+    assert variant_aggregates(variants, False, reorder_point=1)["is_low_stock"] is False
+    assert variant_aggregates(variants, False, reorder_point=None)["is_low_stock"] is False
+    assert variant_aggregates([], False, reorder_point=0) == {
+        "total_stock": 0,
+        "min_unit_price": None,
+        "effective_min_price": None,
+        "is_low_stock": True,
+    }
@@ -0,0 +1,91 @@
+import asyncio
+
+from api.v1.endpoints import products as product_endpoints
+from api.v1.endpoints.storefront_admin import approve_review, delete_review
+from models.alert import Alert
+from models.product import Product, ProductVariant
+from models.product_review import ProductReview
+from models.user import User, UserRole
+from schemas.product import ProductUpdate
+from services.product_ratings import apply_rating_change
+
+ADMIN = User.model_construct(organization_id="org", role=UserRole.ADMIN)
+
+
+async def _product() -> Product:
+    return await Product(
+        organization_id="org",
+        name="Tea",
+        variants=[ProductVariant(sku="T-1", attributes={}, unit_price=4, cost_price=2, stock=50)],
+    ).insert()
+
+
+async def _summary(product: Product):
+    stored = await Product.get(product.id)
+    return stored.rating_sum, stored.rating_count, stored.avg_rating
+
+
+def test_moderation_keeps_the_rating_summary(mongo):
+    async def scenario():
+        await mongo(Product, ProductReview)
+        product = await _product()
+        reviews = [
+            await ProductReview(organization_id="org", product_id=str(product.id), reviewer_name=name, rating=rating).insert()
+            for name, rating in (("a", 5), ("b", 2), ("c", 4))
+        ]
+
+        for review in reviews:
+            await approve_review(str(review.id), True, current_user=ADMIN)
+        assert await _summary(product) == (11, 3, 11 / 3)
+
+        # Approving twice does not count the review again
+        await approve_review(str(reviews[0].id), True, current_user=ADMIN)
+        assert await _summary(product) == (11, 3, 11 / 3)
+
+        await approve_review(str(reviews[1].id), False, current_user=ADMIN)
+        assert await _summary(product) == (9, 2, 4.5)
+
+        await delete_review(str(reviews[0].id), current_user=ADMIN)
+        assert await _summary(product) == (4, 1, 4)
+
+        # Deleting an unapproved review leaves the summary alone
+        await delete_review(str(reviews[1].id), current_user=ADMIN)
+        assert await _summary(product) == (4, 1, 4)
+
+        await apply_rating_change(str(product.id), 4, -1)
+        assert await _summary(product) == (0, 0, 0)
+
+    asyncio.run(scenario())
+
+
+def test_product_update_keeps_a_concurrently_changed_rating(mongo, monkeypatch):
+    async def scenario():
+        await mongo(Product, Alert)
+        product = await _product()
+        original_find_one = Product.find_one
+        calls = 0
+
+        async def load_then_approve(*args, **kwargs):
+            loaded = await original_find_one(*args, **kwargs)
+            await apply_rating_change(str(product.id), 5, 1)  # a review approved meanwhile
+            return loaded
+
+        def find_one(*args, **kwargs):
+            nonlocal calls
+            calls += 1
+            if calls > 1:  # the endpoint's write goes through find_one too
+                return original_find_one(*args, **kwargs)
+            return load_then_approve(*args, **kwargs)
+
+        monkeypatch.setattr(Product, "find_one", staticmethod(find_one))
+        updated = await product_endpoints.update_product(
+            str(product.id), ProductUpdate(name="Green tea"), organization_id="org", current_user=ADMIN,
+        )
+
+        assert updated.name == "Green tea"
+        stored = await Product.get(product.id)
+        assert stored.name == "Green tea"
+        assert (stored.rating_sum, stored.rating_count, stored.avg_rating) == (5, 1, 5)
+        assert stored.total_stock == 50
+
+    asyncio.run(scenario())
@@ -0,0 +1,142 @@
+import asyncio
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from api import deps
+from api.v1.endpoints import sales
+from models.product import Product, ProductVariant
+from models.sale import Sale
+from models.stock_movement import StockMovement
+
+
+def _row(sale_number: str, product: Product, quantity: int, **fields):
+    return {
+        "sale_number": sale_number,
+        "vendor_name": "Till 1",
+        "items": [{
+            "product_id": str(product.id),
+            "product_name": product.name,
+            "quantity": quantity,
+            "unit_price": 10,
+            "total": 10 * quantity,
+        }],
+        "total": 10 * quantity,
+        **fields,
+    }
+
+
+async def _post_bulk(rows, monkeypatch):
+    recorded = []
+
+    async def record_sales(created):
+        recorded.extend(sale.sale_number for sale in created)
+
+    monkeypatch.setattr(sales, "record_sales", record_sales)
+    app = FastAPI()
+    app.include_router(sales.router, prefix="/sales")
+    app.dependency_overrides[deps.get_organization_id] = lambda: "org"
+    app.dependency_overrides[deps.get_current_active_user] = lambda: None
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/sales/bulk", json=rows)
+    assert response.status_code == 200
+    return [(row["status"], row["sale_number"]) for row in response.json()], recorded
+
+
+async def _setup(mongo, stock: int) -> Product:
+    await mongo(Product, StockMovement, Sale)
+    product = Product(
+        organization_id="org",
+        name="Coffee",
+        variants=[ProductVariant(sku="C-1", attributes={}, unit_price=10, cost_price=5, stock=stock)],
+    )
+    return await product.insert()
+
+
+def test_bulk_sales_report_each_row(mongo, monkeypatch):
+    async def scenario():
+        product = await _setup(mongo, 10)
+        await Sale(organization_id="org", sale_number="S-0", vendor_name="Till 1", total=1).insert()
+        missing = Product.model_construct(id="0" * 24, name="Gone")
+
+        results, recorded = await _post_bulk([
+            _row("S-1", product, 2),
+            {"sale_number": "S-2", "items": []},
+            _row("S-0", product, 1),
+            _row("S-3", missing, 1),
+            _row("S-4", product, 3),
+        ], monkeypatch)
+
+        assert results == [
+            ("created", "S-1"), ("invalid", "S-2"), ("duplicate", "S-0"), ("rejected", "S-3"), ("created", "S-4"),
+        ]
+        assert recorded == ["S-1", "S-4"]
+        assert (await Product.get(product.id)).variants[0].stock == 5
+        assert await StockMovement.count() == 2
+
+    asyncio.run(scenario())
+
+
+def test_bulk_sales_reject_an_oversell_in_the_middle(mongo, monkeypatch):
+    async def scenario():
+        product = await _setup(mongo, 5)
+
+        results, _ = await _post_bulk([
+            _row("S-1", product, 2), _row("S-2", product, 4), _row("S-3", product, 3),
+        ], monkeypatch)
+
+        assert results == [("created", "S-1"), ("rejected", "S-2"), ("created", "S-3")]
+        stored = await Product.get(product.id)
+        assert stored.variants[0].stock == 0
+        assert sorted(sale.sale_number for sale in await Sale.find_all().to_list()) == ["S-1", "S-3"]
+
+    asyncio.run(scenario())
+
+
+def test_bulk_sales_reject_a_sale_number_taken_concurrently(mongo, monkeypatch):
+    async def scenario():
+        product = await _setup(mongo, 10)
+        apply_stock_changes = sales.apply_stock_changes
+
+        async def apply_after_concurrent_sale(*args, **kwargs):
+            await Sale(organization_id="org", sale_number="S-2", vendor_name="Till 2", total=1).insert()
+            return await apply_stock_changes(*args, **kwargs)
+
+        monkeypatch.setattr(sales, "apply_stock_changes", apply_after_concurrent_sale)
+        results, recorded = await _post_bulk([_row("S-1", product, 2), _row("S-2", product, 3)], monkeypatch)
+
+        assert results == [("created", "S-1"), ("rejected", "S-2")]
+        assert recorded == ["S-1"]
+        assert (await Product.get(product.id)).variants[0].stock == 8
+        assert [m.reference for m in await StockMovement.find_all().to_list()] == ["S-1"]
+
+    asyncio.run(scenario())
+
+
+def test_bulk_sales_apply_their_stock_in_one_bulk_write(mongo, monkeypatch):
+    async def scenario():
+        product = await _setup(mongo, 10)
+        other = await Product(
+            organization_id="org",
+            name="Tea",
+            variants=[ProductVariant(sku="T-1", attributes={}, unit_price=10, cost_price=5, stock=10)],
+        ).insert()
+        collection = Product.get_motor_collection()
+        bulk_write = collection.bulk_write
+        sizes = []
+
+        async def counting_bulk_write(requests, *args, **kwargs):
+            sizes.append(len(requests))
+            return await bulk_write(requests, *args, **kwargs)
+
+        collection.bulk_write = counting_bulk_write
+        results, _ = await _post_bulk([
+            _row("S-1", product, 1), _row("S-2", other, 2), _row("S-3", product, 3), _row("S-4", other, 1),
+        ], monkeypatch)
+
+        assert [status for status, _ in results] == ["created"] * 4
+        assert sizes == [4, 2]  # every sale's stock change, then the status refresh
+        assert (await Product.get(product.id)).variants[0].stock == 6
+        assert (await Product.get(other.id)).variants[0].stock == 7
+
+    asyncio.run(scenario())
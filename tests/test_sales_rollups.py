@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from models.sale import Sale, SaleItem, SaleStatus
+from models.sales_rollup import merge_increments, sale_rollup_increments
+
+DAY = datetime(2026, 3, 14)
+
+
+def _sale(status: SaleStatus = SaleStatus.COMPLETED) -> Sale:
+    # model_construct: Beanie documents cannot be instantiated before init_beanie
+    return Sale.model_construct(
+        organization_id="org",
+        vendor_id="v1",
+        status=status,
+        total=27.0,
+        created_at=datetime(2026, 3, 14, 18, 30),
+        items=[
+            SaleItem(product_id="p1", product_name="P1", quantity=2, unit_price=5.0, total=10.0),
+            SaleItem(product_id="p2", product_name="P2", quantity=1, unit_price=12.0, total=12.0),
+            SaleItem(product_id="p1", product_name="P1", quantity=1, unit_price=5.0, total=5.0),
+        ],
+    )
+
+
+def test_sale_contributes_sale_level_and_per_product_rows() -> None:
+    increments = sale_rollup_increments(_sale())
+
+    assert increments == {
+        ("org", DAY, "v1", None): {"sales_count": 1, "quantity": 4, "revenue": 27.0},
+        ("org", DAY, "v1", "p1"): {"sales_count": 1, "quantity": 3, "revenue": 15.0},
+        ("org", DAY, "v1", "p2"): {"sales_count": 1, "quantity": 1, "revenue": 12.0},
+    }
+
+
+def test_only_completed_sales_are_counted() -> None:
+    assert sale_rollup_increments(_sale(SaleStatus.REFUNDED)) == {}
+
+
+def test_update_that_cancels_out_writes_nothing() -> None:
+    sale = _sale()
+    assert merge_increments([sale_rollup_increments(sale, -1), sale_rollup_increments(sale)]) == {}
+
+
+def test_refund_removes_the_contribution() -> None:
+    before = sale_rollup_increments(_sale(), -1)
+    after = sale_rollup_increments(_sale(SaleStatus.REFUNDED))
+
+    merged = merge_increments([before, after])
+
+    assert merged[("org", DAY, "v1", None)] == {"sales_count": -1, "quantity": -4, "revenue": -27.0}
@@ -0,0 +1,206 @@
+import asyncio
+
+import pytest
+
+from api.v1.endpoints.products import update_product
+from models.alert import Alert, AlertType
+from models.product import Product, ProductStatus, ProductVariant
+from models.stock_movement import MovementType, StockMovement
+from schemas.product import ProductUpdate
+from services.stock import StockChange, StockError, apply_stock_changes
+
+
+async def _product(name: str, stock: int, reorder_point: int = 2, **fields) -> Product:
+    product = Product(
+        organization_id="org",
+        name=name,
+        reorder_point=reorder_point,
+        variants=[ProductVariant(sku=f"{name}-1", attributes={}, unit_price=10, cost_price=5, stock=stock)],
+        **fields,
+    )
+    return await product.insert()
+
+
+def _change(product: Product, quantity: int, **fields) -> StockChange:
+    return StockChange(
+        product_id=str(product.id),
+        sku=product.variants[0].sku,
+        quantity=quantity,
+        movement_type=MovementType.RECEIVED if quantity > 0 else MovementType.DISPATCHED,
+        **fields,
+    )
+
+
+def test_apply_stock_changes_updates_stock_status_and_movements(mongo):
+    async def scenario():
+        await mongo(Product, StockMovement)
+        first, second = await _product("A", 10), await _product("B", 3)
+
+        batch = await apply_stock_changes("org", [_change(first, -8), _change(second, 4)], reference="S-1")
+
+        assert batch.products[str(first.id)].variants[0].stock == 2
+        assert batch.products[str(first.id)].status == ProductStatus.LOW_STOCK
+        assert batch.products[str(second.id)].total_stock == 7
+        assert [m.quantity for m in await StockMovement.find({"reference": "S-1"}).to_list()] == [-8, 4]
+
+    asyncio.run(scenario())
+
+
+def test_oversell_is_rejected_with_its_change_index(mongo):
+    async def scenario():
+        await mongo(Product, StockMovement)
+        first, second = await _product("A", 10), await _product("B", 3)
+
+        with pytest.raises(StockError) as error:
+            await apply_stock_changes("org", [_change(first, -2), _change(second, -4), _change(first, -1)])
+
+        assert error.value.status_code == 400
+        assert error.value.change_index == 1
+        assert "Insufficient stock" in error.value.detail
+        assert (await Product.get(first.id)).variants[0].stock == 10
+        assert (await Product.get(second.id)).variants[0].stock == 3
+        assert await StockMovement.count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_failed_change_compensates_earlier_updates_in_the_batch(mongo):
+    async def scenario():
+        await mongo(Product, StockMovement)
+        first, second = await _product("A", 10, supplier_id="old"), await _product("B", 3)
+
+        with pytest.raises(StockError) as error:
+            await apply_stock_changes("org", [
+                _change(first, 5, warehouse_id="w1", warehouse_name="Main", set_fields={"supplier_id": "new"}),
+                _change(first, -3),
+                _change(second, -5),
+            ])
+
+        assert error.value.change_index == 2
+        restored = await Product.get(first.id)
+        assert restored.variants[0].stock == 10
+        assert restored.variants[0].warehouse_stocks == []
+        assert restored.supplier_id == "old"
+
+    asyncio.run(scenario())
+
+
+def test_failed_movement_insert_rolls_back_stock(mongo, monkeypatch):
+    async def scenario():
+        await mongo(Product, StockMovement)
+        product = await _product("A", 3)
+
+        async def fail_insert(*args, **kwargs):
+            raise RuntimeError("insert failed")
+
+        monkeypatch.setattr(StockMovement, "insert_many", fail_insert)
+        with pytest.raises(RuntimeError):
+            await apply_stock_changes("org", [_change(product, -3)])
+
+        restored = await Product.get(product.id)
+        assert restored.variants[0].stock == 3
+        assert restored.total_stock == 3
+        assert restored.status == ProductStatus.ACTIVE
+
+    asyncio.run(scenario())
+
+
+def test_batch_rollback_undoes_stock_movements_and_status(mongo):
+    async def scenario():
+        await mongo(Product, StockMovement)
+        product = await _product("A", 5)
+
+        batch = await apply_stock_changes("org", [_change(product, -5, warehouse_id="w1")])
+        assert batch.products[str(product.id)].status == ProductStatus.OUT_OF_STOCK
+        assert await StockMovement.count() == 1
+
+        await batch.rollback()
+
+        restored = await Product.get(product.id)
+        assert restored.variants[0].stock == 5
+        assert restored.variants[0].warehouse_stocks == []
+        assert restored.status == ProductStatus.ACTIVE
+        assert await StockMovement.count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_changes_go_out_as_one_bulk_write_and_clear_their_markers(mongo):
+    async def scenario():
+        await mongo(Product, StockMovement)
+        first, second = await _product("A", 10), await _product("B", 3)
+        collection = Product.get_motor_collection()
+        bulk_write = collection.bulk_write
+        sizes = []
+
+        async def counting_bulk_write(requests, *args, **kwargs):
+            sizes.append(len(requests))
+            return await bulk_write(requests, *args, **kwargs)
+
+        collection.bulk_write = counting_bulk_write
+        await apply_stock_changes("org", [_change(first, -1), _change(second, 2), _change(first, -1)])
+
+        assert sizes == [3, 2]  # the guarded updates, then status refresh + marker cleanup
+        docs = await collection.find({}).to_list(length=None)
+        assert [doc.get("pending_stock_ops") for doc in docs] == [[], []]
+
+    asyncio.run(scenario())
+
+
+def test_stock_taken_after_loading_is_detected_and_compensated(mongo, monkeypatch):
+    async def scenario():
+        await mongo(Product, StockMovement)
+        first, second = await _product("A", 10), await _product("B", 3)
+        collection = Product.get_motor_collection()
+        bulk_write = collection.bulk_write
+
+        async def sell_concurrently_then_write(requests, *args, **kwargs):
+            collection.bulk_write = bulk_write
+            await Product.find_one(Product.id == second.id).update({"$inc": {"variants.0.stock": -2}})
+            return await bulk_write(requests, *args, **kwargs)
+
+        collection.bulk_write = sell_concurrently_then_write
+        with pytest.raises(StockError) as error:
+            await apply_stock_changes("org", [_change(first, -4), _change(second, -2)])
+
+        assert error.value.status_code == 400
+        assert error.value.change_index == 1
+        restored = await Product.get(first.id)
+        assert restored.variants[0].stock == 10
+        assert (await collection.find_one({"_id": first.id})).get("pending_stock_ops") == []
+        assert (await Product.get(second.id)).variants[0].stock == 1
+        assert await StockMovement.count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_product_update_keeps_a_concurrent_stock_change(mongo, monkeypatch):
+    async def scenario():
+        await mongo(Product, StockMovement, Alert)
+        product = await _product("A", 12, reorder_point=None)
+        original_find_one = Product.find_one
+        calls = 0
+
+        async def load_then_sell(*args, **kwargs):
+            loaded = await original_find_one(*args, **kwargs)
+            await apply_stock_changes("org", [_change(product, -5)])  # a sale meanwhile
+            return loaded
+
+        def find_one(*args, **kwargs):
+            nonlocal calls
+            calls += 1
+            return load_then_sell(*args, **kwargs) if calls == 1 else original_find_one(*args, **kwargs)
+
+        monkeypatch.setattr(Product, "find_one", staticmethod(find_one))
+        updated = await update_product(
+            str(product.id), ProductUpdate(name="Renamed"), organization_id="org", current_user=None,
+        )
+
+        assert updated.name == "Renamed"
+        assert updated.variants[0].stock == 7
+        assert updated.total_stock == 7
+        assert updated.status == ProductStatus.LOW_STOCK  # 7 <= the default reorder point of 10
+        assert (await Product.get(product.id)).variants[0].stock == 7
+        assert [alert.type for alert in await Alert.find_all().to_list()] == [AlertType.LOW_STOCK]
+
+    asyncio.run(scenario())
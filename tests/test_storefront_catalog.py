@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime
+
+from beanie import PydanticObjectId
+
+from models.product import Product, ProductStatus
+from services.storefront_catalog import NAME_COLLATION, find_storefront_products, plan_storefront_products
+
+
+def test_plan_pushes_filters_into_one_query() -> None:
+    plan = plan_storefront_products(
+        "org", search="tea", location="w1", min_price=5, max_price=20, sort="price_asc",
+    )
+
+    assert plan.filter["min_unit_price"] == {"$gte": 5, "$lte": 20}
+    assert len(plan.filter["$and"]) == 2
+    assert plan.sort == [("min_unit_price", 1), ("_id", 1)]
+    assert plan.collation is None
+
+
+def test_plan_name_sort_uses_case_insensitive_collation() -> None:
+    plan = plan_storefront_products("org", sort="name_desc")
+
+    assert plan.sort == [("name", -1), ("_id", -1)]
+    assert plan.collation == NAME_COLLATION
+
+
+def test_plan_featured_skips_invalid_ids() -> None:
+    featured = str(PydanticObjectId())
+    plan = plan_storefront_products("org", sort="featured", featured_product_ids=[featured, "not-an-id"])
+
+    assert plan.featured_ids == [PydanticObjectId(featured)]
+
+
+async def _catalog():
+    """Products F0-F2 (featured), O0-O3 and hidden ones, created in name order."""
+    products = {}
+    for minute, (name, fields) in enumerate([
+        ("O0", {}), ("F0", {}), ("O1", {}), ("F1", {}), ("O2", {}), ("F2", {}), ("O3", {}),
+        ("F3", {"status": ProductStatus.DISCONTINUED}),
+        ("X0", {"organization_id": "other"}),
+    ]):
+        product = Product(
+            organization_id=fields.pop("organization_id", "org"),
+            name=name,
+            created_at=datetime(2026, 1, 1, 0, minute),
+            **fields,
+        )
+        products[name] = await product.insert()
+    featured = [str(products[name].id) for name in ("F2", "F0", "F3", "X0", "F1")]
+    return plan_storefront_products("org", sort="featured", featured_product_ids=featured)
+
+
+def test_featured_pages_span_both_segments(mongo) -> None:
+    async def scenario():
+        await mongo(Product)
+        plan = await _catalog()
+
+        pages = {}
+        for skip in (0, 2, 3, 5, 7):
+            products, total = await find_storefront_products(plan, skip, 2)
+            pages[skip] = [product.name for product in products]
+            assert total == 7
+
+        assert pages == {
+            0: ["F0", "F1"],  # inside the featured segment
+            2: ["F2", "O0"],  # spans both segments
+            3: ["O0", "O1"],  # starts at the boundary
+            5: ["O2", "O3"],  # past the featured segment
+            7: [],
+        }
+
+    asyncio.run(scenario())
+
+
+def test_total_counts_matching_products_not_the_page(mongo) -> None:
+    async def scenario():
+        await mongo(Product)
+        await _catalog()
+
+        products, total = await find_storefront_products(plan_storefront_products("org", sort="newest"), 0, 3)
+
+        assert [product.name for product in products] == ["O3", "F2", "O2"]
+        assert total == 7
+
+        products, total = await find_storefront_products(plan_storefront_products("org", search="^F"), 1, 10)
+        assert [product.name for product in products] == ["F1", "F0"]
+        assert total == 3
+
+    asyncio.run(scenario())